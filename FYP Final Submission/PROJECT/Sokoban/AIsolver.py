@@ -1,149 +1,1157 @@
-import heapq
-from Levels import levels
-
-class AI:
-    def __init__(self, game_instance):
-        self.game_instance = game_instance
-
-    def find_boxes(self):
-        """
-        Searches and returns a list of positions for all boxes within the game level.
-
-        Scans the entire level grid and identifies the positions of all 'box' tiles,
-        represented by the tile value 2. This function returns the positions of all boxes.
-
-        Returns:
-            list of tuples: A list where each tuple represents the position (x, y) of a box on the game level grid.
-        """
-        return [(x, y) for y, row in enumerate(self.game_instance.level) for x, tile in enumerate(row) if tile == 2]
-
-    
-    def box_heuristic(self, boxes):
-        """
-        Calculates the heuristic cost for a given state based on the sum of the minimum distances
-        from each box to its nearest calculated target.
-
-        This function estimates the cost to reach the goal state from the current state 
-        by considering the total distance that all boxes need to cover to reach the
-        closest target.
-
-        Args:
-            boxes (list of tuples): The current positions of all boxes in the level, where each
-                                    box's position is represented as a tuple (x, y).
-
-        Returns:
-            int: The total heuristic cost for the given state, calculated as the sum of the
-                minimum Manhattan distances from each box to its nearest target.
-        """       
-        total_distance = 0
-        targets = [(x, y) for y, row in enumerate(self.game_instance.level) for x, tile in enumerate(row) if tile == 3]
-        for box in boxes: # Iterates all shown box in the level
-            min_distance = min(abs(box[0] - target[0]) + abs(box[1] - target[1]) for target in targets) # Calculates minimum distances to box
-            total_distance += min_distance
-        return total_distance
-
-    def goal_state(self, boxes):
-        """
-        Checks if the current state meets the goal state, where all boxes are placed on targets.
-
-        The goal state is reached when the set of box positions exactly matches the set of target
-        positions within the current level.
-
-        Args:
-            boxes (list of tuples): The current positions of all boxes in the level, where each
-                                    box's position is represented as a tuple (x, y).
-
-        Returns:
-            bool: True if all boxes are on targets, False otherwise.
-        """
-        targets = [(x, y) for y, row in enumerate(self.game_instance.level) for x, tile in enumerate(row) if tile == 3]
-        return set(boxes) == set(targets)
-
-    def generate_successors(self, state):
-        """
-        Generates all possible successor states from the current state.
-
-        For each possible move direction, this method checks if moving the player or pushing a box
-        in that direction is valid. It generates a new state for each valid move, capturing the
-        player's new position and any changes in box positions.
-
-        Args:
-            state (tuple): The current state, represented as a tuple containing the player's
-                        position (x, y) and the positions of all boxes.
-
-        Returns:
-            list of tuples: A list of successor states, where each state is represented as a tuple
-                            containing the new player position, updated box positions, and the move
-                            direction that led to this state.
-        """
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        direction_names = {(0, -1): "Up", (0, 1): "Down", (-1, 0): "Left", (1, 0): "Right"}
-        successors = []
-        player_x, player_y, boxes = state
-        for y, x in directions:
-            new_player_x, new_player_y = player_x + x, player_y + y
-            direction = direction_names[(x, y)]
-            move_is_valid = self.game_instance.is_move_valid(new_player_x, new_player_y, None, None)  # For player moves without pushing a box
-            new_boxes = list(boxes)
-            if (new_player_x, new_player_y) in boxes:
-                box_index = boxes.index((new_player_x, new_player_y))
-                new_box_x, new_box_y = new_player_x + x, new_player_y + y
-                move_is_valid = self.game_instance.is_move_valid(new_player_x, new_player_y, new_box_x, new_box_y)  # For moves involving pushing a box
-                if move_is_valid:
-                    new_boxes[box_index] = (new_box_x, new_box_y)
-                    successors.append(((new_player_x, new_player_y, tuple(new_boxes)), (x, y)))
-            elif move_is_valid:
-                successors.append(((new_player_x, new_player_y, tuple(boxes)), (x, y)))
-            
-            if move_is_valid == True:
-                print(f"Trying move: Player({player_x}, {player_y}) to ({new_player_x}, {new_player_y}), Move valid: {move_is_valid}")
-
-        print(f"Generated {len(successors)} successors from state: {state}")
-        print(f"Trying direction: {direction}, From: ({player_x}, {player_y}) to ({new_player_x}, {new_player_y})")
-        return successors
-
-    def solve_level(self):
-        """
-        Tries to find a solution to the current level using the A* search algorithm.
-
-        This method iterates through possible game states using a priority queue, where the
-        priority is determined by a heuristic cost function. It explores different states 
-        until it finds a solution that meets the goal condition or exhausts all possibilities.
-        It logs the initial player position, the final solution path, and the player's
-        position after each move in the solution, if a solution path is found.
-
-        Returns:
-            list of tuples or None: A sequence of (x, y) moves representing the solution if one
-                                    is found, otherwise None.
-        """
-        direction_names = {(0, -1): "Up", (0, 1): "Down", (-1, 0): "Left", (1, 0): "Right"}
-        start_state = (self.game_instance.player_x, self.game_instance.player_y, tuple(self.find_boxes()))
-        frontier = []
-        heapq.heappush(frontier, (0, start_state, []))  # Cost, state, path
-        explored = set()
-        
-        while frontier:
-            cost, current_state, path = heapq.heappop(frontier)
-            if current_state in explored:
-                continue
-            explored.add(current_state)
-            _, _, boxes = current_state
-            
-            if self.goal_state(boxes):
-                # Log the final solution path and calculate player positions
-                current_player_x, current_player_y = start_state[:2]  # Get initial player position
-                print(f"Initial Player Position: ({current_player_x}, {current_player_y})")
-                for x, y in path:
-                    move_direction = direction_names[(x, y)]
-                    current_player_x += x
-                    current_player_y += y
-                    print(f"After moving {move_direction}, Player Position: ({current_player_x}, {current_player_y})")
-                return path
-                
-            for successor, (x, y) in self.generate_successors(current_state):
-                if successor not in explored:
-                    new_cost = cost + 1  # Assuming each move costs 1
-                    new_path = path + [(x, y)]
-                    heapq.heappush(frontier, (new_cost + self.box_heuristic(successor[2]), successor, new_path))
-                    
-        return None
\ No newline at end of file
+import heapq
+import logging
+import time
+from array import array
+from collections import namedtuple
+from itertools import islice
+from analysis import UNREACHABLE, LevelAnalysis
+from board import DIRECTIONS, DIRECTION_NAMES, OPPOSITE, State, box_cells
+from deadlock import DeadlockDetector
+from heuristics import MatchingHeuristic
+from macros import MacroPushes
+from patterns import PatternHeuristic
+from solutioncache import moves_to_pushes
+from stats import SearchStats, logger
+from zobrist import ClosedTable, ZobristKeys
+
+# Bump whenever a change to the search can change the solutions it finds, so cached solutions are dropped
+SOLVER_VERSION = 1
+
+# Most states whose lower bound a solver remembers from its earlier searches, and most states it
+# remembers as unsolvable
+LEARNED_LIMIT = 500000
+
+# Bits of an A* heap entry below its estimate and below its heuristic, see `astar_search`
+NODE_BITS = 40
+HEURISTIC_BITS = 20
+
+# Heuristic weights of the anytime search, one weighted A* iteration each, ending optimal at 1
+ANYTIME_WEIGHTS = (5, 3, 2, 1.5, 1.2, 1)
+
+# Weights are scaled by this to keep the anytime estimates whole numbers
+WEIGHT_SCALE = 10
+
+# Distance tables to the starting box cells, in the shape `MatchingHeuristic` reads from a `LevelAnalysis`
+StartTables = namedtuple("StartTables", ["target_list", "push_distances"])
+
+class SearchStopped(Exception):
+    """
+    Raised inside a search when it runs out of its node or time budget, or is cancelled.
+    """
+
+
+class SearchTree:
+
+    def __init__(self):
+        """
+        Compact record of every generated search node.
+
+        Node ids are positions in parallel arrays: the state itself, the id of the node it was
+        generated from (-1 for the root), the direction index of the move or push that produced
+        it, stored as a single byte, and the cell the player stepped into. The frontier only has
+        to hold node ids, and the path is rebuilt once, when the goal is reached.
+
+        A search that keeps its states elsewhere can add every node but the roots with no state;
+        the states along the path are then replayed from the root with the moves and cells.
+        """
+        self.states = []
+        self.parents = array('l')
+        self.moves = bytearray()
+        self.cells = array('l')
+
+    def add(self, state, parent=-1, move=0, cell=0):
+        """
+        Records a node and returns its id.
+        """
+        self.states.append(state)
+        self.parents.append(parent)
+        self.moves.append(move)
+        self.cells.append(cell)
+        return len(self.states) - 1
+
+    def path(self, node, replay=None):
+        """
+        Follows the parent pointers from a node back to the root.
+
+        Args:
+            node (int): The node to end at.
+            replay (callable, optional): Called with (parent state, cell, direction index) to work
+                                         out the state of a node added without one.
+
+        Returns:
+            list of tuples: (parent state, state, direction index) for each step, in order from the root.
+        """
+        nodes = []
+        while node >= 0:
+            nodes.append(node)
+            node = self.parents[node]
+        nodes.reverse()
+        steps = []
+        parent_state = self.states[nodes[0]]
+        for node in nodes[1:]:
+            state = self.states[node]
+            if state is None:
+                state = replay(parent_state, self.cells[node], self.moves[node])
+            steps.append((parent_state, state, self.moves[node]))
+            parent_state = state
+        return steps
+
+
+class AI:
+    def __init__(self, board, mode="push", heuristic="nearest", deadlocks=("dead_square", "freeze"),
+                 algorithm="astar", table_size=2 ** 16, max_nodes=None, time_limit=None,
+                 timed=False, sampler=None, sample_every=1000, cache=None, verify_hashes=False, macros=(),
+                 patterns=0, pattern_combine="max", weights=ANYTIME_WEIGHTS, on_improve=None):
+        """
+        Prepares the solver for a level.
+
+        The solver only needs the static `Board` of the level, so it can run without a game
+        window. The target set, dead squares and push distances come from the level's cached
+        `LevelAnalysis`, so they are worked out once per layout instead of on every call.
+
+        Args:
+            board (Board): The static layout of the level to solve.
+            mode (str): "push" searches one box push per node with the player normalized to its
+                        reachable region, "move" searches every single player step.
+            heuristic (str): "nearest" sums each box's distance to its nearest target, "matching"
+                             pairs boxes and targets with a minimum-cost perfect matching.
+            deadlocks (iterable of str): Deadlock checks to run on every push, any of "dead_square",
+                                         "freeze" and "corral". The number of nodes each one pruned
+                                         is kept in `self.deadlocks.pruned`.
+            algorithm (str): "astar" keeps every state in memory, "idastar" runs a depth-first
+                             search with an iteratively raised bound in roughly constant memory,
+                             "bidirectional" runs A* forwards from the start and backwards with
+                             pulls from the solved position until the two meet ("push" mode only),
+                             "anytime" finds a first solution fast with a heavily weighted A* and
+                             improves it while `time_limit` allows, see `anytime_search`.
+            table_size (int): Number of slots in the fixed-size transposition table used by IDA*.
+            max_nodes (int, optional): Give up after expanding this many nodes.
+            time_limit (float, optional): Give up after this many seconds.
+            timed (bool): Time the successor, heuristic and heap phases of each search.
+            sampler (callable, optional): Profiler hook called with the running `SearchStats`
+                                          every `sample_every` expansions.
+            sample_every (int): Expansions between two calls of `sampler`.
+            cache (SolutionCache, optional): Persistent store checked before every search and
+                                             filled after every successful one.
+            verify_hashes (bool): Keep the states in the A* closed set and the IDA* table and
+                                  compare them whenever their Zobrist keys match, counting any
+                                  collisions in `stats.collisions`. Slower, meant for tests.
+            macros (iterable of str): Macro pushes to make in "push" mode, any of "tunnel" (carry a
+                                      box through a one-wide corridor in one step) and "goal_room"
+                                      (take a box entering a goal room straight to its target in a
+                                      fixed fill order). Off by default: macro pushes skip states a
+                                      push-optimal solution may need, goal room macros can lengthen
+                                      the solution by a few pushes, and what a search with macros
+                                      learns is not reused as exact by later searches.
+            patterns (int): Boxes per group of the pattern-database heuristic, 2 to 4, or 0 to go
+                            without it. Its table is built once per level layout and kept on disk,
+                            see `patterns`.
+            pattern_combine (str): "max" raises the estimate by the extra pushes of the worst
+                                   group of boxes, "add" by those of a set of separate groups.
+            weights (tuple of float): Heuristic weights of the anytime search, in the order they
+                                      are used, each at least 1.
+            on_improve (callable, optional): Called by the anytime search with the moves of every
+                                             better solution it finds and the running `SearchStats`.
+        """
+        if mode not in ("push", "move"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        if heuristic not in ("nearest", "matching"):
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+        if algorithm not in ("astar", "idastar", "bidirectional", "anytime"):
+            raise ValueError(f"Unknown search algorithm: {algorithm}")
+        if algorithm == "bidirectional" and mode != "push":
+            raise ValueError("The bidirectional search only works in push mode")
+        if not weights or min(weights) < 1:
+            raise ValueError("Anytime weights must be at least 1")
+        self.board = board
+        self.mode = mode
+        self.heuristic = heuristic
+        self.algorithm = algorithm
+        self.table_size = table_size
+        self.weights = weights
+        self.on_improve = on_improve
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.cancelled = False
+        self.stopped = None  # Why the last search gave up early: "nodes", "time" or "cancelled"
+        self.deadline = None
+        self.expand = self.generate_push_successors if mode == "push" else self.generate_successors
+        self.analysis = LevelAnalysis.for_board(board)
+        self.zobrist = ZobristKeys(board.size)
+        self.verify_hashes = verify_hashes
+        self.matching = MatchingHeuristic(self.analysis) if heuristic == "matching" else None
+        self.patterns = PatternHeuristic(self.analysis, patterns, pattern_combine) if patterns else None
+        self.deadlocks = DeadlockDetector(self.analysis, deadlocks)
+        self.macros = MacroPushes(self.analysis, macros if mode == "push" else ())
+        # Only searches that find optimal solutions may remember them as exact for later searches
+        self.admissible = not self.macros.kinds
+        self.timed = timed
+        self.sampler = sampler
+        self.sample_every = sample_every
+        self.trace = False  # Whether per-state DEBUG logging is on for the current search
+        self.stats = SearchStats()  # Counters and timings of the last search
+        self.cache = cache
+        # Cached solutions are only shared between solvers that would find the same ones
+        self.cache_version = f"{SOLVER_VERSION}|{mode}|{heuristic}|{algorithm}|{','.join(self.macros.kinds)}"
+        if patterns:
+            self.cache_version += f"|patterns{patterns}{pattern_combine}"
+
+        # Kept between searches on this level, so a solve from a later position reuses earlier work
+        self.known_suffixes = {}  # State -> (solution steps, index) of an optimal solution through it
+        self.learned = {}  # Zobrist key -> lower bound on the remaining cost, learnt from earlier A* searches
+        self.unsolvable = set()  # Zobrist keys of states an exhausted A* search proved cannot reach the goal, up to `LEARNED_LIMIT`
+
+    def find_boxes(self, state):
+        """
+        Returns a list of positions for all boxes within the given state.
+
+        The boxes of a state are stored as a bitmask of cells, this converts them back
+        into grid coordinates.
+
+        Args:
+            state (State): The state to read the boxes from.
+
+        Returns:
+            list of tuples: A list where each tuple represents the position (x, y) of a box on the game level grid.
+        """
+        return [self.board.coords(cell) for cell in box_cells(state.boxes)]
+
+    def box_heuristic(self, boxes):
+        """
+        Calculates the heuristic cost for a given state based on the sum of the minimum distances
+        from each box to its nearest calculated target.
+
+        This function estimates the cost to reach the goal state from the current state 
+        by considering the total distance that all boxes need to cover to reach the
+        closest target. The distances are push distances around the walls, read from the
+        precomputed table of the level analysis.
+
+        Args:
+            boxes (int): The current box positions as a bitmask of board cells.
+
+        Returns:
+            int: The total heuristic cost for the given state, calculated as the sum of the
+                minimum push distances from each box to its nearest target. A box on a dead
+                square makes the cost infinite.
+        """       
+        nearest_distance = self.analysis.nearest_distance
+        total_distance = 0
+        for cell in box_cells(boxes): # Iterates all shown box in the level
+            total_distance += nearest_distance[cell]
+        return total_distance
+
+    def heuristic_cost(self, boxes, parent_boxes=None):
+        """
+        Estimates the remaining cost of a state with the heuristic chosen for this solver.
+
+        Once the pattern database is loaded, the per-box estimate plus the extra pushes it finds
+        for groups of boxes is used whenever it is the higher of the two.
+
+        Args:
+            boxes (int): The box bitmask of the state to estimate.
+            parent_boxes (int, optional): The box bitmask of the state it was generated from, which
+                                          lets the matching heuristic update incrementally.
+
+        Returns:
+            int or float: The estimated number of pushes still needed.
+        """
+        if self.matching is not None:
+            estimate = self.matching.estimate(boxes, parent_boxes)
+        else:
+            estimate = self.box_heuristic(boxes)
+        if self.patterns is not None and self.patterns.table:
+            extra = self.patterns.penalty(boxes)
+            if extra:
+                nearest = estimate if self.matching is None else self.box_heuristic(boxes)
+                estimate = max(estimate, nearest + extra)
+        return estimate
+
+    def goal_state(self, boxes):
+        """
+        Checks if the current state meets the goal state, where all boxes are placed on targets.
+
+        The goal state is reached when the box bitmask exactly matches the target bitmask
+        of the level.
+
+        Args:
+            boxes (int): The current box positions as a bitmask of board cells.
+
+        Returns:
+            bool: True if all boxes are on targets, False otherwise.
+        """
+        return self.analysis.is_goal(boxes)
+
+    def generate_successors(self, state):
+        """
+        Generates all possible successor states from the current state.
+
+        For each possible move direction, the board checks if moving the player or pushing a box
+        in that direction is valid. It generates a new state for each valid move, capturing the
+        player's new position and any changes in box positions. Pushes that leave the level in
+        a deadlock are left out.
+
+        Args:
+            state (State): The current state, holding the player's cell and the box bitmask.
+
+        Returns:
+            list of tuples: A list of successor states, each with the index of the move direction
+                            that led to this state and the cost of the move, which is always 1.
+        """
+        successors = []
+        for direction in range(4):
+            new_state = self.board.move(state, direction)
+            if new_state is not None:
+                moved = new_state.boxes & ~state.boxes
+                if moved and self.deadlocks.is_deadlock(new_state.boxes, moved.bit_length() - 1, new_state.player):
+                    continue
+                successors.append((new_state, direction, 1))
+        if self.trace:
+            logger.debug("Generated %d successors from state: %s, %s", len(successors),
+                         self.board.coords(state.player), self.find_boxes(state))
+        return successors
+
+    def generate_push_successors(self, state):
+        """
+        Generates every state reachable from the current state with a single box push.
+
+        The player is first flood-filled over the floor it can reach without touching a box.
+        Each box that has a reachable cell on one side and free floor on the other can then be
+        pushed, and the resulting state is normalized so that the player stands on the canonical
+        cell of its new region. A push into a tunnel or a goal room is carried on with the pushes of
+        its macro, see `macros`. Pushes that leave the level in a deadlock are left out.
+
+        Args:
+            state (State): The current normalized state.
+
+        Returns:
+            list of tuples: A list of successor states, each with the index of the direction the
+                            box was first pushed in and the number of pushes it took. The pushed
+                            box is the one whose cell differs between the two states.
+        """
+        successors = []
+        boxes = state.boxes
+        reach = self.board.reachable(state.player, boxes)
+        neighbours = self.board.neighbours
+        starts = self.macros.starts
+        for box in box_cells(boxes):
+            for direction in range(4):
+                behind = neighbours[OPPOSITE[direction]][box]
+                ahead = neighbours[direction][box]
+                if behind in reach and ahead >= 0 and not boxes >> ahead & 1:
+                    new_boxes = boxes ^ (1 << box) ^ (1 << ahead)
+                    player, pushes = box, 1
+                    if starts[ahead]:
+                        player, ahead, new_boxes, pushes = self.macros.carry(new_boxes, box, ahead, direction)
+                        if pushes > 1:
+                            self.stats.macros += 1
+                    if self.deadlocks.is_deadlock(new_boxes, ahead, player):
+                        continue
+                    successors.append((self.board.normalize(State(player, new_boxes)), direction, pushes))
+        if self.trace:
+            logger.debug("Generated %d pushes from state: %s, %s", len(successors),
+                         self.board.coords(state.player), self.find_boxes(state))
+        return successors
+
+    def generate_pull_successors(self, state):
+        """
+        Generates every state from which a single box push leads to the current state.
+
+        This is the backward move of the bidirectional search: the player stands next to a box,
+        steps away from it and pulls the box into the cell it left, which needs free floor behind
+        the player. Pulling never creates a deadlock that pushing could not undo, so no deadlock
+        checks are run.
+
+        Args:
+            state (State): The current normalized state.
+
+        Returns:
+            list of tuples: A list of predecessor states, each with the index of the direction the
+                            box is pushed in to get from that state back to the current one and the
+                            cost of that push, which is always 1.
+        """
+        successors = []
+        boxes = state.boxes
+        reach = self.board.reachable(state.player, boxes)
+        neighbours = self.board.neighbours
+        for box in box_cells(boxes):
+            for direction in range(4):
+                player = neighbours[direction][box]  # The player stands here and the box follows
+                if player in reach:
+                    behind = neighbours[direction][player]
+                    if behind >= 0 and not boxes >> behind & 1:
+                        new_boxes = boxes ^ (1 << box) ^ (1 << player)
+                        successors.append((self.board.normalize(State(behind, new_boxes)), OPPOSITE[direction], 1))
+        return successors
+
+    def solved_states(self):
+        """
+        Lists the normalized solved states the backward search starts from.
+
+        With every box on a target the player can be in any floor region that touches a box, since
+        the last push always leaves the player next to the box it pushed.
+
+        Returns:
+            list of State: One state per such region.
+        """
+        boxes = self.analysis.target_mask
+        neighbours = self.board.neighbours
+        states = []
+        covered = set()
+        for box in box_cells(boxes):
+            for table in neighbours:
+                cell = table[box]
+                if cell >= 0 and not boxes >> cell & 1 and cell not in covered:
+                    region = self.board.reachable(cell, boxes)
+                    covered |= region
+                    states.append(State(min(region), boxes))
+        return states
+
+    def expand_pushes(self, start_state, pushes):
+        """
+        Expands a list of box pushes back into the single player moves that perform them.
+
+        For every push the player walks the shortest route to the cell behind the box and then
+        steps into the box, so the result can be handed straight to `animate_solution`.
+
+        Args:
+            start_state (State): The real (not normalized) state the pushes start from.
+            pushes (list of tuples): (box cell, direction index) tuples in the order they are made.
+
+        Returns:
+            list of tuples: A sequence of (x, y) moves.
+        """
+        moves = []
+        player, boxes = start_state
+        for box, direction in pushes:
+            behind = self.board.neighbours[OPPOSITE[direction]][box]
+            for step in self.board.player_path(player, behind, boxes):
+                moves.append(DIRECTIONS[step])
+            moves.append(DIRECTIONS[direction])
+            boxes ^= (1 << box) ^ (1 << self.board.neighbours[direction][box])
+            player = box
+        return moves
+
+    def split_macros(self, steps):
+        """
+        Splits every macro push of a solution found in "push" mode into its single pushes.
+
+        The state after each single push is normalized like every other search state, so the
+        result reads as if the search had made the pushes one at a time, and its length is the
+        number of pushes.
+
+        Args:
+            steps (list of tuples): (parent state, state, direction index) for each step of the search.
+
+        Returns:
+            list of tuples: (parent state, state, direction index) for each single push.
+        """
+        if self.mode == "move" or not self.macros.kinds:
+            return steps
+        neighbours = self.board.neighbours
+        pushes = []
+        for parent_state, state, direction in steps:
+            box = (parent_state.boxes & ~state.boxes).bit_length() - 1
+            route = self.macros.split(parent_state.boxes, box, direction)
+            boxes = parent_state.boxes
+            for box, push_direction in route[:-1]:
+                boxes ^= (1 << box) ^ (1 << neighbours[push_direction][box])
+                next_state = self.board.normalize(State(box, boxes))
+                pushes.append((parent_state, next_state, push_direction))
+                parent_state = next_state
+            pushes.append((parent_state, state, route[-1][1]))
+        return pushes
+
+    def cancel(self):
+        """
+        Asks a running search to stop at its next expansion; it then returns no solution.
+
+        The request stays until `reset_cancel` is called, so a cancel made after a solve was started
+        on another thread, but before that thread reached `solve`, still stops it.
+        """
+        self.cancelled = True
+
+    def reset_cancel(self):
+        """
+        Clears an earlier cancel so the next search runs.
+
+        Call it on the thread that may cancel, before handing the solve to another thread.
+        """
+        self.cancelled = False
+
+    def count_expansion(self):
+        """
+        Counts an expanded node and stops the search once it is over budget or cancelled.
+
+        The sampler hook, if there is one, is also called from here.
+
+        Raises:
+            SearchStopped: If the node budget, the time budget or a cancellation ends the search.
+        """
+        stats = self.stats
+        stats.expanded += 1
+        if stats.sampler is not None:
+            stats.sample()
+        if self.cancelled:
+            self.stopped = "cancelled"
+        elif self.max_nodes is not None and stats.expanded > self.max_nodes:
+            self.stopped = "nodes"
+        elif self.deadline is not None and stats.expanded % 64 == 0 and time.perf_counter() > self.deadline:
+            self.stopped = "time"
+        else:
+            return
+        raise SearchStopped(self.stopped)
+
+    def rebuild_path(self, steps, start_state):
+        """
+        Turns the steps of a solution found by the search into the list of player moves.
+
+        In "push" mode the pushed box of each step is found from the cells that differ between the
+        parent and child box bitmasks, and the pushes are then expanded into player moves.
+
+        Args:
+            steps (list of tuples): (parent state, state, direction index) for each step of the solution.
+            start_state (State): The real (not normalized) state the search started from.
+
+        Returns:
+            list of tuples: A sequence of (x, y) moves.
+        """
+        if self.mode == "move":
+            return [DIRECTIONS[direction] for _, _, direction in steps]
+        pushes = []
+        for parent_state, state, direction in steps:
+            box = (parent_state.boxes & ~state.boxes).bit_length() - 1
+            pushes.append((box, direction))
+        return self.expand_pushes(start_state, pushes)
+
+    def replay_step(self, state, cell, direction):
+        """
+        Works out the state one step of the search led to, for a node stored without its state.
+
+        Args:
+            state (State): The state the step was taken from.
+            cell (int): The cell the player stepped into: the pushed box's cell in "push" mode.
+            direction (int): The direction index of the step.
+
+        Returns:
+            State: The state after the step, including any macro pushes, normalized in "push" mode.
+        """
+        if self.mode == "move":
+            return self.board.move(state, direction)
+        ahead = self.board.neighbours[direction][cell]
+        player, _, boxes, _ = self.macros.carry(state.boxes ^ (1 << cell) ^ (1 << ahead), cell, ahead, direction)
+        return self.board.normalize(State(player, boxes))
+
+    def astar_search(self, first_state):
+        """
+        Searches for the goal with A*, keeping every generated state in memory.
+
+        The moves are stored once in a `SearchTree` and the path is rebuilt from its parent pointers
+        when the goal is found. States are not kept in the tree: an open node's state travels in its
+        heap entry, and the states along the path are replayed at the end.
+
+        A transposition table maps the Zobrist key of every state seen so far to the lowest cost it
+        has been reached with, in a `ClosedTable` of plain arrays; each successor's key is updated
+        from its parent's. Successors that do not improve on it are dropped before they reach the
+        heap, and a heap entry whose cost has since been beaten is skipped when popped, which gives
+        a lazy decrease-key. Each heap entry is a single int packing (estimate, heuristic, node id,
+        box bitmask, player cell) from the highest bits down, so entries are ordered by estimate,
+        ties prefer states closer to the goal and then older nodes, states are never compared, and
+        the cost is the estimate minus the heuristic. Both kinds of drop are counted as duplicates,
+        and states the heuristic rules out are never pushed.
+
+        What earlier searches on this level found is reused: a state on a known optimal solution is
+        given its exact remaining cost and ends the search when it is expanded, remembered lower
+        bounds raise the heuristic, and states proven unsolvable are never generated.
+
+        Args:
+            first_state (State): The state to start from, already normalized in "push" mode.
+
+        Returns:
+            list of tuples or None: (parent state, state, direction index) for each step of the
+                                    solution, or None if the goal cannot be reached.
+        """
+        stats = self.stats
+        expand = stats.timer("successors", self.expand)
+        heuristic_cost = stats.timer("heuristic", self.heuristic_cost)
+        heappush = stats.timer("heap", heapq.heappush)
+        heappop = stats.timer("heap", heapq.heappop)
+        zobrist = self.zobrist
+        push_mode = self.mode == "push"
+        tree = SearchTree()
+        keys = array('Q')  # Zobrist key of every node, next to the tree
+        player_bits = self.board.size.bit_length()
+        state_bits = self.board.size + player_bits
+        tree.add(first_state)
+        frontier = [first_state.boxes << player_bits | first_state.player]  # Estimate and heuristic 0, node id 0
+        keys.append(zobrist.key(first_state))
+        best_cost = ClosedTable(verify=self.verify_hashes)  # Transposition table of the cheapest known cost per state
+        best_cost.improve(keys[0], 0, first_state)
+        player_mask = (1 << player_bits) - 1
+        boxes_mask = (1 << self.board.size) - 1
+        node_mask = (1 << NODE_BITS) - 1
+        heuristic_mask = (1 << HEURISTIC_BITS) - 1
+        known_suffixes = self.known_suffixes
+        learned = self.learned
+        unsolvable = self.unsolvable
+
+        try:
+            while frontier:
+                entry = heappop(frontier)
+                current_state = State(entry & player_mask, entry >> player_bits & boxes_mask)
+                entry >>= state_bits
+                node = entry & node_mask
+                f_cost = entry >> (NODE_BITS + HEURISTIC_BITS)
+                cost = f_cost - (entry >> NODE_BITS & heuristic_mask)
+                key = keys[node]
+                if cost > best_cost.get(key, current_state):
+                    stats.duplicates += 1
+                    continue  # Stale entry, the state was reached more cheaply since it was pushed
+                if f_cost > stats.bound:
+                    stats.bound = f_cost
+                self.count_expansion()
+
+                if self.goal_state(current_state.boxes) or (known_suffixes and current_state in known_suffixes):
+                    steps = self.split_macros(tree.path(node, self.replay_step)) + self.known_suffix(current_state)
+                    if self.admissible:
+                        self.learn_bounds(best_cost, len(steps))
+                    return steps
+
+                successors = expand(current_state)
+                stats.generated += len(successors)
+                for successor, direction, step_cost in successors:
+                    new_cost = cost + step_cost  # Each move or push costs 1, a macro push all of its pushes
+                    successor_key = zobrist.step(key, current_state, successor)
+                    if unsolvable and successor_key in unsolvable:
+                        stats.duplicates += 1
+                        continue
+                    if not best_cost.improve(successor_key, new_cost, successor):
+                        stats.duplicates += 1
+                        continue
+                    known = known_suffixes.get(successor) if known_suffixes else None
+                    if known is not None:
+                        estimate = len(known[0]) - known[1]  # Exact, an optimal solution is known from here
+                    else:
+                        estimate = heuristic_cost(successor.boxes, current_state.boxes)
+                        if estimate == UNREACHABLE:
+                            continue
+                        if learned:
+                            estimate = max(estimate, learned.get(successor_key, 0))
+                    cell = (current_state.boxes & ~successor.boxes).bit_length() - 1 if push_mode else 0
+                    child = tree.add(None, node, direction, cell)
+                    keys.append(successor_key)
+                    entry = ((new_cost + estimate) << HEURISTIC_BITS | estimate) << NODE_BITS | child
+                    heappush(frontier, (entry << self.board.size | successor.boxes) << player_bits | successor.player)
+                if len(frontier) > stats.frontier_peak:
+                    stats.frontier_peak = len(frontier)
+        finally:
+            stats.collisions += best_cost.collisions
+
+        # The whole reachable space was searched without finding the goal
+        if self.admissible:
+            unsolvable.update(islice(best_cost.keys(), max(0, LEARNED_LIMIT - len(unsolvable))))
+        return None
+
+    def anytime_search(self, first_state, report):
+        """
+        Finds a first solution fast with a heavily weighted A*, then keeps improving it while time remains.
+
+        Each iteration is a weighted A* that orders the open list by g + w * h, starting from the
+        first of `self.weights`. A solution found at weight w costs at most w times the optimal one.
+        When an iteration ends, because the best solution so far is no more than any estimate left on
+        the open list, the weight is lowered and the search carries on from where it stopped instead
+        of starting over: the open list is re-ordered for the new weight, and states that were reached
+        more cheaply after being expanded in the last iteration are added back to it. The cheapest
+        cost of every state is kept in one `ClosedTable` for the whole search, and states that cannot
+        lead to a solution cheaper than the best one are dropped. With a final weight of 1 the last
+        iteration proves the solution optimal.
+
+        Heap entries are single ints as in `astar_search`, packing (weighted estimate, heuristic,
+        cost, node id, box bitmask, player cell) from the highest bits down, with the weight scaled by
+        `WEIGHT_SCALE` to keep the estimate whole.
+
+        When the search runs out of time or nodes, the best solution found so far is returned.
+
+        Args:
+            first_state (State): The state to start from, already normalized in "push" mode.
+            report (callable): Called with the steps of every better solution as it is found.
+
+        Returns:
+            list of tuples or None: (parent state, state, direction index) for each step of the best
+                                    solution, or None if no solution was found.
+        """
+        stats = self.stats
+        expand = stats.timer("successors", self.expand)
+        heuristic_cost = stats.timer("heuristic", self.heuristic_cost)
+        heappush = stats.timer("heap", heapq.heappush)
+        heappop = stats.timer("heap", heapq.heappop)
+        zobrist = self.zobrist
+        push_mode = self.mode == "push"
+        size = self.board.size
+        tree = SearchTree()
+        keys = array('Q')  # Zobrist key of every node, next to the tree
+        player_bits = size.bit_length()
+        player_mask = (1 << player_bits) - 1
+        boxes_mask = (1 << size) - 1
+        node_mask = (1 << NODE_BITS) - 1
+        field_mask = (1 << HEURISTIC_BITS) - 1
+        learned = self.learned
+        unsolvable = self.unsolvable
+
+        estimate = heuristic_cost(first_state.boxes)
+        if estimate == UNREACHABLE:
+            return None
+        tree.add(first_state)
+        keys.append(zobrist.key(first_state))
+        best_cost = ClosedTable(verify=self.verify_hashes)  # Cheapest known cost per state, across every iteration
+        best_cost.improve(keys[0], 0, first_state)
+        waiting = [(estimate, 0, 0, first_state)]  # (heuristic, cost, node, state) to put on the next open list
+        best_steps = None
+        solution_cost = UNREACHABLE
+
+        try:
+            for weight in self.weights:
+                scaled_weight = round(weight * WEIGHT_SCALE)
+                stats.weight = weight
+                frontier = []
+                queued = set()
+                for estimate, cost, node, state in waiting:
+                    key = keys[node]
+                    if key in queued or cost > best_cost.get(key, state) or cost + estimate >= solution_cost:
+                        continue  # Superseded, or cannot beat the best solution
+                    queued.add(key)
+                    entry = ((cost * WEIGHT_SCALE + scaled_weight * estimate) << HEURISTIC_BITS | estimate) << HEURISTIC_BITS | cost
+                    frontier.append(((entry << NODE_BITS | node) << size | state.boxes) << player_bits | state.player)
+                heapq.heapify(frontier)
+                expanded = set()  # Keys of the states expanded in this iteration
+                inconsistent = []  # Expanded states reached more cheaply since, for the next iteration
+
+                while frontier:
+                    packed = heappop(frontier)
+                    entry = packed >> (size + player_bits)
+                    if entry >> (NODE_BITS + 2 * HEURISTIC_BITS) >= solution_cost * WEIGHT_SCALE:
+                        heappush(frontier, packed)
+                        break  # No state left can lead to a better solution at this weight
+                    current_state = State(packed & player_mask, packed >> player_bits & boxes_mask)
+                    node = entry & node_mask
+                    cost = entry >> NODE_BITS & field_mask
+                    estimate = entry >> (NODE_BITS + HEURISTIC_BITS) & field_mask
+                    key = keys[node]
+                    if key in expanded or cost > best_cost.get(key, current_state):
+                        stats.duplicates += 1
+                        continue
+                    expanded.add(key)
+                    if cost + estimate > stats.bound:
+                        stats.bound = cost + estimate
+                    self.count_expansion()
+
+                    if self.goal_state(current_state.boxes):
+                        if cost < solution_cost:
+                            solution_cost = cost
+                            best_steps = self.split_macros(tree.path(node, self.replay_step))
+                            report(best_steps)
+                        continue
+
+                    successors = expand(current_state)
+                    stats.generated += len(successors)
+                    for successor, direction, step_cost in successors:
+                        new_cost = cost + step_cost
+                        successor_key = zobrist.step(key, current_state, successor)
+                        if unsolvable and successor_key in unsolvable:
+                            stats.duplicates += 1
+                            continue
+                        if not best_cost.improve(successor_key, new_cost, successor):
+                            stats.duplicates += 1
+                            continue
+                        estimate = heuristic_cost(successor.boxes, current_state.boxes)
+                        if learned:
+                            estimate = max(estimate, learned.get(successor_key, 0))
+                        if new_cost + estimate >= solution_cost:
+                            continue  # Unreachable, or cannot beat the best solution
+                        cell = (current_state.boxes & ~successor.boxes).bit_length() - 1 if push_mode else 0
+                        child = tree.add(None, node, direction, cell)
+                        keys.append(successor_key)
+                        if successor_key in expanded:
+                            inconsistent.append((estimate, new_cost, child, successor))
+                            continue
+                        entry = ((new_cost * WEIGHT_SCALE + scaled_weight * estimate) << HEURISTIC_BITS | estimate) << HEURISTIC_BITS | new_cost
+                        heappush(frontier, ((entry << NODE_BITS | child) << size | successor.boxes) << player_bits | successor.player)
+                    if len(frontier) > stats.frontier_peak:
+                        stats.frontier_peak = len(frontier)
+
+                # Carry the open list over to the next weight
+                waiting = inconsistent
+                for packed in frontier:
+                    entry = packed >> (size + player_bits)
+                    waiting.append((entry >> (NODE_BITS + HEURISTIC_BITS) & field_mask, entry >> NODE_BITS & field_mask,
+                                    entry & node_mask, State(packed & player_mask, packed >> player_bits & boxes_mask)))
+        except SearchStopped:
+            if best_steps is None or self.stopped == "cancelled":
+                raise
+        finally:
+            stats.collisions += best_cost.collisions
+        return best_steps
+
+    def bidirectional_search(self, first_state):
+        """
+        Searches forwards with pushes from the start and backwards with pulls from the solved states.
+
+        Each side is an A* search with its own `SearchTree`, open list and table of the cheapest cost
+        and node of every state it has reached; the forward side uses the solver's heuristic and the
+        backward side the same kind of estimate towards the starting box cells instead of the
+        targets. The side with the smaller open list is expanded next. All states are normalized the
+        same way, so a state reached by both sides joins a forward half-path to a backward one, and
+        the cheapest join seen so far is kept.
+        It is returned once neither side can still find anything cheaper: when its cost is no more
+        than the larger of the two lowest estimates left on the open lists. If one side runs out of
+        states first, the other carries on alone until the same test passes; with no join at all by
+        then, the level cannot be solved.
+
+        Args:
+            first_state (State): The normalized state to start from.
+
+        Returns:
+            list of tuples or None: (parent state, state, direction index) for each step of the
+                                    solution, or None if the goal cannot be reached.
+        """
+        if self.goal_state(first_state.boxes):
+            return []
+        stats = self.stats
+        heappush = stats.timer("heap", heapq.heappush)
+        heappop = stats.timer("heap", heapq.heappop)
+        start_cells = box_cells(first_state.boxes)
+        if self.matching is not None:
+            tables = StartTables(start_cells, [self.analysis.push_distances_from([cell]) for cell in start_cells])
+            backward_heuristic = MatchingHeuristic(tables).estimate
+        else:
+            start_distances = self.analysis.push_distances_from(start_cells)
+
+            def backward_heuristic(boxes, parent_boxes=None):
+                return sum(start_distances[cell] for cell in box_cells(boxes))
+
+        # Each side: tree, open list, state -> (cost, node), successor function, heuristic
+        forward = (SearchTree(), [], {}, stats.timer("successors", self.expand), stats.timer("heuristic", self.heuristic_cost))
+        backward = (SearchTree(), [], {}, stats.timer("successors", self.generate_pull_successors),
+                    stats.timer("heuristic", backward_heuristic))
+        for side, roots in ((forward, [first_state]), (backward, self.solved_states())):
+            tree, frontier, best, _, heuristic = side
+            for root in roots:
+                node = tree.add(root)
+                best[root] = (0, node)
+                estimate = heuristic(root.boxes)
+                heappush(frontier, (estimate, estimate, node, 0))
+
+        best_total = UNREACHABLE
+        meeting = None  # (forward node, backward node) of the cheapest join found so far
+        while forward[1] or backward[1]:
+            if meeting is None and not (forward[1] and backward[1]):
+                break
+            lowest = max(frontier[0][0] for frontier in (forward[1], backward[1]) if frontier)
+            if lowest > stats.bound:
+                stats.bound = lowest
+            if best_total <= lowest:
+                break
+            if not backward[1] or (forward[1] and len(forward[1]) <= len(backward[1])):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            tree, frontier, best, expand, heuristic = side
+            _, _, node, cost = heappop(frontier)
+            current_state = tree.states[node]
+            if cost > best[current_state][0]:
+                stats.duplicates += 1
+                continue  # Stale entry, the state was reached more cheaply since it was pushed
+            self.count_expansion()
+
+            successors = expand(current_state)
+            stats.generated += len(successors)
+            for successor, direction, step_cost in successors:
+                new_cost = cost + step_cost
+                seen = best.get(successor)
+                if seen is not None and seen[0] <= new_cost:
+                    stats.duplicates += 1
+                    continue
+                estimate = heuristic(successor.boxes, current_state.boxes)
+                if estimate == UNREACHABLE:
+                    continue
+                child = tree.add(successor, node, direction)
+                best[successor] = (new_cost, child)
+                joined = other[2].get(successor)
+                if joined is not None and new_cost + joined[0] < best_total:
+                    best_total = new_cost + joined[0]
+                    meeting = (child, joined[1]) if side is forward else (joined[1], child)
+                heappush(frontier, (new_cost + estimate, estimate, child, new_cost))
+            size = len(forward[1]) + len(backward[1])
+            if size > stats.frontier_peak:
+                stats.frontier_peak = size
+
+        if meeting is None:
+            return None
+        # The backward half runs from a solved state to the meeting state; played the other way
+        # round, each of its pulls is a push
+        forward_steps = self.split_macros(forward[0].path(meeting[0]))
+        backward_steps = backward[0].path(meeting[1])
+        return forward_steps + [(state, parent_state, direction) for parent_state, state, direction in reversed(backward_steps)]
+
+    def known_suffix(self, state):
+        """
+        Returns the rest of a known optimal solution from a state, or an empty list if there is none.
+        """
+        known = self.known_suffixes.get(state)
+        if known is None:
+            return []
+        steps, index = known
+        return steps[index:]
+
+    def remember_solution(self, first_state, steps):
+        """
+        Remembers every state along a solution with the rest of the solution from it.
+
+        Without macro pushes the searches are optimal, so the rest of the solution is also optimal
+        from each of those states, and a later search that reaches one of them can finish straight
+        away. Solutions of searches with macro pushes are not remembered, see `admissible`.
+
+        Args:
+            first_state (State): The state the solution starts from, as the search saw it.
+            steps (list of tuples): (parent state, state, direction index) for each step of the solution.
+        """
+        states = [first_state] + [state for _, state, _ in steps]
+        for index, state in enumerate(states):
+            known = self.known_suffixes.get(state)
+            if known is None or len(known[0]) - known[1] > len(steps) - index:
+                self.known_suffixes[state] = (steps, index)
+
+    def learn_bounds(self, best_cost, solution_cost):
+        """
+        Raises the remembered lower bounds from a finished A* search.
+
+        A state reached with cost g in a search whose optimal solution costs C needs at least C - g
+        more steps, otherwise a cheaper solution would have gone through it. These bounds stay
+        admissible for later searches from other positions of the level.
+
+        Args:
+            best_cost (ClosedTable): The cheapest cost each state was reached with during the search.
+            solution_cost (int): The cost of the optimal solution found.
+        """
+        learned = self.learned
+        for key, cost in best_cost.items():
+            bound = solution_cost - cost
+            if bound > learned.get(key, 0):
+                if key not in learned and len(learned) >= LEARNED_LIMIT:
+                    continue
+                learned[key] = bound
+
+    def ida_search(self, first_state):
+        """
+        Searches for the goal with IDA*, using memory that grows only with the solution depth.
+
+        Each iteration is a depth-first search that cuts off any state whose estimate is above the
+        current bound; the next bound is the smallest estimate that was cut off. Only the current
+        path is kept, plus a fixed-size transposition table in which each slot remembers the
+        Zobrist key of one state and the cheapest cost it was reached with during this iteration,
+        so most re-expansions through different move orders are skipped without memory growing.
+
+        Args:
+            first_state (State): The state to start from, already normalized in "push" mode.
+
+        Returns:
+            list of tuples or None: (parent state, state, direction index) for each step of the
+                                    solution, or None if the goal cannot be reached.
+        """
+        bound = self.heuristic_cost(first_state.boxes)
+        while bound < UNREACHABLE:
+            logger.debug("IDA* iteration with bound %s", bound)
+            self.stats.bound = bound
+            steps, bound = self.bounded_search(first_state, bound)
+            if steps is not None:
+                return steps
+        return None
+
+    def bounded_search(self, first_state, bound):
+        """
+        Runs one depth-first iteration of IDA* without recursion.
+
+        Returns:
+            tuple: The solution steps (or None) and the bound for the next iteration.
+        """
+        if self.goal_state(first_state.boxes) or first_state in self.known_suffixes:
+            return self.known_suffix(first_state), bound
+        stats = self.stats
+        known_suffixes = self.known_suffixes
+        learned = self.learned
+        unsolvable = self.unsolvable
+        expand = stats.timer("successors", self.expand)
+        heuristic_cost = stats.timer("heuristic", self.heuristic_cost)
+        zobrist = self.zobrist
+        table_size = self.table_size
+        table_keys = array('Q', bytes(8 * table_size))
+        table_costs = array('I', bytes(4 * table_size))
+        table_states = [None] * table_size if self.verify_hashes else None
+        next_bound = UNREACHABLE
+        path = [first_state]
+        path_costs = [0]
+        path_keys = [zobrist.key(first_state)]
+        on_path = {first_state}
+        directions = []
+        stack = [iter(expand(first_state))]
+        self.count_expansion()
+
+        while stack:
+            for successor, direction, step_cost in stack[-1]:
+                stats.generated += 1
+                if successor in on_path:
+                    stats.duplicates += 1
+                    continue
+                key = zobrist.step(path_keys[-1], path[-1], successor)
+                if unsolvable and key in unsolvable:
+                    stats.duplicates += 1
+                    continue
+                cost = path_costs[-1] + step_cost
+                known = known_suffixes.get(successor) if known_suffixes else None
+                if known is not None:
+                    estimate = cost + len(known[0]) - known[1]
+                else:
+                    estimate = cost + heuristic_cost(successor.boxes, path[-1].boxes)
+                    if learned:
+                        estimate = max(estimate, cost + learned.get(key, 0))
+                if estimate > bound:
+                    next_bound = min(next_bound, estimate)
+                    continue
+                slot = key % table_size
+                if table_keys[slot] == key and table_costs[slot] <= cost:
+                    if table_states is None or table_states[slot] == successor:
+                        stats.duplicates += 1
+                        continue
+                    stats.collisions += 1
+                table_keys[slot] = key
+                table_costs[slot] = cost
+                if table_states is not None:
+                    table_states[slot] = successor
+
+                path.append(successor)
+                path_costs.append(cost)
+                path_keys.append(key)
+                on_path.add(successor)
+                directions.append(direction)
+                if self.goal_state(successor.boxes) or known is not None:
+                    return self.split_macros(list(zip(path, path[1:], directions))) + self.known_suffix(successor), bound
+                stack.append(iter(expand(successor)))
+                if len(stack) > stats.frontier_peak:
+                    stats.frontier_peak = len(stack)
+                self.count_expansion()
+                break
+            else:
+                # Every successor of the deepest state has been tried, so step back
+                stack.pop()
+                on_path.discard(path.pop())
+                path_costs.pop()
+                path_keys.pop()
+                if directions:
+                    directions.pop()
+        return None, next_bound
+
+    def report_improvement(self, steps, start_state):
+        """
+        Logs a better solution found by the anytime search and hands its moves to `on_improve`.
+        """
+        logger.info("Anytime search found a solution of %d steps at weight %s after %d expanded",
+                    len(steps), self.stats.weight, self.stats.expanded)
+        if self.on_improve is not None:
+            self.on_improve(self.rebuild_path(steps, start_state), self.stats)
+
+    def solve(self, start_state):
+        """
+        Tries to find a solution to the level from the given state using the A* search algorithm,
+        or the search chosen with the solver's `algorithm`.
+
+        Both searches share the successor generator, heuristic and goal test. The priority of a
+        state is determined by the cost so far plus the heuristic cost function, and states are
+        explored until one meets the goal condition or all possibilities are exhausted. In "push"
+        mode each step of the search is one box push, and the pushes are expanded back into player
+        moves at the end.
+
+        The solver remembers what each search without macro pushes learnt about the level, so calling
+        this again from a later position, for example as a hint part-way through, costs a fraction
+        of the first solve.
+
+        When the solver has a solution cache, a stored solution for the position is returned without
+        searching, and a solution found by the search is stored for next time.
+
+        A summary of the search is logged at INFO, and at DEBUG every expanded state and the
+        player's position after each move of the solution are logged as well.
+
+        If the search runs out of its node or time budget, or is cancelled, no solution is returned
+        and `self.stopped` records why. The "anytime" search instead returns the best solution it
+        found before running out, if any, calling `on_improve` with each better one on the way; its
+        solutions are only remembered and cached once it has proven one optimal.
+
+        Args:
+            start_state (State): The player cell and box bitmask to start searching from.
+
+        Returns:
+            tuple: The solution as a list of (x, y) moves, or None if none was found, and the
+                   `SearchStats` of the search, which is also kept in `self.stats`.
+        """
+        start_state = State(*start_state)
+        first_state = self.board.normalize(start_state) if self.mode == "push" else start_state
+        self.stats = SearchStats(self.timed, self.sampler, self.sample_every)
+        self.deadlocks.pruned = self.stats.pruned = dict.fromkeys(self.deadlocks.checks, 0)
+        self.trace = logger.isEnabledFor(logging.DEBUG)
+        self.stopped = None
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        # Move-optimal solutions depend on the player's own cell, not just its region
+        exact_player = self.mode == "move"
+        pushes = self.cache.lookup(self.board, start_state, self.cache_version, exact_player) if self.cache is not None else None
+        if pushes is None and self.patterns is not None:
+            # Building the table, or waiting for a background build, may take up to half of the time
+            # budget; a cancel ends the wait, and the search then stops at its first expansion
+            self.patterns.load(max(0, self.deadline - time.perf_counter()) / 2 if self.deadline is not None else None,
+                               lambda: self.cancelled)
+        if pushes is not None:
+            self.stats.cached = True
+            path = self.expand_pushes(start_state, pushes)
+        else:
+            try:
+                if self.algorithm == "idastar":
+                    steps = self.ida_search(first_state)
+                elif self.algorithm == "bidirectional":
+                    steps = self.bidirectional_search(first_state)
+                elif self.algorithm == "anytime":
+                    steps = self.anytime_search(first_state, lambda steps: self.report_improvement(steps, start_state))
+                else:
+                    steps = self.astar_search(first_state)
+            except SearchStopped:
+                steps = None
+            # An anytime solution is only the search's best once it has finished at weight 1
+            finished = self.algorithm != "anytime" or (self.stopped is None and self.stats.weight == 1)
+            if steps is not None and finished and self.admissible:
+                self.remember_solution(first_state, steps)
+            path = self.rebuild_path(steps, start_state) if steps is not None else None
+            if path is not None and finished and self.cache is not None:
+                self.cache.store(self.board, start_state, moves_to_pushes(self.board, start_state, path), self.cache_version,
+                                 exact_player)
+        self.stats.finish(len(path) if path is not None else None, self.stopped)
+        self.stats.log()
+
+        if path is not None and self.trace:
+            # Log the final solution path and calculate player positions
+            current_player_x, current_player_y = self.board.coords(start_state.player)  # Get initial player position
+            logger.debug("Initial Player Position: (%d, %d)", current_player_x, current_player_y)
+            for x, y in path:
+                move_direction = DIRECTION_NAMES[DIRECTIONS.index((x, y))]
+                current_player_x += x
+                current_player_y += y
+                logger.debug("After moving %s, Player Position: (%d, %d)", move_direction, current_player_x, current_player_y)
+        return path, self.stats
+
+    def solve_level(self, start_state):
+        """
+        Solves the level from the given state and returns only the moves; see `solve`.
+
+        Args:
+            start_state (State): The player cell and box bitmask to start searching from.
+
+        Returns:
+            list of tuples or None: A sequence of (x, y) moves representing the solution if one
+                                    is found, otherwise None.
+        """
+        return self.solve(start_state)[0]
@@ -1,59 +1,59 @@
-# Level Generator
-# Game grid (0 = empty, 1 = wall, 2 = box, 3 = target, 4 = player)
-levels = {
-    'Level 1' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 4, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 2, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 3, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-
-    'Level 2' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 4, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 2, 3, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-    
-    'Level 3' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 4, 0, 0, 0, 0, 0, 1],
-    [1, 0, 1, 1, 0, 2, 0, 1],
-    [1, 0, 1, 3, 0, 0, 0, 1],
-    [1, 0, 1, 0, 0, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-
-    'Level 4' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [0, 0, 2, 0, 0, 0, 3, 1],
-    [1, 4, 1, 1, 0, 2, 0, 1],
-    [1, 0, 1, 3, 0, 0, 0, 1],
-    [1, 0, 1, 0, 0, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-    
-    'Level 5' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 0, 0, 0, 4, 1, 3, 1],
-    [1, 0, 0, 2, 0, 0, 0, 1],
-    [1, 0, 2, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 1, 3, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-
-    'Level 6' : [
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 3, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 0, 2, 0, 0, 1],
-    [1, 0, 4, 2, 0, 1, 1, 1],
-    [1, 0, 0, 0, 0, 0, 3, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1],
-    ],
-
-
+# Level Generator
+# Game grid (0 = empty, 1 = wall, 2 = box, 3 = target, 4 = player)
+levels = {
+    'Level 1' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 4, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 2, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 3, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+
+    'Level 2' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 4, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 2, 3, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+    
+    'Level 3' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 4, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 0, 2, 0, 1],
+    [1, 0, 1, 3, 0, 0, 0, 1],
+    [1, 0, 1, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+
+    'Level 4' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [0, 0, 2, 0, 0, 0, 3, 1],
+    [1, 4, 1, 1, 0, 2, 0, 1],
+    [1, 0, 1, 3, 0, 0, 0, 1],
+    [1, 0, 1, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+    
+    'Level 5' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 4, 1, 3, 1],
+    [1, 0, 0, 2, 0, 0, 0, 1],
+    [1, 0, 2, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 1, 3, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+
+    'Level 6' : [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 3, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 0, 2, 0, 0, 1],
+    [1, 0, 4, 2, 0, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 3, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    ],
+
+
 }
\ No newline at end of file
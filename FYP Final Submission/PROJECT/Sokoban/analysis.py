@@ -0,0 +1,140 @@
+# ----------Static per-level analysis, built once per level layout and cached----------
+#
+# Everything in here depends only on the walls and targets of a level, never on where the
+# boxes or the player are, so it is worked out once and then read by the solver as tables.
+
+from collections import OrderedDict
+from board import OPPOSITE
+from vectorized import available, distance_tables
+
+# Push distance stored for cells from which a box can never reach a target
+UNREACHABLE = float("inf")
+
+# Level layouts whose analysis is kept; beyond this the least recently used is dropped
+CACHE_LIMIT = 64
+
+# Analyses already built, keyed by `Board.key`, least recently used first
+_cache = OrderedDict()
+
+
+class LevelAnalysis:
+
+    def __init__(self, board):
+        """
+        Works out the static tables for a level.
+
+        For every target a reverse breadth-first search "pulls" a lone box away from the target,
+        giving the number of pushes needed to bring a box from each floor cell onto that target
+        when only walls are in the way. Cells that cannot reach any target this way are the simple
+        dead squares: a box pushed onto one of them can never be solved. On large levels all the
+        searches run together as NumPy array operations when it is installed, see `vectorized`.
+
+        Args:
+            board (Board): The level to analyse.
+        """
+        self.board = board
+        self.targets = board.targets
+        self.target_mask = board.target_mask
+        self.target_list = sorted(board.targets)
+
+        # push_distances[t][cell] is the pushes needed to move a box from cell onto target_list[t]
+        if available(board.size):
+            self.push_distances = distance_tables(board.neighbours, [[target] for target in self.target_list], pull=True)
+        else:
+            self.push_distances = [self.pull_distances(target) for target in self.target_list]
+        if self.push_distances:
+            self.nearest_distance = [min(column) for column in zip(*self.push_distances)]
+        else:
+            self.nearest_distance = [UNREACHABLE] * board.size
+        self.dead_squares = bytearray(distance == UNREACHABLE for distance in self.nearest_distance)
+
+    @classmethod
+    def for_board(cls, board):
+        """
+        Returns the analysis for a board, building it only the first time its layout is seen.
+
+        Loading, resetting or re-solving a level creates a new `Board` object, but the layout key
+        is the same, so the cached analysis is reused. Only the last `CACHE_LIMIT` layouts used are
+        kept, so a long session or batch does not keep every level it has seen.
+
+        Args:
+            board (Board): The level to analyse.
+
+        Returns:
+            LevelAnalysis: The shared analysis for the board's layout.
+        """
+        analysis = _cache.get(board.key)
+        if analysis is not None:
+            _cache.move_to_end(board.key)
+            return analysis
+        analysis = _cache[board.key] = cls(board)
+        if len(_cache) > CACHE_LIMIT:
+            _cache.popitem(last=False)
+        return analysis
+
+    def pull_distances(self, target):
+        """
+        Breadth-first search outwards from a target using pulls instead of pushes.
+
+        A box on cell b could have been pushed there from the cell a behind it, as long as the
+        player had room to stand behind a. Each such step is one push further from the target.
+
+        Args:
+            target (int): The target cell to measure distances to.
+
+        Returns:
+            list: Pushes needed from every cell to the target, `UNREACHABLE` where it cannot be done.
+        """
+        neighbours = self.board.neighbours
+        distances = [UNREACHABLE] * self.board.size
+        distances[target] = 0
+        frontier = [target]
+        while frontier:
+            next_frontier = []
+            for box in frontier:
+                for direction in range(4):
+                    behind_table = neighbours[OPPOSITE[direction]]
+                    previous = behind_table[box]
+                    if previous >= 0 and behind_table[previous] >= 0 and distances[previous] == UNREACHABLE:
+                        distances[previous] = distances[box] + 1
+                        next_frontier.append(previous)
+            frontier = next_frontier
+        return distances
+
+    def push_distances_from(self, sources):
+        """
+        Breadth-first search outwards from some cells using pushes, the mirror of `pull_distances`.
+
+        Only depends on where the boxes start, so it is not cached with the rest of the analysis;
+        the backward half of a bidirectional search uses it as its heuristic.
+
+        Args:
+            sources (iterable of int): The cells the boxes start on.
+
+        Returns:
+            list: Pushes needed to bring a box from the nearest source onto every cell,
+                  `UNREACHABLE` where no box can get to it.
+        """
+        if available(self.board.size):
+            return distance_tables(self.board.neighbours, [list(sources)], pull=False)[0]
+        neighbours = self.board.neighbours
+        distances = [UNREACHABLE] * self.board.size
+        frontier = list(sources)
+        for source in frontier:
+            distances[source] = 0
+        while frontier:
+            next_frontier = []
+            for box in frontier:
+                for direction in range(4):
+                    ahead = neighbours[direction][box]
+                    if ahead >= 0 and neighbours[OPPOSITE[direction]][box] >= 0 and distances[ahead] == UNREACHABLE:
+                        distances[ahead] = distances[box] + 1
+                        next_frontier.append(ahead)
+            frontier = next_frontier
+        return distances
+
+    def is_goal(self, boxes):
+        """
+        Checks in constant time whether every target holds a box.
+        """
+        return boxes == self.target_mask
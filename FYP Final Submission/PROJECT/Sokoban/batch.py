@@ -0,0 +1,167 @@
+# ----------Batch solver that runs the AI over a whole level collection in parallel----------
+#
+# Usage:
+#     python batch.py [--levels FILE.xsb] [--workers N] [--time-limit SECONDS] [--max-nodes N]
+#                     [--mode push|move] [--heuristic nearest|matching] [--algorithm astar|idastar|bidirectional|anytime]
+#                     [--patterns N] [--pattern-combine max|add] [--macros tunnel goal_room]
+#                     [--cache FILE.sqlite3]
+#
+# Each level is solved in a long-lived worker process with its own node and time budget, and a
+# line is printed for every level as soon as it finishes, with the worker's peak resident memory
+# and whether that level raised it. The exit status is 1 if any level is unsolved.
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from AIsolver import AI
+from levelfile import open_levels
+from macros import KINDS
+from solutioncache import SolutionCache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Outcome of solving one level; `stopped` says why an unsolved search gave up early or the error
+# that ended it, and `raised_peak` whether this level raised its worker's peak memory `peak_rss_kb`
+LevelResult = namedtuple("LevelResult", ["level", "solved", "moves", "nodes", "seconds", "peak_rss_kb", "raised_peak",
+                                         "stopped"])
+
+# Set in every worker process by `start_worker`
+_worker_levels = None
+
+
+def start_worker(level_collection):
+    """
+    Warms up a worker process once, before it solves any level.
+
+    The level collection is sent to each worker a single time instead of with every task, and
+    the compiled levels and per-layout analyses built while solving stay cached in the worker
+    for later tasks.
+    """
+    global _worker_levels
+    _worker_levels = level_collection
+
+
+def peak_memory_kb():
+    """
+    Returns the peak resident memory of the current process in kilobytes, if it can be measured.
+
+    This is the high-water mark over the whole life of the process, so in a worker that solved
+    other levels before it is only the current level's own if the level raised it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def solve_one(level_key, solver_options):
+    """
+    Solves a single level inside a worker process.
+
+    Args:
+        level_key (str): Key of the level in the worker's collection.
+        solver_options (dict): Keyword arguments for `AI`, including `max_nodes` and `time_limit`.
+
+    Returns:
+        LevelResult: The outcome of the search.
+    """
+    peak_before = peak_memory_kb()
+    board, start_state = _worker_levels[level_key]
+    solver = AI(board, **solver_options)
+    solution, stats = solver.solve(start_state)
+    peak = peak_memory_kb()
+    return LevelResult(
+        level_key,
+        solution is not None,
+        stats.solution_length,
+        stats.expanded,
+        stats.seconds,
+        peak,
+        peak is not None and peak > peak_before,
+        stats.stopped,
+    )
+
+
+def solve_levels(level_collection, workers=None, **solver_options):
+    """
+    Solves every level of a collection across a pool of worker processes.
+
+    The workers live for the whole batch, so each one starts and loads the collection only once.
+    Results are yielded in the order the levels finish. A level that fails with an error, for
+    example one that cannot be parsed, is reported unsolved with the error instead of ending the
+    batch. Closing the generator early (for example on Ctrl+C) cancels the levels that have not
+    started yet.
+
+    Args:
+        level_collection (GridCollection or XsbCollection): The levels to solve, see `levelfile`.
+        workers (int, optional): Number of worker processes, one per core by default.
+        **solver_options: Keyword arguments for `AI`, such as `time_limit`, `max_nodes` or `mode`.
+
+    Yields:
+        LevelResult: The outcome of each level.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=start_worker, initargs=(level_collection,))
+    try:
+        futures = {executor.submit(solve_one, key, solver_options): key for key in level_collection}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error:
+                yield LevelResult(futures[future], False, None, 0, 0.0, None, False, f"error: {error}")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main(argv=None):
+    """
+    Command line entry point: solves a level collection and prints a line per level.
+    """
+    parser = argparse.ArgumentParser(description="Solve every Sokoban level in parallel.")
+    parser.add_argument("--levels", default=None, help="XSB/.sok collection (default: Levels.py)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds allowed per level")
+    parser.add_argument("--max-nodes", type=int, default=None, help="nodes allowed per level")
+    parser.add_argument("--mode", choices=("push", "move"), default="push")
+    parser.add_argument("--heuristic", choices=("nearest", "matching"), default="nearest")
+    parser.add_argument("--algorithm", choices=("astar", "idastar", "bidirectional", "anytime"), default="astar")
+    parser.add_argument("--patterns", type=int, default=0, help="boxes per pattern-database group, 0 for none")
+    parser.add_argument("--pattern-combine", choices=("max", "add"), default="max")
+    parser.add_argument("--macros", nargs="*", choices=KINDS, default=[],
+                        help="macro pushes to make; goal_room can lengthen solutions (default: none)")
+    parser.add_argument("--cache", default=None, help="solution cache to reuse and fill (default: none)")
+    args = parser.parse_args(argv)
+
+    solver_options = {
+        "mode": args.mode,
+        "heuristic": args.heuristic,
+        "algorithm": args.algorithm,
+        "patterns": args.patterns,
+        "pattern_combine": args.pattern_combine,
+        "macros": tuple(args.macros),
+        "time_limit": args.time_limit,
+        "max_nodes": args.max_nodes,
+        "cache": SolutionCache(args.cache) if args.cache else None,
+    }
+    levels = open_levels(args.levels)
+    unsolved = 0
+    for result in solve_levels(levels, args.workers, **solver_options):
+        if result.solved:
+            outcome = f"solved in {result.moves} moves"
+        else:
+            unsolved += 1
+            outcome = f"unsolved ({result.stopped or 'no solution'})"
+        peak = "raised by this level" if result.raised_peak else "set by an earlier level"
+        print(f"{result.level}: {outcome}, {result.nodes} nodes, {result.seconds:.3f}s, "
+              f"worker peak RSS {result.peak_rss_kb} KB ({peak})")
+    print(f"{len(levels) - unsolved}/{len(levels)} levels solved")
+    return 1 if unsolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
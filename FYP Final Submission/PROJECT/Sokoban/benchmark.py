@@ -0,0 +1,213 @@
+# ----------Reproducible solver benchmark with a stored baseline----------
+#
+# Usage:
+#     python benchmark.py [--corpus FILE] [--output results.json] [--baseline baseline.json]
+#                         [--threshold 0.10] [--repeat 3] [--time-limit SECONDS] [--max-nodes N]
+#                         [--mode push|move] [--heuristic nearest|matching] [--algorithm astar|idastar|bidirectional|anytime]
+#                         [--patterns N] [--pattern-combine max|add] [--macros tunnel goal_room]
+#                         [--timed]
+#
+# Every level of `Levels.levels` and of the bundled corpus is solved in a fresh process, one at
+# a time, so the timings are not disturbed by other work and the peak memory belongs to that
+# level alone. The results are written as JSON. When a baseline file is given, any level that
+# is now unsolved, or that is slower or expands more nodes than the threshold allows, is listed
+# and the exit status is 1. A baseline recorded with other solver options is not compared at all,
+# as its differences would say nothing about the solver; the options that differ are listed and
+# the exit status is 2.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from AIsolver import AI
+from batch import peak_memory_kb
+from levelfile import open_levels
+from macros import KINDS
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "level_sets", "benchmark.xsb")
+
+# Timings below this many seconds are too short to compare reliably against the baseline
+MIN_SECONDS = 0.05
+
+
+def measure_level(level_collection, name, solver_options):
+    """
+    Solves one level and records its measurements; runs in its own worker process.
+
+    Args:
+        level_collection (GridCollection or XsbCollection): The collection holding the level.
+        name (str): Level name.
+        solver_options (dict): Keyword arguments for `AI`.
+
+    Returns:
+        dict: The measurements for the level.
+    """
+    board, start_state = level_collection[name]
+    solver = AI(board, **solver_options)
+    solution, stats = solver.solve(start_state)
+    result = {
+        "level": name,
+        "solved": solution is not None,
+        "solution_length": stats.solution_length,
+        "seconds": stats.seconds,
+        "nodes_expanded": stats.expanded,
+        "nodes_generated": stats.generated,
+        "nodes_per_second": stats.nodes_per_second,
+        "duplicates": stats.duplicates,
+        "pruned": stats.pruned,
+        "frontier_peak": stats.frontier_peak,
+        "peak_rss_kb": peak_memory_kb(),
+        "stopped": stats.stopped,
+    }
+    if stats.timed:
+        result["timers"] = stats.timers
+    return result
+
+
+def run_benchmark(level_sets, solver_options, repeat=1):
+    """
+    Measures every level, keeping the fastest of `repeat` runs.
+
+    Each run happens in a new single-use worker process.
+
+    Args:
+        level_sets (list): Level collections opened with `levelfile.open_levels`.
+        solver_options (dict): Keyword arguments for `AI`.
+        repeat (int): How many times each level is solved.
+
+    Returns:
+        list of dict: The measurements of every level, in order.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for level_collection in level_sets:
+            for name in level_collection.keys():
+                runs = [executor.submit(measure_level, level_collection, name, solver_options).result()
+                        for _ in range(repeat)]
+                best = min(runs, key=lambda run: run["seconds"])
+                results.append(best)
+                print(f"{name}: {'solved' if best['solved'] else 'unsolved'}, {best['nodes_expanded']} nodes, "
+                      f"{best['seconds']:.3f}s, frontier {best['frontier_peak']}, peak {best['peak_rss_kb']} KB")
+    return results
+
+
+def option_differences(solver_options, baseline_options):
+    """
+    Lists the solver options a baseline was recorded with that differ from the current ones.
+
+    Args:
+        solver_options (dict): Keyword arguments for `AI` of the current run.
+        baseline_options (dict or None): The "solver_options" of the baseline report.
+
+    Returns:
+        list of str: A description of every option that differs, empty if the runs are comparable.
+    """
+    current = json.loads(json.dumps(solver_options))  # Tuples are read back from JSON as lists
+    baseline_options = baseline_options or {}
+    return [f"{option}: {baseline_options.get(option)!r} in the baseline, {current.get(option)!r} now"
+            for option in sorted(set(current) | set(baseline_options))
+            if current.get(option) != baseline_options.get(option)]
+
+
+def compare(results, baseline, threshold):
+    """
+    Lists the levels that got worse compared to a baseline run.
+
+    Args:
+        results (list of dict): Measurements of the current run.
+        baseline (list of dict): Measurements of the baseline run.
+        threshold (float): Allowed relative increase, for example 0.1 for 10%.
+
+    Returns:
+        list of str: A description of every regression found.
+    """
+    regressions = []
+    current = {result["level"]: result for result in results}
+    for before in baseline:
+        after = current.get(before["level"])
+        if after is None:
+            continue
+        if before["solved"] and not after["solved"]:
+            regressions.append(f"{before['level']}: no longer solved ({after['stopped'] or 'no solution'})")
+            continue
+        if not after["solved"]:
+            continue
+        if after["nodes_expanded"] > before["nodes_expanded"] * (1 + threshold):
+            regressions.append(f"{before['level']}: nodes expanded {before['nodes_expanded']} -> {after['nodes_expanded']}")
+        if after["seconds"] > MIN_SECONDS and after["seconds"] > before["seconds"] * (1 + threshold):
+            regressions.append(f"{before['level']}: time {before['seconds']:.3f}s -> {after['seconds']:.3f}s")
+    return regressions
+
+
+def main(argv=None):
+    """
+    Command line entry point: runs the benchmark, writes the results and checks the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Sokoban solver.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="XSB collection solved after Levels.py")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--baseline", default=None, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per level, the fastest is kept")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds allowed per level")
+    parser.add_argument("--max-nodes", type=int, default=None, help="nodes allowed per level")
+    parser.add_argument("--mode", choices=("push", "move"), default="push")
+    parser.add_argument("--heuristic", choices=("nearest", "matching"), default="nearest")
+    parser.add_argument("--algorithm", choices=("astar", "idastar", "bidirectional", "anytime"), default="astar")
+    parser.add_argument("--patterns", type=int, default=0, help="boxes per pattern-database group, 0 for none")
+    parser.add_argument("--pattern-combine", choices=("max", "add"), default="max")
+    parser.add_argument("--macros", nargs="*", choices=KINDS, default=[],
+                        help="macro pushes to make; goal_room can lengthen solutions (default: none)")
+    parser.add_argument("--timed", action="store_true", help="also record successor, heuristic and heap times")
+    args = parser.parse_args(argv)
+
+    solver_options = {
+        "mode": args.mode,
+        "heuristic": args.heuristic,
+        "algorithm": args.algorithm,
+        "patterns": args.patterns,
+        "pattern_combine": args.pattern_combine,
+        "macros": tuple(args.macros),
+        "time_limit": args.time_limit,
+        "max_nodes": args.max_nodes,
+        "timed": args.timed,
+    }
+    level_sets = [open_levels()]
+    if args.corpus:
+        level_sets.append(open_levels(args.corpus))
+    results = run_benchmark(level_sets, solver_options, args.repeat)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "solver_options": solver_options,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        differences = option_differences(solver_options, baseline.get("solver_options"))
+        if differences:
+            print(f"Not comparing against {args.baseline}, it was recorded with other solver options:")
+            for difference in differences:
+                print(f"  {difference}")
+            return 2
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+# ----------Headless board engine shared by the game and the AI solver----------
+#
+# The static parts of a level (walls and targets) are stored once per level as flat arrays
+# indexed by cell number, where cell = y * width + x. The dynamic state is only the player's
+# cell and a bitmask of the cells holding boxes, so it is small, hashable and cheap to copy.
+# Nothing in this module imports pygame, so levels can be solved without a display.
+
+import hashlib
+from collections import namedtuple
+
+# Grid tile values used by the levels in Levels.py
+EMPTY, WALL, BOX, TARGET, PLAYER = 0, 1, 2, 3, 4
+
+# Characters of the standard XSB/.sok level format
+XSB_WALL, XSB_PLAYER, XSB_PLAYER_ON_TARGET = "#", "@", "+"
+XSB_BOX, XSB_BOX_ON_TARGET, XSB_TARGET = "$", "*", "."
+
+# Movement directions as (dx, dy) offsets, referred to everywhere else by their index
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DIRECTION_NAMES = ("Up", "Down", "Left", "Right")
+DIRECTION_INDEX = {offset: index for index, offset in enumerate(DIRECTIONS)}
+OPPOSITE = (1, 0, 3, 2)
+
+# Dynamic state: the player's cell and a bitmask with bit n set when cell n holds a box
+State = namedtuple("State", ["player", "boxes"])
+
+
+def box_cells(boxes):
+    """
+    Lists the cells that hold a box in a box bitmask.
+
+    Args:
+        boxes (int): Bitmask with bit n set when cell n holds a box.
+
+    Returns:
+        list of int: The box cells in ascending order.
+    """
+    cells = []
+    while boxes:
+        lowest = boxes & -boxes
+        cells.append(lowest.bit_length() - 1)
+        boxes ^= lowest
+    return cells
+
+
+class Board:
+
+    def __init__(self, width, height, walls, targets):
+        """
+        Builds the static description of a level.
+
+        Along with the wall and target arrays, a neighbour table is built for every direction,
+        holding the cell reached by stepping from each cell, or -1 when that step would leave
+        the level or enter a wall. Checking a move is then a single list lookup. On large levels
+        the tables are built with NumPy when it is installed, see `vectorized`.
+
+        Args:
+            width (int): Number of columns in the level.
+            height (int): Number of rows in the level.
+            walls (iterable of int): Cells that are walls.
+            targets (iterable of int): Cells that are targets.
+        """
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.walls = bytearray(self.size)
+        for cell in walls:
+            self.walls[cell] = 1
+        self.targets = frozenset(targets)
+        self.target_mask = 0
+        for cell in self.targets:
+            self.target_mask |= 1 << cell
+
+        # Identifies the static layout, so per-level data can be cached across loads and resets
+        layout = bytes(self.walls) + b"|" + ",".join(map(str, sorted(self.targets))).encode()
+        self.key = hashlib.sha1(f"{width}x{height}|".encode() + layout).hexdigest()
+
+        from vectorized import available, neighbour_tables
+        if available(self.size):
+            self.neighbours = neighbour_tables(width, height, self.walls)
+            return
+        self.neighbours = []
+        for dx, dy in DIRECTIONS:
+            table = [-1] * self.size
+            for cell in range(self.size):
+                x, y = cell % width + dx, cell // width + dy
+                if not self.walls[cell] and 0 <= x < width and 0 <= y < height and not self.walls[y * width + x]:
+                    table[cell] = y * width + x
+            self.neighbours.append(table)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Creates a board and its starting state from a grid of tile values.
+
+        Rows may have different lengths; any cell missing from a short row is treated as a wall,
+        as is everything outside the grid.
+
+        Args:
+            grid (list of lists): Level rows using the tile values from Levels.py.
+
+        Returns:
+            tuple: The `Board` and the starting `State` of the level.
+        """
+        height = len(grid)
+        width = max(len(row) for row in grid)
+        walls, targets = [], []
+        player, boxes = None, 0
+        for y in range(height):
+            for x in range(width):
+                cell = y * width + x
+                tile = grid[y][x] if x < len(grid[y]) else WALL
+                if tile == WALL:
+                    walls.append(cell)
+                elif tile == BOX:
+                    boxes |= 1 << cell
+                elif tile == TARGET:
+                    targets.append(cell)
+                elif tile == PLAYER and player is None:
+                    player = cell
+        if player is None:
+            player = width + 1  # Default position if not found
+        return cls(width, height, walls, targets), State(player, boxes)
+
+    @classmethod
+    def from_xsb(cls, lines):
+        """
+        Creates a board and its starting state from a level in the standard XSB/.sok format.
+
+        Floor outside the level's outer walls cannot be reached by the player, so any cell that
+        a flood-fill from the player does not reach is turned into a wall. Large levels are read
+        with NumPy tile masks and a mask flood-fill when it is installed, see `vectorized`.
+
+        Args:
+            lines (list of str): The rows of the level, without any title or comment lines.
+
+        Returns:
+            tuple: The `Board` and the starting `State` of the level.
+        """
+        rows = [line.rstrip("\r\n") for line in lines]
+        height = len(rows)
+        width = max(len(row) for row in rows)
+        from vectorized import available
+        if available(width * height):
+            return cls.from_xsb_masks(rows, width, height)
+        walls = bytearray(width * height)
+        targets = []
+        player, boxes = None, 0
+        for y, row in enumerate(rows):
+            for x in range(width):
+                cell = y * width + x
+                char = row[x] if x < len(row) else " "
+                if char == XSB_WALL:
+                    walls[cell] = 1
+                if char in (XSB_TARGET, XSB_BOX_ON_TARGET, XSB_PLAYER_ON_TARGET):
+                    targets.append(cell)
+                if char in (XSB_BOX, XSB_BOX_ON_TARGET):
+                    boxes |= 1 << cell
+                if char in (XSB_PLAYER, XSB_PLAYER_ON_TARGET):
+                    player = cell
+        if player is None:
+            raise ValueError("Level has no player")
+
+        # Flood-fill from the player through everything that is not a wall
+        inside = {player}
+        stack = [player]
+        while stack:
+            cell = stack.pop()
+            x, y = cell % width, cell // width
+            for dx, dy in DIRECTIONS:
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    next_cell = cell + dy * width + dx
+                    if not walls[next_cell] and next_cell not in inside:
+                        inside.add(next_cell)
+                        stack.append(next_cell)
+        outside = [cell for cell in range(width * height) if cell not in inside]
+        return cls(width, height, outside, targets), State(player, boxes)
+
+    @classmethod
+    def from_xsb_masks(cls, rows, width, height):
+        """
+        The NumPy version of `from_xsb`, giving the same board for large levels.
+        """
+        from vectorized import flood_fill, np, read_xsb
+        masks = read_xsb(rows, width)
+        players = np.flatnonzero(masks["player"])
+        if not len(players):
+            raise ValueError("Level has no player")
+        player = int(players[-1])  # The last player in reading order, as in `from_xsb`
+        inside = flood_fill(~masks["wall"], (player % width, player // width))
+        boxes = 0
+        for cell in np.flatnonzero(masks["box"]).tolist():
+            boxes |= 1 << cell
+        outside = np.flatnonzero(~inside).tolist()
+        targets = np.flatnonzero(masks["target"]).tolist()
+        return cls(width, height, outside, targets), State(player, boxes)
+
+    def index(self, x, y):
+        """
+        Converts grid coordinates into a cell number.
+        """
+        return y * self.width + x
+
+    def coords(self, cell):
+        """
+        Converts a cell number into (x, y) grid coordinates.
+        """
+        return cell % self.width, cell // self.width
+
+    def move(self, state, direction):
+        """
+        Applies a single player step, pushing a box if one is in the way.
+
+        Args:
+            state (State): The state to move from.
+            direction (int): Index into `DIRECTIONS`.
+
+        Returns:
+            State or None: The resulting state, or None if the step is blocked by a wall, by the
+                           edge of the level, or by a box that cannot be pushed.
+        """
+        table = self.neighbours[direction]
+        new_player = table[state.player]
+        if new_player < 0:
+            return None
+        boxes = state.boxes
+        if boxes >> new_player & 1:
+            new_box = table[new_player]
+            if new_box < 0 or boxes >> new_box & 1:
+                return None
+            boxes ^= (1 << new_player) | (1 << new_box)
+        return State(new_player, boxes)
+
+    def reachable(self, player, boxes):
+        """
+        Flood-fills the cells the player can walk to without pushing any box.
+
+        Args:
+            player (int): The player's cell.
+            boxes (int): Bitmask of the cells holding boxes.
+
+        Returns:
+            set of int: Every cell reachable by the player, including the player's own cell.
+        """
+        seen = {player}
+        stack = [player]
+        neighbours = self.neighbours
+        while stack:
+            cell = stack.pop()
+            for table in neighbours:
+                next_cell = table[cell]
+                if next_cell >= 0 and next_cell not in seen and not boxes >> next_cell & 1:
+                    seen.add(next_cell)
+                    stack.append(next_cell)
+        return seen
+
+    def normalize(self, state):
+        """
+        Moves the player to the top-left-most cell of the region it can reach.
+
+        States that only differ by where the player stands inside the same floor region
+        then compare equal, which is what a push-level search needs.
+
+        Returns:
+            State: The same boxes with the player on its canonical cell.
+        """
+        return State(min(self.reachable(state.player, state.boxes)), state.boxes)
+
+    def player_path(self, start, goal, boxes):
+        """
+        Finds the shortest walk between two cells that does not push any box.
+
+        Args:
+            start (int): The cell the player starts on.
+            goal (int): The cell the player has to reach.
+            boxes (int): Bitmask of the cells holding boxes.
+
+        Returns:
+            list of int or None: Direction indexes for each step, or None if the goal cannot be reached.
+        """
+        came_from = {start: None}
+        frontier = [start]
+        while frontier and goal not in came_from:
+            next_frontier = []
+            for cell in frontier:
+                for direction, table in enumerate(self.neighbours):
+                    next_cell = table[cell]
+                    if next_cell >= 0 and next_cell not in came_from and not boxes >> next_cell & 1:
+                        came_from[next_cell] = (cell, direction)
+                        next_frontier.append(next_cell)
+            frontier = next_frontier
+        if goal not in came_from:
+            return None
+        steps = []
+        cell = goal
+        while came_from[cell] is not None:
+            cell, direction = came_from[cell]
+            steps.append(direction)
+        steps.reverse()
+        return steps
+
+    def is_solved(self, boxes):
+        """
+        Checks whether every target is covered by a box.
+        """
+        return boxes == self.target_mask
+
+    def remaining_targets(self, boxes):
+        """
+        Counts the targets that do not have a box on them yet.
+        """
+        return (self.target_mask & ~boxes).bit_count()
+
+    def to_grid(self, state):
+        """
+        Rebuilds a grid of tile values for the given state, mainly for printing.
+
+        A box standing on a target is shown as a box.
+
+        Returns:
+            list of lists: Level rows using the tile values from Levels.py.
+        """
+        grid = []
+        for y in range(self.height):
+            row = []
+            for x in range(self.width):
+                cell = y * self.width + x
+                if self.walls[cell]:
+                    row.append(WALL)
+                elif state.boxes >> cell & 1:
+                    row.append(BOX)
+                elif cell == state.player:
+                    row.append(PLAYER)
+                elif cell in self.targets:
+                    row.append(TARGET)
+                else:
+                    row.append(EMPTY)
+            grid.append(row)
+        return grid
+
+    def to_xsb(self, state):
+        """
+        Writes the level in the given state as the rows of a standard XSB/.sok level.
+
+        Only walls that touch the floor, across an edge or a corner, are written; the rest of the
+        solid rock is left blank, as in hand-made collections.
+
+        Returns:
+            list of str: The rows of the level, without trailing spaces.
+        """
+        width, height = self.width, self.height
+        rows = []
+        for y in range(height):
+            row = []
+            for x in range(width):
+                cell = y * width + x
+                on_target = cell in self.targets
+                if self.walls[cell]:
+                    touches_floor = any(
+                        0 <= x + dx < width and 0 <= y + dy < height and not self.walls[cell + dy * width + dx]
+                        for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    )
+                    row.append(XSB_WALL if touches_floor else " ")
+                elif state.boxes >> cell & 1:
+                    row.append(XSB_BOX_ON_TARGET if on_target else XSB_BOX)
+                elif cell == state.player:
+                    row.append(XSB_PLAYER_ON_TARGET if on_target else XSB_PLAYER)
+                else:
+                    row.append(XSB_TARGET if on_target else "-")
+            rows.append("".join(row).rstrip())
+        return rows
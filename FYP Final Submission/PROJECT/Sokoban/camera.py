@@ -0,0 +1,111 @@
+# ----------Scrolling, zoomable view of a level that is larger than the window----------
+#
+# The camera only works in pixels and tiles, so nothing here needs a display. The game asks it
+# where a tile is on screen and which tiles can be seen, and only draws those, so drawing a frame
+# costs the same however large the level is.
+
+# Limits of the tile size, in pixels
+MIN_TILE_SIZE, MAX_TILE_SIZE = 8, 120
+
+# Tiles kept between the player and the edge of the view before it scrolls
+MARGIN = 2
+
+
+class Camera:
+
+    def __init__(self, columns, rows, view_width, view_height, tile_size):
+        """
+        Sets up the view of a level.
+
+        Levels that fit in the view at `tile_size` are shown at that size from the top-left
+        corner. Larger levels are zoomed out until they fit, down to `MIN_TILE_SIZE`, and the view
+        then scrolls to follow the player.
+
+        Args:
+            columns (int): Width of the level in tiles.
+            rows (int): Height of the level in tiles.
+            view_width (int): Width of the screen area the level is drawn in, in pixels.
+            view_height (int): Height of the screen area the level is drawn in, in pixels.
+            tile_size (float): The largest tile size to start at, in pixels.
+        """
+        self.columns = columns
+        self.rows = rows
+        self.view_width = view_width
+        self.view_height = view_height
+        fitted = min(tile_size, view_width // columns, view_height // rows)
+        self.tile_size = min(max(fitted, MIN_TILE_SIZE), MAX_TILE_SIZE)
+        self.left = 0  # Pixel offset of the view into the level
+        self.top = 0
+
+    def follow(self, x, y):
+        """
+        Scrolls the view so the tile at (x, y) is at least `MARGIN` tiles inside it.
+
+        Returns:
+            bool: True if the view moved.
+        """
+        size = self.tile_size
+        left = self.scroll(self.left, x * size, self.view_width, self.columns * size)
+        top = self.scroll(self.top, y * size, self.view_height, self.rows * size)
+        if (left, top) == (self.left, self.top):
+            return False
+        self.left, self.top = left, top
+        return True
+
+    def scroll(self, offset, position, view, level):
+        """
+        Works out the new offset of the view along one axis.
+
+        Args:
+            offset (int): The current offset of the view.
+            position (int): Pixel position of the tile to keep in view.
+            view (int): Size of the view.
+            level (int): Size of the whole level.
+
+        Returns:
+            int: The offset that keeps the tile in view without showing past the level's edge.
+        """
+        size = self.tile_size
+        margin = min(MARGIN, (view // size - 1) // 2) * size  # Small views keep the tile in the middle
+        offset = min(offset, position - margin)
+        offset = max(offset, position + size + margin - view)
+        return max(0, min(offset, level - view))
+
+    def zoom(self, factor):
+        """
+        Multiplies the tile size by a factor, keeping it within its limits.
+
+        The view keeps the same part of the level at its top-left corner; `follow` should be
+        called after it to bring the player back into view.
+
+        Returns:
+            bool: True if the tile size changed.
+        """
+        size = min(max(round(self.tile_size * factor), MIN_TILE_SIZE), MAX_TILE_SIZE)
+        if size == self.tile_size:
+            return False
+        self.left = self.left * size // self.tile_size
+        self.top = self.top * size // self.tile_size
+        self.tile_size = size
+        return True
+
+    def screen_position(self, x, y):
+        """
+        Returns the top-left pixel of the tile at (x, y), relative to the view.
+        """
+        return x * self.tile_size - self.left, y * self.tile_size - self.top
+
+    def visible_range(self):
+        """
+        The tiles that can be seen, at least partly.
+
+        Returns:
+            tuple: (first column, first row, last column + 1, last row + 1).
+        """
+        size = self.tile_size
+        return (
+            self.left // size,
+            self.top // size,
+            min(self.columns, -(-(self.left + self.view_width) // size)),
+            min(self.rows, -(-(self.top + self.view_height) // size)),
+        )
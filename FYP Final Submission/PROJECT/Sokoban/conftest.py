@@ -0,0 +1,111 @@
+# ----------Shared fixtures of the tests: small levels and their optimal solutions by plain BFS----------
+#
+# The solver's searches are checked against an exhaustive breadth-first search, which is too slow
+# for real levels but certainly optimal on small ones. The small levels are the built-in grids
+# and a fixed set of generated rooms, so every run checks the same positions.
+
+import random
+from collections import deque
+import pytest
+from board import DIRECTION_INDEX, OPPOSITE, State, box_cells
+from generator import random_level
+from levelfile import open_levels
+
+# Seeds of the generated levels the searches are checked on
+LEVEL_SEEDS = range(12)
+
+# Fewest pushes a generated level needs, so the searches have some choices to get wrong
+MIN_PUSHES = 6
+
+
+def bfs_pushes(board, state, stop_at_goal=True):
+    """
+    Finds the fewest pushes that solve a level by breadth-first search over every push.
+
+    Args:
+        board (Board): The level.
+        state (State): The position to start from.
+        stop_at_goal (bool): False searches on past the goal, to count every reachable state.
+
+    Returns:
+        int or None: The optimal number of pushes, or None if the level cannot be solved. With
+                     `stop_at_goal` False, the number of normalized states reachable instead.
+    """
+    neighbours = board.neighbours
+    first = board.normalize(state)
+    seen = {first}
+    frontier = deque([(first, 0)])
+    while frontier:
+        current, pushes = frontier.popleft()
+        if stop_at_goal and board.is_solved(current.boxes):
+            return pushes
+        reach = board.reachable(current.player, current.boxes)
+        for box in box_cells(current.boxes):
+            for direction in range(4):
+                ahead = neighbours[direction][box]
+                if neighbours[OPPOSITE[direction]][box] in reach and ahead >= 0 and not current.boxes >> ahead & 1:
+                    successor = board.normalize(State(box, current.boxes ^ (1 << box) ^ (1 << ahead)))
+                    if successor not in seen:
+                        seen.add(successor)
+                        frontier.append((successor, pushes + 1))
+    return None if stop_at_goal else len(seen)
+
+
+def bfs_moves(board, state):
+    """
+    Finds the fewest player moves that solve a level by breadth-first search over every move.
+
+    Returns:
+        int or None: The optimal number of moves, or None if the level cannot be solved.
+    """
+    seen = {state}
+    frontier = deque([(state, 0)])
+    while frontier:
+        current, moves = frontier.popleft()
+        if board.is_solved(current.boxes):
+            return moves
+        for direction in range(4):
+            successor = board.move(current, direction)
+            if successor is not None and successor not in seen:
+                seen.add(successor)
+                frontier.append((successor, moves + 1))
+    return None
+
+
+def replay(board, state, moves):
+    """
+    Plays a solution of (x, y) moves, checking every move is legal and the level ends solved.
+
+    Returns:
+        int: The number of pushes the solution makes.
+    """
+    pushes = 0
+    for move in moves:
+        successor = board.move(state, DIRECTION_INDEX[move])
+        assert successor is not None, f"illegal move {move}"
+        pushes += successor.boxes != state.boxes
+        state = successor
+    assert board.is_solved(state.boxes)
+    return pushes
+
+
+@pytest.fixture(scope="session")
+def small_levels():
+    """
+    The built-in levels and the generated ones, each as (name, board, start state, optimal pushes).
+    """
+    levels = []
+    built_in = open_levels()
+    for name in built_in.keys():
+        board, state = built_in[name]
+        levels.append((name, board, state, bfs_pushes(board, state)))
+    for seed in LEVEL_SEEDS:
+        rng = random.Random(seed)
+        optimal = 0
+        while optimal < MIN_PUSHES:
+            level = random_level(6, 6, 3, 60, rng)
+            if level is not None:
+                board, state = level
+                optimal = bfs_pushes(board, state)
+        levels.append((f"generated {seed}", board, state, optimal))
+    return levels
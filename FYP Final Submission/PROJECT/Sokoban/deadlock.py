@@ -0,0 +1,180 @@
+# ----------Deadlock detection run after every box push----------
+#
+# A deadlock is a position from which the level can no longer be solved, however the player
+# moves. Pruning them as soon as the push is generated stops the search from exploring every
+# descendant of a dead state.
+
+from collections import OrderedDict
+from board import OPPOSITE, box_cells
+
+# The checks that can be switched on, in the order they are tried (cheapest first)
+CHECKS = ("dead_square", "freeze", "corral")
+
+# Radius of the box pattern around the pushed box that the freeze check is allowed to look at
+WINDOW_RADIUS = 2
+
+
+class DeadlockDetector:
+
+    def __init__(self, analysis, checks=("dead_square", "freeze"), cache_size=100000):
+        """
+        Prepares the deadlock checks for a level.
+
+        Args:
+            analysis (LevelAnalysis): Supplies the board, targets and simple dead squares.
+            checks (iterable of str): Which of `CHECKS` to run.
+            cache_size (int): How many local box patterns the freeze check remembers.
+        """
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"Unknown deadlock checks: {sorted(unknown)}")
+        self.analysis = analysis
+        self.board = analysis.board
+        self.checks = [check for check in CHECKS if check in checks]
+        self.cache_size = cache_size
+        self.patterns = OrderedDict()
+        self.pruned = dict.fromkeys(self.checks, 0)
+
+        # window_masks[cell] covers the cells around `cell` that a freeze check may depend on
+        self.window_masks = []
+        width, height = self.board.width, self.board.height
+        for cell in range(self.board.size):
+            x, y = self.board.coords(cell)
+            mask = 0
+            for window_y in range(max(0, y - WINDOW_RADIUS), min(height, y + WINDOW_RADIUS + 1)):
+                for window_x in range(max(0, x - WINDOW_RADIUS), min(width, x + WINDOW_RADIUS + 1)):
+                    mask |= 1 << (window_y * width + window_x)
+            self.window_masks.append(mask)
+
+    def is_deadlock(self, boxes, box, player):
+        """
+        Runs the enabled checks on the position left by a push.
+
+        Each deadlock found is counted against the check that found it in `pruned`.
+
+        Args:
+            boxes (int): Box bitmask after the push.
+            box (int): The cell the pushed box ended up on.
+            player (int): The player's cell after the push.
+
+        Returns:
+            bool: True if the position can no longer be solved.
+        """
+        for check in self.checks:
+            if check == "dead_square":
+                found = self.analysis.dead_squares[box]
+            elif check == "freeze":
+                found = self.freeze_deadlock(boxes, box)
+            else:
+                found = self.corral_deadlock(boxes, player)
+            if found:
+                self.pruned[check] += 1
+                return True
+        return False
+
+    def freeze_deadlock(self, boxes, box):
+        """
+        Checks whether the pushed box is frozen off a target.
+
+        A box is frozen when it can be moved along neither axis. Along an axis it is blocked by a
+        wall on either side, by dead squares on both sides, or by a neighbouring box that is itself
+        frozen; boxes already being checked count as walls so that the recursion ends. This covers
+        2x2 blocks of boxes and walls as well as rows of boxes frozen against a wall. Only a frozen
+        group with a box off its target is a deadlock.
+
+        The answer only depends on the boxes inside a small window around the pushed box, so it is
+        memoized by that local pattern in a bounded least-recently-used cache.
+
+        Args:
+            boxes (int): Box bitmask after the push.
+            box (int): The cell the pushed box ended up on.
+
+        Returns:
+            bool: True if the box is part of a frozen group that is not fully on targets.
+        """
+        local = boxes & self.window_masks[box]
+        key = (box, local)
+        found = self.patterns.get(key)
+        if found is not None:
+            self.patterns.move_to_end(key)
+            return found
+
+        frozen = []
+        found = self.is_frozen(box, local, set(), frozen) and any(cell not in self.analysis.targets for cell in frozen)
+        self.patterns[key] = found
+        if len(self.patterns) > self.cache_size:
+            self.patterns.popitem(last=False)
+        return found
+
+    def is_frozen(self, box, boxes, checking, frozen):
+        """
+        Recursive part of the freeze check, collecting every frozen box in `frozen`.
+        """
+        checking.add(box)
+        up, down, left, right = (table[box] for table in self.board.neighbours)
+        if self.axis_blocked(left, right, boxes, checking, frozen) and self.axis_blocked(up, down, boxes, checking, frozen):
+            frozen.append(box)
+            return True
+        return False
+
+    def axis_blocked(self, before, after, boxes, checking, frozen):
+        """
+        Checks whether a box with the given neighbours cannot be pushed along that axis.
+        """
+        # A wall (or the edge of the level) on either side
+        if before < 0 or after < 0 or before in checking or after in checking:
+            return True
+        # Pushing either way would leave the box on a dead square
+        dead_squares = self.analysis.dead_squares
+        if dead_squares[before] and dead_squares[after]:
+            return True
+        for neighbour in (before, after):
+            if boxes >> neighbour & 1 and self.is_frozen(neighbour, boxes, checking, frozen):
+                return True
+        return False
+
+    def corral_deadlock(self, boxes, player):
+        """
+        Checks for a closed corral: an area the player is sealed out of for good.
+
+        Only the boxes bordering an unreachable area are kept, the player's region is flood-filled
+        again, and if none of those border boxes can be pushed from it they can never move. The area
+        behind them is then closed forever, so the position is dead if the area holds a target without
+        a box or a box off its target, or if a border box is itself off its target.
+
+        Args:
+            boxes (int): Box bitmask after the push.
+            player (int): The player's cell after the push.
+
+        Returns:
+            bool: True if a closed corral makes the position unsolvable.
+        """
+        board = self.board
+        neighbours = board.neighbours
+        reach = board.reachable(player, boxes)
+        border = 0
+        for cell in box_cells(boxes):
+            for table in neighbours:
+                next_cell = table[cell]
+                if next_cell >= 0 and next_cell not in reach and not boxes >> next_cell & 1:
+                    border |= 1 << cell
+                    break
+        if not border:
+            return False
+
+        outside = board.reachable(player, border)
+        for cell in box_cells(border):
+            for direction, table in enumerate(neighbours):
+                behind = neighbours[OPPOSITE[direction]][cell]
+                ahead = table[cell]
+                if behind in outside and ahead >= 0 and not border >> ahead & 1:
+                    return False  # A border box can still move, so the corral may open
+
+        targets = self.analysis.target_mask
+        if border & ~targets:
+            return True
+        inside = [cell for cell in range(board.size) if not board.walls[cell] and cell not in outside]
+        for cell in inside:
+            if not border >> cell & 1 and (boxes >> cell & 1) != (targets >> cell & 1):
+                return True
+        return False
@@ -0,0 +1,371 @@
+# ----------Procedural level generator rated by the solver----------
+#
+# Usage:
+#     python generator.py [--count N] [--output FILE.xsb] [--workers N] [--seed N]
+#                         [--width N] [--height N] [--boxes N] [--pulls N]
+#                         [--max-nodes N] [--min-pushes N] [--max-candidates N]
+#
+# A candidate level is a random room layout, carved out of solid rock as a chain of overlapping
+# rectangles, with targets scattered over its floor. The boxes start on the targets and are then
+# pulled away by a random walk of the player, so every candidate can be solved by playing the
+# pulls backwards. Candidates that only differ by a rotation, a reflection, their position in the
+# grid or where the player stands in its region are the same puzzle; they share a canonical hash
+# and only the first one is kept.
+#
+# Each candidate is rated by running the solver on it with a node budget, recording the pushes of
+# its solution, the nodes the search expanded and how many of its pushes ran into deadlocks.
+# Candidates are generated and rated in batches across a process pool, and the levels accepted
+# are streamed to a standard XSB collection, which `open_levels` and the game can read back.
+
+import argparse
+import hashlib
+import math
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from AIsolver import AI
+from analysis import LevelAnalysis
+from board import Board, State, box_cells
+from solutioncache import moves_to_pushes
+
+# A level that passed rating; `key` is its canonical hash and `rows` its XSB rows
+GeneratedLevel = namedtuple("GeneratedLevel", ["key", "rows", "pushes", "nodes", "deadlock_density", "difficulty"])
+
+# Candidates generated and rated by one pool task
+BATCH_SIZE = 16
+
+# Candidates tried per level asked for before giving up, unless a limit is given
+CANDIDATES_PER_LEVEL = 100
+
+# Tries at placing each rectangle of a room so it joins the floor carved so far
+PLACEMENT_TRIES = 20
+
+
+def carve_room(width, height, rng):
+    """
+    Carves a connected floor out of solid rock as a chain of overlapping rectangles.
+
+    Args:
+        width (int): Columns of floor the room may use; the grid gets a wall all round.
+        height (int): Rows of floor the room may use.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        set of int: The floor cells, numbered on a grid of (width + 2) x (height + 2).
+    """
+    columns = width + 2
+    floor = set()
+    for _ in range(rng.randint(3, 6)):
+        for _ in range(PLACEMENT_TRIES):
+            rect_width, rect_height = rng.randint(1, 4), rng.randint(1, 4)
+            left = rng.randint(1, width - rect_width + 1) if rect_width <= width else 1
+            top = rng.randint(1, height - rect_height + 1) if rect_height <= height else 1
+            cells = {y * columns + x
+                     for y in range(top, min(top + rect_height, height + 1))
+                     for x in range(left, min(left + rect_width, width + 1))}
+            # Every rectangle after the first has to share or touch a floor cell
+            if not floor or any(cell + step in floor for cell in cells for step in (0, -1, 1, -columns, columns)):
+                floor |= cells
+                break
+    return floor
+
+
+def crop(floor, columns):
+    """
+    Moves a floor to the top-left of the smallest grid that holds it with a wall all round.
+
+    Args:
+        floor (set of int): The floor cells.
+        columns (int): Width of the grid the cells are numbered on.
+
+    Returns:
+        tuple: The floor cells on the new grid, its width and its height.
+    """
+    xs = [cell % columns for cell in floor]
+    ys = [cell // columns for cell in floor]
+    left, top = min(xs) - 1, min(ys) - 1
+    width = max(xs) - left + 2
+    return {(y - top) * width + x - left for x, y in zip(xs, ys)}, width, max(ys) - top + 2
+
+
+def reverse_play(board, boxes, player, pulls, rng):
+    """
+    Pulls the boxes away from their targets with a random walk of the player.
+
+    Every pull can be undone by a push, so any position on the walk can be solved by playing the
+    walk backwards. The position kept is the one whose boxes are furthest from the targets in
+    total, by the analysis' push distances, so the walk wandering back towards the targets does
+    not undo its own work.
+
+    Args:
+        board (Board): The level, with its targets.
+        boxes (int): Box bitmask to start from, normally every target covered.
+        player (int): The player's starting cell.
+        pulls (int): Number of pulls in the walk.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        State: The start position found, or None if no box could be pulled off a target.
+    """
+    neighbours = board.neighbours
+    nearest_distance = LevelAnalysis.for_board(board).nearest_distance
+    best, best_distance = None, 0
+    for _ in range(pulls):
+        reach = board.reachable(player, boxes)
+        moves = []
+        for box in box_cells(boxes):
+            for direction in range(4):
+                pulled_to = neighbours[direction][box]  # The player stands here and the box follows
+                if pulled_to in reach:
+                    behind = neighbours[direction][pulled_to]
+                    if behind >= 0 and not boxes >> behind & 1:
+                        moves.append((box, pulled_to, behind))
+        if not moves:
+            break
+        box, pulled_to, player = rng.choice(moves)
+        boxes ^= (1 << box) | (1 << pulled_to)
+        distance = sum(nearest_distance[cell] for cell in box_cells(boxes))
+        if distance > best_distance:
+            best, best_distance = State(player, boxes), distance
+    return best
+
+
+def random_level(width, height, box_count, pulls, rng):
+    """
+    Makes one candidate level: a random room, random targets and boxes pulled off them.
+
+    Returns:
+        tuple or None: The `Board` and start `State`, or None if the room came out too small for
+                       the boxes or no box could be moved.
+    """
+    floor = carve_room(width, height, rng)
+    if len(floor) < 3 * box_count + 2:
+        return None
+    floor, columns, rows = crop(floor, width + 2)
+    targets = rng.sample(sorted(floor), box_count)
+    walls = [cell for cell in range(columns * rows) if cell not in floor]
+    board = Board(columns, rows, walls, targets)
+    boxes = board.target_mask
+    player = rng.choice([cell for cell in floor if not boxes >> cell & 1])
+    start = reverse_play(board, boxes, player, pulls, rng)
+    if start is None:
+        return None
+    return board, start
+
+
+def canonical_key(board, state):
+    """
+    Hashes a level so that levels which are the same puzzle get the same key.
+
+    The level is cropped to its floor, every cell the player can walk to is marked alike, and the
+    smallest of its eight rotations and reflections is hashed.
+
+    Returns:
+        str: Hex digest of the canonical form.
+    """
+    width = board.width
+    reach = board.reachable(state.player, state.boxes)
+    floor = [cell for cell in range(board.size) if not board.walls[cell]]
+    xs = [cell % width for cell in floor]
+    ys = [cell // width for cell in floor]
+    grid = []
+    for y in range(min(ys), max(ys) + 1):
+        row = []
+        for x in range(min(xs), max(xs) + 1):
+            cell = y * width + x
+            if board.walls[cell]:
+                row.append("#")
+            elif cell in board.targets:
+                row.append("*" if state.boxes >> cell & 1 else "+" if cell in reach else ".")
+            else:
+                row.append("$" if state.boxes >> cell & 1 else "@" if cell in reach else "-")
+        grid.append("".join(row))
+
+    forms = []
+    for _ in range(4):
+        grid = ["".join(row[x] for row in reversed(grid)) for x in range(len(grid[0]))]  # Rotate a quarter turn
+        forms.append("\n".join(grid))
+        forms.append("\n".join(row[::-1] for row in grid))
+    return hashlib.sha1(min(forms).encode()).hexdigest()
+
+
+def rate_level(board, state, max_nodes):
+    """
+    Rates a level by solving it within a node budget.
+
+    The difficulty grows with the pushes of the solution found and the logarithm of the nodes
+    the search needed, scaled up by the deadlock density: the share of generated pushes that the
+    deadlock checks pruned, which is high for levels where most pushes are mistakes.
+
+    Args:
+        board (Board): The level.
+        state (State): Its start position.
+        max_nodes (int): Nodes the solver may expand.
+
+    Returns:
+        tuple or None: (pushes, nodes expanded, deadlock density, difficulty), or None if the
+                       solver gave up.
+    """
+    solver = AI(board, max_nodes=max_nodes, macros=())  # Push-optimal, so the pushes rate the level
+    path, stats = solver.solve(state)
+    if path is None:
+        return None
+    pushes = len(moves_to_pushes(board, state, path))
+    pruned = sum(stats.pruned.values())
+    deadlock_density = pruned / (pruned + stats.generated) if pruned + stats.generated else 0.0
+    difficulty = (pushes + 4 * math.log2(1 + stats.expanded)) * (1 + deadlock_density)
+    return pushes, stats.expanded, deadlock_density, difficulty
+
+
+def generate_batch(seed, options):
+    """
+    Generates and rates one batch of candidates; this is what runs in the pool.
+
+    Args:
+        seed (int): Seed of the batch, so a run can be repeated.
+        options (dict): The generator options, see `generate_levels`.
+
+    Returns:
+        tuple: The list of `GeneratedLevel` accepted and the number of candidates tried.
+    """
+    rng = random.Random(seed)
+    accepted = []
+    seen = set()
+    for _ in range(BATCH_SIZE):
+        level = random_level(options["width"], options["height"], options["boxes"], options["pulls"], rng)
+        if level is None:
+            continue
+        board, state = level
+        key = canonical_key(board, state)
+        if key in seen:
+            continue
+        seen.add(key)
+        rating = rate_level(board, state, options["max_nodes"])
+        if rating is None or rating[0] < options["min_pushes"]:
+            continue
+        pushes, nodes, deadlock_density, difficulty = rating
+        accepted.append(GeneratedLevel(key, board.to_xsb(state), pushes, nodes, deadlock_density, difficulty))
+    return accepted, BATCH_SIZE
+
+
+def generate_levels(count, workers=None, seed=0, width=8, height=8, boxes=3, pulls=60, max_nodes=20000, min_pushes=8,
+                    max_candidates=None):
+    """
+    Generates rated, distinct levels across a pool of worker processes.
+
+    Batches are kept queued two per worker, and the new levels of each batch are yielded as soon
+    as it finishes, so the output grows steadily. Closing the generator early cancels the batches
+    still waiting. Generation stops after `max_candidates` candidates even if fewer than `count` levels were
+    accepted, so options that reject every candidate cannot keep it running forever.
+
+    Args:
+        count (int): Number of levels to yield.
+        workers (int, optional): Number of worker processes, one per core by default.
+        seed (int): Seed of the first batch; batch n uses seed + n.
+        width (int): Columns of floor a room may use.
+        height (int): Rows of floor a room may use.
+        boxes (int): Boxes in every level.
+        pulls (int): Length of the reverse-play walk that places the boxes.
+        max_nodes (int): Nodes the solver may expand while rating a candidate.
+        min_pushes (int): Fewest pushes a level's solution needs to be kept.
+        max_candidates (int, optional): Most candidates to try, `CANDIDATES_PER_LEVEL` per level
+                                        asked for by default.
+
+    Yields:
+        tuple: The list of `GeneratedLevel` a batch added, possibly empty, and the number of
+               candidates tried so far.
+    """
+    if width < 2 or height < 2:
+        raise ValueError("Rooms must be at least 2 by 2")
+    if boxes < 1:
+        raise ValueError("Levels need at least one box")
+    options = {"width": width, "height": height, "boxes": boxes, "pulls": pulls,
+               "max_nodes": max_nodes, "min_pushes": min_pushes}
+    if max_candidates is None:
+        max_candidates = CANDIDATES_PER_LEVEL * count
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    seen = set()
+    tried = 0
+    produced = 0
+    submitted = 0
+    next_seed = seed
+    running = set()
+    try:
+        while produced < count:
+            while len(running) < 2 * workers and submitted < max_candidates:
+                running.add(executor.submit(generate_batch, next_seed, options))
+                submitted += BATCH_SIZE
+                next_seed += 1
+            if not running:
+                break  # Out of candidates, with fewer levels than asked for
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                accepted, batch_tried = future.result()
+                tried += batch_tried
+                levels = []
+                for level in accepted:
+                    if level.key not in seen and produced < count:
+                        seen.add(level.key)
+                        produced += 1
+                        levels.append(level)
+                yield levels, tried
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def format_level(name, level):
+    """
+    Writes a generated level as an XSB entry: its rating, its name and its rows.
+
+    The name is the last comment before the rows, which is the line `XsbCollection` names it by.
+    """
+    rating = (f"; pushes {level.pushes}, nodes {level.nodes}, "
+              f"deadlock density {level.deadlock_density:.2f}, difficulty {level.difficulty:.1f}")
+    return "\n".join([rating, f"; {name}"] + level.rows) + "\n\n"
+
+
+def main(argv=None):
+    """
+    Command line entry point: generates levels into an XSB collection and prints a summary.
+    """
+    parser = argparse.ArgumentParser(description="Generate Sokoban levels rated by the solver.")
+    parser.add_argument("--count", type=int, default=1000, help="levels to generate")
+    parser.add_argument("--output", default="generated.xsb", help="XSB collection to write")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=8, help="columns of floor a room may use")
+    parser.add_argument("--height", type=int, default=8, help="rows of floor a room may use")
+    parser.add_argument("--boxes", type=int, default=3)
+    parser.add_argument("--pulls", type=int, default=60, help="length of the reverse-play walk")
+    parser.add_argument("--max-nodes", type=int, default=20000, help="nodes allowed to rate a level")
+    parser.add_argument("--min-pushes", type=int, default=8, help="fewest pushes a kept level needs")
+    parser.add_argument("--max-candidates", type=int, default=None,
+                        help=f"candidates to try before giving up (default: {CANDIDATES_PER_LEVEL} per level)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    tried = 0
+    produced = 0
+    with open(args.output, "w") as file:
+        levels = generate_levels(args.count, args.workers, args.seed, args.width, args.height, args.boxes,
+                                 args.pulls, args.max_nodes, args.min_pushes, args.max_candidates)
+        for batch, tried in levels:
+            for level in batch:
+                produced += 1
+                file.write(format_level(f"Generated {produced}", level))
+            file.flush()
+    seconds = time.perf_counter() - started
+    print(f"{produced} of {args.count} levels from {tried} candidates written to {args.output} in {seconds:.1f}s "
+          f"({60 * produced / seconds:.0f} per minute)")
+    if produced < args.count:
+        print("Gave up after trying the most candidates allowed; loosen the options or raise --max-candidates")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# ----------Box-to-target matching heuristic----------
+#
+# Instead of letting every box claim its nearest target, the boxes and targets are paired up
+# by a minimum-cost perfect matching over the push distances of the level analysis. No two
+# boxes can share a target, so the estimate is higher than the per-box sum while still never
+# overestimating the number of pushes left.
+
+from collections import OrderedDict
+from analysis import UNREACHABLE
+from board import box_cells
+
+# Finite stand-in for an unreachable pairing, so the matching arithmetic stays in integers
+BLOCKED = 10 ** 6
+
+
+def augment(cost, u, v, p, row, size):
+    """
+    Assigns one unassigned row using a shortest augmenting path (Hungarian algorithm).
+
+    Rows and columns are numbered from 1, with column 0 used as the root of the search.
+    The dual potentials `u` and `v` and the assignment `p` (column -> row, 0 when free)
+    are updated in place.
+
+    Args:
+        cost (list of lists): Square cost matrix, cost[row - 1][column - 1].
+        u (list of int): Row potentials.
+        v (list of int): Column potentials.
+        p (list of int): Row assigned to each column.
+        row (int): The row to assign.
+        size (int): Number of rows and columns.
+    """
+    p[0] = row
+    column = 0
+    min_reduced = [BLOCKED * size] * (size + 1)
+    used = [False] * (size + 1)
+    way = [0] * (size + 1)
+    while True:
+        used[column] = True
+        current_row = p[column]
+        costs = cost[current_row - 1]
+        delta = BLOCKED * size
+        next_column = 0
+        for j in range(1, size + 1):
+            if not used[j]:
+                reduced = costs[j - 1] - u[current_row] - v[j]
+                if reduced < min_reduced[j]:
+                    min_reduced[j] = reduced
+                    way[j] = column
+                if min_reduced[j] < delta:
+                    delta = min_reduced[j]
+                    next_column = j
+        for j in range(size + 1):
+            if used[j]:
+                u[p[j]] += delta
+                v[j] -= delta
+            else:
+                min_reduced[j] -= delta
+        column = next_column
+        if p[column] == 0:
+            break
+    # Flip the assignments along the augmenting path
+    while column:
+        previous = way[column]
+        p[column] = p[previous]
+        column = previous
+
+
+class Matching:
+
+    def __init__(self, rows, cost, u, v, p):
+        """
+        A solved assignment of boxes (rows) to targets (columns), kept so that a state one push
+        away can be re-solved from it.
+
+        Args:
+            rows (list of int): The box cell of each row.
+            cost (list of lists): The cost matrix the assignment was solved for.
+            u (list of int): Row potentials.
+            v (list of int): Column potentials.
+            p (list of int): Row assigned to each column.
+        """
+        self.rows = rows
+        self.cost = cost
+        self.u = u
+        self.v = v
+        self.p = p
+        self.value = sum(cost[p[j] - 1][j - 1] for j in range(1, len(p)))
+
+
+class MatchingHeuristic:
+
+    def __init__(self, analysis, cache_size=50000):
+        """
+        Prepares the matching heuristic for a level.
+
+        Args:
+            analysis (LevelAnalysis): Supplies the push-distance tables of the level.
+            cache_size (int): How many solved matchings to keep for incremental updates.
+        """
+        self.analysis = analysis
+        self.size = len(analysis.target_list)
+        self.cache_size = cache_size
+        self.matchings = OrderedDict()
+        # cost_rows[cell] is the matrix row for a box standing on that cell
+        self.cost_rows = [
+            [BLOCKED if distance == UNREACHABLE else distance for distance in column]
+            for column in zip(*analysis.push_distances)
+        ]
+
+    def estimate(self, boxes, parent_boxes=None):
+        """
+        Returns the cost of the cheapest box-to-target assignment.
+
+        When the two states differ by a single box, the parent's matching (cached, or solved once
+        and then cached for its other children) has only that box's row replaced and re-assigned
+        with one augmenting path. Otherwise the whole matching is solved from scratch.
+
+        Args:
+            boxes (int): Bitmask of the box cells to evaluate.
+            parent_boxes (int, optional): Bitmask of the state these boxes were pushed from.
+
+        Returns:
+            int or float: The matching cost in pushes, or `UNREACHABLE` if no assignment exists.
+        """
+        matching = self.lookup(boxes)
+        if matching is None:
+            moved = boxes ^ parent_boxes if parent_boxes is not None else 0
+            parent = None
+            if moved.bit_count() == 2:
+                parent = self.lookup(parent_boxes)
+                if parent is None:
+                    parent = self.solve(parent_boxes)
+                    if parent is not None:
+                        self.remember(parent_boxes, parent)
+            if parent is not None:
+                old_cell = (parent_boxes & moved).bit_length() - 1
+                new_cell = (boxes & moved).bit_length() - 1
+                matching = self.update(parent, old_cell, new_cell)
+            else:
+                matching = self.solve(boxes)
+            if matching is None:
+                return UNREACHABLE
+            self.remember(boxes, matching)
+        return UNREACHABLE if matching.value >= BLOCKED else matching.value
+
+    def lookup(self, boxes):
+        """
+        Returns the cached matching for a set of boxes, or None if it is not cached.
+        """
+        matching = self.matchings.get(boxes)
+        if matching is not None:
+            self.matchings.move_to_end(boxes)
+        return matching
+
+    def remember(self, boxes, matching):
+        """
+        Caches a solved matching, dropping the least recently used one when the cache is full.
+        """
+        self.matchings[boxes] = matching
+        if len(self.matchings) > self.cache_size:
+            self.matchings.popitem(last=False)
+
+    def solve(self, boxes):
+        """
+        Solves the assignment for a set of boxes from scratch.
+
+        Returns:
+            Matching or None: The solved matching, or None if the box and target counts differ.
+        """
+        rows = box_cells(boxes)
+        if len(rows) != self.size:
+            return None
+        cost = [self.cost_rows[cell] for cell in rows]
+        u = [0] * (self.size + 1)
+        v = [0] * (self.size + 1)
+        p = [0] * (self.size + 1)
+        for row in range(1, self.size + 1):
+            augment(cost, u, v, p, row, self.size)
+        return Matching(rows, cost, u, v, p)
+
+    def update(self, parent, old_cell, new_cell):
+        """
+        Re-solves a parent matching after one box has moved from `old_cell` to `new_cell`.
+
+        The box's row is swapped for the row of its new cell and its old target is freed. The row
+        potential is lowered until the new row is dual feasible again, after which a single
+        augmenting path restores an optimal assignment.
+
+        Returns:
+            Matching: The updated matching.
+        """
+        row = parent.rows.index(old_cell) + 1
+        rows = parent.rows[:]
+        rows[row - 1] = new_cell
+        cost = parent.cost[:]
+        cost[row - 1] = self.cost_rows[new_cell]
+        u = parent.u[:]
+        v = parent.v[:]
+        p = parent.p[:]
+        p[p.index(row, 1)] = 0
+        costs = cost[row - 1]
+        u[row] = min(costs[j - 1] - v[j] for j in range(1, self.size + 1))
+        augment(cost, u, v, p, row, self.size)
+        return Matching(rows, cost, u, v, p)
@@ -0,0 +1,210 @@
+# ----------Level collections: the built-in grids and standard XSB/.sok files----------
+#
+# Both kinds of collection behave like a read-only dictionary from level name to a freshly
+# compiled (Board, State) pair, so the game and the solvers do not need to know where the
+# levels came from. XSB files are opened lazily: opening one only records where each level
+# starts, and a level is parsed the first time it is asked for. Compiled levels are also kept
+# on disk, keyed by a hash of the level's text, so the next run can skip parsing altogether.
+
+import hashlib
+import os
+import pickle
+from board import Board
+
+# Characters that may appear in a row of an XSB level
+XSB_ROW_CHARACTERS = set("#@+$*.-_ \t")
+
+# Bump whenever Board or State change shape, so older compiled files are ignored
+COMPILED_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sokoban-levels")
+
+
+def is_level_row(line):
+    """
+    Checks whether a line of an XSB file is part of a level rather than a title or comment.
+    """
+    stripped = line.rstrip("\r\n")
+    return "#" in stripped and set(stripped) <= XSB_ROW_CHARACTERS
+
+
+class GridCollection:
+
+    def __init__(self, grids):
+        """
+        Wraps a dictionary of tile grids, such as `Levels.levels`.
+
+        Args:
+            grids (dict): Level grids keyed by level name.
+        """
+        self.grids = grids
+
+    def keys(self):
+        return list(self.grids.keys())
+
+    def __len__(self):
+        return len(self.grids)
+
+    def __iter__(self):
+        return iter(self.grids)
+
+    def __contains__(self, key):
+        return key in self.grids
+
+    def __getitem__(self, key):
+        """
+        Compiles a level into its board and starting state.
+        """
+        return Board.from_grid(self.grids[key])
+
+
+class XsbCollection:
+
+    def __init__(self, path, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Opens an XSB/.sok collection file and indexes where each level starts.
+
+        Only a light scan of the lines is made here; no level is parsed until it is requested.
+        A level is named by the ";" comment or "Title:" line that belongs to it, or numbered
+        when it has none.
+
+        Args:
+            path (str): Path of the collection file.
+            cache_dir (str, optional): Where compiled levels are stored, None to disable the disk cache.
+        """
+        self.path = path
+        self.cache_dir = cache_dir
+        self.offsets = {}  # Level name -> byte offset of the level's first row
+        self.compiled = {}
+        self.index()
+
+    def index(self):
+        """
+        Scans the file once, recording the byte offset of every level.
+        """
+        names = []
+        starts = []
+        comment = None
+        in_level = False
+        offset = 0
+        with open(self.path, "rb") as file:
+            for raw_line in file:
+                line = raw_line.decode("utf-8", "replace")
+                if is_level_row(line):
+                    if not in_level:
+                        starts.append(offset)
+                        names.append(comment)
+                        comment = None
+                        in_level = True
+                else:
+                    in_level = False
+                    text = line.strip()
+                    if text.startswith("Title:"):
+                        title = text[len("Title:"):].strip()
+                        # A title line directly after a level names that level
+                        if names and names[-1] is None and comment is None:
+                            names[-1] = title
+                        else:
+                            comment = title
+                    elif text.startswith(";"):
+                        comment = text.lstrip(";").strip() or None
+                offset += len(raw_line)
+
+        for number, (name, start) in enumerate(zip(names, starts), 1):
+            name = name or f"Level {number}"
+            if name in self.offsets:
+                name = f"{name} ({number})"
+            self.offsets[name] = start
+
+    def keys(self):
+        return list(self.offsets.keys())
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __getitem__(self, key):
+        """
+        Returns the compiled board and starting state of a level.
+
+        The level is looked up in memory first, then in the disk cache, and is only parsed if
+        neither has it.
+        """
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            rows = self.read_rows(key)
+            compiled = self.load_compiled(rows)
+            self.compiled[key] = compiled
+        return compiled
+
+    def read_rows(self, key):
+        """
+        Reads the rows of one level, starting at its recorded offset.
+        """
+        rows = []
+        with open(self.path, "rb") as file:
+            file.seek(self.offsets[key])
+            for raw_line in file:
+                line = raw_line.decode("utf-8", "replace")
+                if not is_level_row(line):
+                    break
+                rows.append(line.rstrip("\r\n"))
+        return rows
+
+    def load_compiled(self, rows):
+        """
+        Compiles level rows, reusing the disk cache entry for identical level text.
+        """
+        if self.cache_dir is None:
+            return Board.from_xsb(rows)
+        digest = hashlib.sha1(f"{COMPILED_VERSION}\n".encode() + "\n".join(rows).encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, digest[:2], digest + ".pickle")
+        try:
+            with open(cache_path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+        compiled = Board.from_xsb(rows)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                pickle.dump(compiled, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass  # A read-only or full disk only costs the caching, not the level
+        return compiled
+
+    def __getstate__(self):
+        """
+        Leaves the compiled levels behind when the collection is sent to a worker process.
+        """
+        state = self.__dict__.copy()
+        state["compiled"] = {}
+        return state
+
+
+def open_levels(source=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Opens a level collection from a path, a grid dictionary, or the built-in levels.
+
+    Args:
+        source (str or dict, optional): An XSB/.sok file path or a dictionary of grids. Defaults
+                                        to `Levels.levels`.
+        cache_dir (str, optional): Disk cache for compiled XSB levels, None to disable it.
+
+    Returns:
+        GridCollection or XsbCollection: The opened collection.
+    """
+    if source is None:
+        from Levels import levels
+        source = levels
+    if isinstance(source, dict):
+        return GridCollection(source)
+    return XsbCollection(source, cache_dir)
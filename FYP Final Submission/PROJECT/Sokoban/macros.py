@@ -0,0 +1,335 @@
+# ----------Tunnel and goal-room macro pushes that collapse forced push sequences----------
+#
+# Pushing a box down a one-wide corridor, or into a goal area with a single way in, leaves the
+# player nothing useful to do with that box but carry on pushing it, yet the plain search pays a
+# node per square for it. Both kinds of area are found once per level layout, and a push into one
+# is then extended into a macro: a box pushed into a tunnel is carried through to the far end, and
+# a box pushed into a goal room is taken straight to the next target of a fill order worked out
+# ahead of time. The search sees the whole macro as one successor costing all of its pushes, and
+# the solution is split back into single pushes at the end.
+#
+# Tunnel macros never leave a box halfway down a corridor, which practically never matters. Goal
+# room macros fix the order the room is filled in, so the solution found can take a few more pushes
+# than the optimal one; they only fire while the room holds exactly the boxes of that order.
+
+from collections import OrderedDict, deque, namedtuple
+from board import OPPOSITE
+
+# The macros that can be switched on
+KINDS = ("tunnel", "goal_room")
+
+# Largest goal room looked for, in cells
+MAX_ROOM_CELLS = 64
+
+# A goal room: the cell in front of its only way in, the cell just inside, a bitmask of the room's
+# cells, and for each filling stage the room's boxes with a new box on the entrance -> its route
+GoalRoom = namedtuple("GoalRoom", ["door", "entrance", "mask", "fills"])
+
+# Level layouts whose tunnels and goal rooms are kept; beyond this the least recently used is dropped
+CACHE_LIMIT = 64
+
+# Tunnel tables and goal rooms already found, keyed by `Board.key`, least recently used first
+_cache = OrderedDict()
+
+
+class MacroPushes:
+
+    def __init__(self, analysis, kinds=KINDS):
+        """
+        Prepares the macro pushes for a level.
+
+        Args:
+            analysis (LevelAnalysis): Supplies the board, targets and simple dead squares.
+            kinds (iterable of str): Which of `KINDS` to use.
+        """
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Unknown macro pushes: {sorted(unknown)}")
+        self.analysis = analysis
+        self.board = analysis.board
+        self.kinds = [kind for kind in KINDS if kind in kinds]
+        self.targets = bytearray(self.board.size)
+        for cell in analysis.targets:
+            self.targets[cell] = 1
+
+        found = _cache.get(self.board.key)
+        if found is not None:
+            _cache.move_to_end(self.board.key)
+        elif self.kinds:
+            tunnels = self.find_tunnels()
+            found = _cache[self.board.key] = (tunnels, self.find_goal_rooms(tunnels))
+            if len(_cache) > CACHE_LIMIT:
+                _cache.popitem(last=False)
+        self.tunnels = found[0] if "tunnel" in self.kinds else None
+        self.rooms = found[1] if "goal_room" in self.kinds else {}
+
+        # starts[cell] is 1 where a box pushed onto the cell may start a macro
+        self.starts = bytearray(self.board.size)
+        if self.tunnels is not None:
+            for tunnel in self.tunnels:
+                for cell, inside in enumerate(tunnel):
+                    if inside:
+                        self.starts[cell] = 1
+        for entrance in self.rooms:
+            self.starts[entrance] = 1
+
+    def find_tunnels(self):
+        """
+        Finds the cells of one-wide corridors.
+
+        Returns:
+            list of bytearray: For each direction, 1 for every floor cell with walls on both sides
+                               across that direction, so a box in it can only move along it.
+        """
+        board = self.board
+        neighbours = board.neighbours
+        tunnels = []
+        for direction in range(4):
+            sides = (2, 3) if direction < 2 else (0, 1)
+            tunnel = bytearray(board.size)
+            for cell in range(board.size):
+                if not board.walls[cell] and all(neighbours[side][cell] < 0 for side in sides):
+                    tunnel[cell] = 1
+            tunnels.append(tunnel)
+        return tunnels
+
+    def find_goal_rooms(self, tunnels):
+        """
+        Finds the small areas holding targets that can only be entered through one corridor cell.
+
+        Every corridor cell is tried as the door of the area on either side of it; when areas
+        overlap the smallest is kept, so the door is the one right at the mouth of the room. A room
+        only gets a macro if a fill order for all of its targets can be found, see `plan_fill`.
+
+        Args:
+            tunnels (list of bytearray): The corridor cells from `find_tunnels`.
+
+        Returns:
+            dict: `GoalRoom` of every room found, keyed by its entrance cell.
+        """
+        neighbours = self.board.neighbours
+        candidates = []
+        for direction in range(4):
+            for door, inside in enumerate(tunnels[direction]):
+                entrance = neighbours[direction][door]
+                if not inside or entrance < 0 or neighbours[OPPOSITE[direction]][door] < 0:
+                    continue
+                room = self.enclosed_area(entrance, door)
+                if room is not None and any(self.targets[cell] for cell in room):
+                    candidates.append((len(room), door, direction, room))
+
+        rooms = {}
+        taken = set()
+        for _, door, direction, room in sorted(candidates, key=lambda candidate: candidate[:3]):
+            if door in taken or not taken.isdisjoint(room):
+                continue
+            entrance = neighbours[direction][door]
+            fills = self.plan_fill(door, entrance, room)
+            if fills:
+                mask = 0
+                for cell in room:
+                    mask |= 1 << cell
+                rooms[entrance] = GoalRoom(door, entrance, mask, fills)
+                taken |= room
+                taken.add(door)
+        return rooms
+
+    def enclosed_area(self, start, door):
+        """
+        Flood-fills the floor from a cell without passing through the door.
+
+        Returns:
+            set of int or None: The cells reached, or None if the area is larger than
+                                `MAX_ROOM_CELLS` or reaches round to the other side of the door.
+        """
+        seen = {start}
+        stack = [start]
+        neighbours = self.board.neighbours
+        while stack:
+            cell = stack.pop()
+            for table in neighbours:
+                next_cell = table[cell]
+                if next_cell >= 0 and next_cell != door and next_cell not in seen:
+                    if len(seen) == MAX_ROOM_CELLS:
+                        return None
+                    seen.add(next_cell)
+                    stack.append(next_cell)
+        # The door has to cut the room off, so the area may not surround it
+        if any(table[door] in seen for table in neighbours if table[door] != start):
+            return None
+        return seen
+
+    def plan_fill(self, door, entrance, room):
+        """
+        Works out the order a goal room is filled in and the route of each box.
+
+        The targets furthest from the entrance are filled first, so earlier boxes do not stand in
+        the way of later ones. Each box starts on the entrance with the player on the door, and its
+        route is the fewest pushes that bring it onto its target with the room's earlier boxes in
+        place and leave the player a way back out.
+
+        Args:
+            door (int): The cell in front of the room.
+            entrance (int): The room's cell next to the door.
+            room (set of int): The cells of the room.
+
+        Returns:
+            dict: For each stage, the room's boxes (earlier boxes and the new one on the entrance)
+                  -> the list of (box cell, direction index) pushes of its route. Empty if the room
+                  cannot be filled in this way.
+        """
+        area = room | {door}
+        depth = {entrance: 0}
+        frontier = deque([entrance])
+        while frontier:
+            cell = frontier.popleft()
+            for table in self.board.neighbours:
+                next_cell = table[cell]
+                if next_cell in room and next_cell not in depth:
+                    depth[next_cell] = depth[cell] + 1
+                    frontier.append(next_cell)
+        remaining = sorted((cell for cell in room if self.targets[cell]), key=lambda cell: (-depth[cell], cell))
+
+        fills = {}
+        filled = 0
+        while remaining:
+            for target in remaining:
+                route = self.push_route(entrance, target, door, filled, room, area)
+                if route is not None:
+                    break
+            else:
+                return {}
+            fills[filled | 1 << entrance] = route
+            filled |= 1 << target
+            remaining.remove(target)
+        return fills
+
+    def push_route(self, start, target, door, boxes, room, area):
+        """
+        Breadth-first search for the fewest pushes that take a lone box across a room to a target.
+
+        Args:
+            start (int): The box's cell.
+            target (int): The cell the box has to reach.
+            door (int): The cell the player starts on, which it must still be able to get back to.
+            boxes (int): Bitmask of the boxes already in the room, which stay where they are.
+            room (set of int): The cells the box may use.
+            area (set of int): The cells the player may use.
+
+        Returns:
+            list of tuples or None: (box cell, direction index) for each push, or None if the box
+                                    cannot get there with a way out left for the player.
+        """
+        neighbours = self.board.neighbours
+        first = (start, min(self.area_reach(door, boxes | 1 << start, area)))
+        came_from = {first: None}
+        frontier = deque([first])
+        while frontier:
+            box, player = node = frontier.popleft()
+            blocked = boxes | 1 << box
+            reach = self.area_reach(player, blocked, area)
+            if box == target and door in reach:
+                route = []
+                while came_from[node] is not None:
+                    node, push = came_from[node]
+                    route.append(push)
+                route.reverse()
+                return route
+            for direction in range(4):
+                behind = neighbours[OPPOSITE[direction]][box]
+                ahead = neighbours[direction][box]
+                if behind in reach and ahead in room and not boxes >> ahead & 1:
+                    moved_to = (ahead, min(self.area_reach(box, boxes | 1 << ahead, area)))
+                    if moved_to not in came_from:
+                        came_from[moved_to] = (node, (box, direction))
+                        frontier.append(moved_to)
+        return None
+
+    def area_reach(self, player, boxes, area):
+        """
+        Flood-fills the cells of an area the player can walk to without pushing a box.
+        """
+        seen = {player}
+        stack = [player]
+        neighbours = self.board.neighbours
+        while stack:
+            cell = stack.pop()
+            for table in neighbours:
+                next_cell = table[cell]
+                if next_cell in area and next_cell not in seen and not boxes >> next_cell & 1:
+                    seen.add(next_cell)
+                    stack.append(next_cell)
+        return seen
+
+    def follow(self, boxes, player, box, direction):
+        """
+        Lists the pushes a macro adds after a push.
+
+        A box pushed along a corridor with the player in the corridor behind it keeps going until
+        it leaves the corridor, reaches a target or is blocked. A box that then stands on the
+        entrance of a goal room, pushed in from the door, follows the room's route for the boxes
+        already inside, if they are exactly those of a stage of its fill order.
+
+        Args:
+            boxes (int): Box bitmask after the push.
+            player (int): The player's cell after the push.
+            box (int): The cell the pushed box ended up on.
+            direction (int): The direction index of the push.
+
+        Returns:
+            list of tuples: (box cell, direction index) for each further push, empty if no macro applies.
+        """
+        route = []
+        if self.tunnels is not None:
+            tunnel = self.tunnels[direction]
+            table = self.board.neighbours[direction]
+            dead_squares = self.analysis.dead_squares
+            while tunnel[box] and tunnel[player] and not self.targets[box]:
+                ahead = table[box]
+                if ahead < 0 or boxes >> ahead & 1 or dead_squares[ahead]:
+                    break
+                route.append((box, direction))
+                boxes ^= (1 << box) | (1 << ahead)
+                player, box = box, ahead
+        room = self.rooms.get(box)
+        if room is not None and player == room.door:
+            fill = room.fills.get(boxes & room.mask)
+            if fill:
+                route += fill
+        return route
+
+    def carry(self, boxes, player, box, direction):
+        """
+        Makes the macro pushes that follow a push, if any.
+
+        Args:
+            boxes (int): Box bitmask after the push.
+            player (int): The player's cell after the push.
+            box (int): The cell the pushed box ended up on.
+            direction (int): The direction index of the push.
+
+        Returns:
+            tuple: (player, box cell, box bitmask, pushes) after the macro, where pushes counts the
+                   first push as well.
+        """
+        route = self.follow(boxes, player, box, direction)
+        if not route:
+            return player, box, boxes, 1
+        last, last_direction = route[-1]
+        final = self.board.neighbours[last_direction][last]
+        return last, final, boxes ^ (1 << box) ^ (1 << final), len(route) + 1
+
+    def split(self, boxes, box, direction):
+        """
+        Lists every single push of a push and the macro that follows it.
+
+        Args:
+            boxes (int): Box bitmask before the push.
+            box (int): The cell of the pushed box.
+            direction (int): The direction index of the push.
+
+        Returns:
+            list of tuples: (box cell, direction index) for each push, starting with the given one.
+        """
+        ahead = self.board.neighbours[direction][box]
+        return [(box, direction)] + self.follow(boxes ^ (1 << box) ^ (1 << ahead), box, ahead, direction)
@@ -1,554 +1,815 @@
-import pygame
-import sys
-import time
-from settings import *
-from Levels import levels
-from AIsolver import *
-
-# ----------Create game class, this deals with the whole Sokoban game and its particular interactions----------
-class SokobanGame:
-
-    # -----------Initializing constructor for the game setup----------
-    
-    def __init__(self):
-        """
-        Initializes the Sokoban game by setting up the Pygame environment, loading the game assets,
-        and preparing the initial game state.
-
-        This method sets up the Pygame window and clock, initializes game control flags, 
-        and prepares the level that the player will start with.
-        It also finds the initial position of the player on the grid, initializes the AI solver,
-        and loads the initial level setup including the positions of boxes and targets.
-        """        
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(title)
-        self.clock = pygame.time.Clock()
-        self.is_running = True
-        self.current_level_key = 'Level 1'
-        self.initial_boxes = None
-        self.levels = levels
-        self.player_x, self.player_y = self.find_player_start_position()
-        self.mouse = pygame.mouse.get_pos()
-        self.solve = AI(self)
-        self.load_level()
-
-    # ---------- Draw methods that inlcude display elements to the user and the level interactions ----------
-
-    def draw_level(self):
-        """
-        Generates the current level's layout on the game screen.
-
-        Iterates through the grid representation of the level, drawing each tile
-        based on its type. The elements of walls, boxes, and targets are represented 
-        by different colours. This method fills the entire screen first to reset the drawing 
-        surface beforedrawing the level elements, ensuring a fresh render of the level state.
-        """
-        self.screen.fill(WHITE)  # Clear screen with white background
-        for y, row in enumerate(self.level):
-            for x, tile in enumerate(row):
-                grid = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                if tile == 1:  # Wall
-                    pygame.draw.rect(self.screen, BLACK, grid)
-                elif tile == 2:  # Box
-                    pygame.draw.rect(self.screen, BROWN, grid)
-                elif tile == 3:  # Target
-                    pygame.draw.rect(self.screen, SILVER, grid)
-
-    def draw_player(self):
-        """
-        Draws the player on the game screen at their current position.
-        This method uses Pygame to draw a rectangle representing the player with 
-        different features like the colour and its position on the grid.
-        """
-        pygame.draw.rect(self.screen, BLUE, (self.player_x * TILE_SIZE, self.player_y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-    
-    def find_player_start_position(self):
-        """
-        Identifies and returns the initial position of the player in the current level.
-
-        Scans the grid representation of the current level for the player's start tile,
-        designated by a specific tile value. Returns the coordinates of this tile as the
-        player's starting position.
-
-        Returns:
-            tuple: The (x, y) coordinates of the player's starting position. Returns a default
-            position if the player's start tile is not found within the level data.
-        """
-        for y, row in enumerate(self.levels[self.current_level_key]):
-            for x, tile in enumerate(row):
-                if tile == 4:  # Player start tile
-                    return x, y
-        return 1, 1  # Default position if not found
-
-
-    def printed_level(self):
-        """
-        A print feature that updates whenever an action on the level is taken place.
-        """        
-        for row in self.level:
-            print(row)
-        print("------")
-
-    def load_level(self):
-        """
-        Loads the current level based on `current_level_key`, sets up the level grid, 
-        and initializes the game state for the level.
-    
-        This method performs several key operations to set up the level:
-        - Copies the created level layout from the `levels` dictionary to `self.level`, 
-        ensuring a fresh start for each level load.
-        - Finds and sets the initial player position on the grid.
-        - A flag is used to indicate whether it is safe for the user to solve the current level whilst not modified. 
-
-        This method is intended to be called whenever a new level is started or the current 
-        level needs to be reset.
-        """        
-        self.level = [row[:] for row in self.levels[self.current_level_key]]
-        self.player_x, self.player_y = self.find_player_start_position()
-        self.level_change = False # Flag to indicate if the level had changed
-        self.printed_level()
-    
-    def switch_level(self):
-        """
-        Switches to the next level or ends the game if all levels have been completed.
-
-        This method determines the current level's index within the list of level keys and checks
-        if there is an upcoming level to switch to. If there is another level, the game updates
-        the current level key to that level and loads it with a print. If the current level is the last
-        one in the list, it shows prints indicating that all levels have been completed and the
-        game comes to an end.
-
-        """        
-        # Determine the current level index
-        keys = list(self.levels.keys())
-        current_level_index = keys.index(self.current_level_key)
-        keys_length = len(keys)
-        print(f"Current Level Key: {self.current_level_key}")
-
-        # Check if there's a next level
-        if current_level_index < keys_length - 1:
-            print(f"{self.current_level_key} Complete!")
-            # Switch to the next level
-            self.current_level_key = keys[current_level_index + 1]
-            print(f"{self.current_level_key} Start!")
-            self.load_level()
-        else:
-            # If there's no next level, end the game or perform any other actions
-            print("All levels completed. Game over.")
-            self.is_running = False
-
-    def draw_reset_button(self):
-        """
-        Draws the reset button on the screen.
-
-        This method creates a button labeled 'Reset' on the screen. When the mouse pointer is over the button,
-        the button's appearance changes to indicate that it can be clicked. If the button is clicked, the game level
-        is reset to its initial state by calling the `reset_level` method.
-
-        The button's appearance, including its position, size, and colour, is defined within the method. The method
-        also checks for mouse interaction to detect clicks on the button.
-        """
-        # Display the aesthetics of the button 
-        button_rect = pygame.Rect(150, HEIGHT - 80, 100, 50)
-        font = pygame.font.Font(None, 36)
-        button_text = font.render(reset, True, BLACK)
-
-        # Mouse handles the button
-        if button_rect.collidepoint(self.mouse):
-            pygame.draw.rect(self.screen, LIGHTER_SHADE, button_rect) # Overlay when interacted
-            if pygame.mouse.get_pressed()[0]:  
-                self.reset_level()
-        else:
-            pygame.draw.rect(self.screen, DARKER_SHADE, button_rect) # Overlay when not interacted with
-
-        # Position of the button
-        self.screen.blit(button_text, (button_rect.centerx - button_text.get_width() // 2, button_rect.centery - button_text.get_height() // 2))
-    
-    def reset_level(self):
-        """
-        Resets the current game level to its initial state.
-
-        The method does this by calling `load_level`, which reads the initial level data from the `levels` dictionary
-        and sets up the level accordingly. It also prints a message indicating that the level has been
-        reset in the log. There is a pygame feature that delays loops and controlling the speed constant loading.
-        """
-        print("Level reset")
-        self.load_level()
-        pygame.time.wait(100) # Add a small delay to prevent multiple triggers
-
-    
-    def draw_key(self):
-        """
-        Draws a key on the screen that illustrates what each colour represents in the game for user clarity.
-
-        The key is positioned towards the right-hand side of the game window. It includes visual representations
-        for walls, the player, boxes, and targets, each with a corresponding colour using the pygame font 
-        and draw features .Next to each box, a text label describes what the box represents. The method 
-        calculates the size of the key area based on the number of elements and draws a border around 
-        the key for clarity.
-
-        Attributes:
-            x_start (int): The x-coordinate of the start position for the key on the screen.
-            y_start (int): The y-coordinate of the start position for the key on the screen.
-            key_elements (list of tuples): A list where each tuple contains a string label and a Pygame colour
-                                            representing an element in the game.
-            key_width (int): The width of the key area, determined by the longest text label.
-            key_height (int): The height of the key area, calculated based on the number of elements.
-            font (pygame.font.Font): The font used for rendering text labels next to the key symbols.
-        """        
-        x_start = WIDTH - 150
-        y_start = 50
-        
-        # Define key elements and their colours
-        key_elements = [
-            ("Wall", BLACK),
-            ("Player", BLUE),
-            ("Box", BROWN),
-            ("Target", SILVER),
-        ]
-        
-        # Key visibilty
-        font = pygame.font.Font(None, 24)  # Adjust size as needed
-        key_width = 150  
-        key_height = len(key_elements) * 30 + 10 
-
-        # Border for the key
-        border_rect = pygame.Rect(x_start - 5, y_start - 5, key_width, key_height)  # Border thickness
-        pygame.draw.rect(self.screen, BLACK, border_rect, 2)  # Border colour
-
-        for i, (element, colour) in enumerate(key_elements):
-            # Draw the box representing the element
-            box_rect = pygame.Rect(x_start, y_start + i * 30, 20, 20)  # Box sized : 20x20
-            pygame.draw.rect(self.screen, colour, box_rect)
-
-            # Render the text next to the box
-            key_text = font.render(element, True, BLACK) 
-            self.screen.blit(key_text, (x_start + 25, y_start + i * 30))
-    
-    def update(self):
-        """
-        Updates the game screen with the current game state.
-
-        This method redraws the game screen by each frame. It clears the screen,
-        then draws the current level, the player, and the UI elements such as the solve button,
-        reset button, and the key. After all drawing operations are complete, it updates
-        the display to reflect the changes using a pygame display feature. This method ensures that 
-        the game visuals accurately represent the current state of the game, including any movements 
-        or actions taken by the player since the previous frame.
-        """
-        # Clear the screen
-        self.screen.fill(WHITE)
-        # Draw the level and the player
-        self.draw_level()
-        self.draw_player()
-        # Draw UI elements
-        self.draw_solve_button()
-        self.draw_reset_button()
-        self.draw_key()
-        # Update the display
-        pygame.display.flip()
-    
-    # ---------- In game interaction methods for the game and the events that take place ----------
-
-    def events(self):
-        """
-        A method that determines the observe software and peripheral events in Sokoban.
-
-        The game is able to go into different states that is controlled by the user. 
-        It can close when the user decides to stop running the programming, it can perform keyboard
-        events and, it can perform mouse events
-
-        """        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.is_running = False
-            elif event.type == pygame.KEYDOWN:
-                self.handle_keyboard_events(event)
-            elif event.type == pygame.MOUSEMOTION:
-                self.handle_mouse_events()
-    
-    def handle_keyboard_events(self, event):
-        """
-        Handles the keyboard events, specifically the player movements controlled by the user.
-
-        This method updates the player's position based on arrow key inputs.
-        It checks for the validity of the new position within the created game grid boundaries
-        and calls `player_actions` to move the player and handle any interactions
-        at the new position (e.g, pushing boxes).
-        
-        Args:
-            event (pygame.event.Event): The event object representing a keyboard event. 
-            This contains information about the specific key pressed.
-        """    
-         # Initialize new_x and new_y
-        new_x, new_y = self.player_x, self.player_y
-
-        # Update new_x and new_y based on the pressed key
-        if event.key == pygame.K_UP:
-            new_y = self.player_y - 1
-        elif event.key == pygame.K_DOWN:
-            new_y = self.player_y + 1
-        elif event.key == pygame.K_RIGHT:
-            new_x = self.player_x + 1
-        elif event.key == pygame.K_LEFT:
-            new_x = self.player_x - 1
-
-        # Check if the new position is within the screen bounds
-        if 0 <= new_x < GRID_WIDTH and 0 <= new_y < GRID_HEIGHT:
-            self.player_actions(new_x, new_y)
-     
-    def handle_mouse_events(self):
-        """
-        Used specifically for on click mouse events and indicate when the user performs a mouse action.
-        """        
-        # Reveals the position of the mouse
-        self.mouse = pygame.mouse.get_pos()
-    
-    def player_actions(self, new_x, new_y):
-        """
-        Executes the actions that take place when moving the player to a new position on the grid.
-    
-        This method determines the type of tile at the requested new position and performs
-        actions based on the tile type. If the tile is empty or contains a box, it attempts
-        to move the player to that position. If the tile contains a box, it also tries to push
-        the box to the next position in the same direction by calling the push_box method. 
-        If the movement or push is successful, it updates the game state accordingly on the print statements. 
-        This method flags the level as changed upon any successful action that alters the level's state.
-
-        Args:
-            new_x (int): The x-coordinate of the new position the player is attempting to move to.
-            new_y (int): The y-coordinate of the new position the player is attempting to move to.
-
-        """        
-        self.level_change = True
-        print(f"Current Position: ({self.player_x}, {self.player_y})")
-        print(f"Requested Position: ({new_x}, {new_y})")
-        print(f"Tile at New Position: {self.level[new_y][new_x]}")
-
-        # If the new position is either empty or has a box, move the player
-        if self.level[new_y][new_x] == 0 or self.level[new_y][new_x] == 2 or self.level[new_y][new_x] == 4:
-            # If the new position has a box, try to push the box
-            if self.level[new_y][new_x] == 2:
-                self.level[self.player_y][self.player_x] = 0
-                print("Trying to push the box.")
-                self.push_box(new_x, new_y)
-            # If the new position is empty, move the player
-            elif self.level[new_y][new_x] == 0 or self.level[new_y][new_x] == 4:
-                print("Moving player.")
-                self.level[self.player_y][self.player_x] = 0
-                self.player_x, self.player_y = new_x, new_y
-                self.level[new_y][new_x] = 4
-        else:
-            print("Cannot move to the new position.")
-        
-        if self.level[new_y][new_x] != 3:
-            print("Updated Position: ({}, {})".format(self.player_x, self.player_y))
-            print("Updated Level:")
-            self.printed_level()
-
-    def push_box(self, new_x, new_y):
-        """
-        This method attempts to push a box from the player's current position to a new position.
-        
-        This method is called when the player attempts to move into a space occupied by a box.
-        It calculates the new position for the box based on the player's movement direction and
-        checks if the box can be moved to that position within thearea. A box can be pushed 
-        onto an empty space or a target. The method updates the game state to reflect the box's 
-        new position if the push is successful. It also checks for level completion 
-        when a box is placed on a target. This also flags when the level is modified by the user
-
-        Args:
-            new_x (int): The x-coordinate of the position where the player is attempting to push the box.
-            new_y (int): The y-coordinate of the position where the player is attempting to push the box.
-        
-        """        
-        self.level_change = True
-        # Calculate the new position of the box
-        box_x, box_y = new_x, new_y
-        new_box_x, new_box_y = box_x + (box_x - self.player_x), box_y + (box_y - self.player_y)
-        print(f"Box Position: ({box_x}, {box_y})")
-        print(f"New Box Position: ({new_box_x}, {new_box_y})")
-
-        # Check if the new position for the box is within the screen bounds and is empty
-        if (0 <= new_box_x < GRID_WIDTH and 0 <= new_box_y < GRID_HEIGHT and (self.level[new_box_y][new_box_x] == 0 or self.level[new_box_y][new_box_x] == 3)):
-            if self.level[new_box_y][new_box_x] == 0:
-                print("Moving player and pushing the box.")
-                # Move the player and the box
-                self.player_x, self.player_y = new_x, new_y
-                self.level[box_y][box_x] = 0
-                self.level[new_box_y][new_box_x] = 2
-                self.level[new_y][new_x] = 4
-            # Check for box placement and level completion
-            elif self.level[new_box_y][new_box_x] == 3:
-                self.player_x, self.player_y = new_x, new_y
-                self.level[box_y][box_x] = 0
-                self.level[new_box_y][new_box_x] = 2
-                print("Box placed")
-                self.placed_boxes_checker()
-        else:
-            print("Box cannot be pushed.")
-    
-    def placed_boxes_checker(self):
-        """
-        Checks if all boxes have been placed on their respective targets within the current level.
-
-        This method iterates through the level's grid to count the number of target tiles remaining.
-        If no targets are left (indicating that all boxes have been placed on targets), it proceeds
-        to switch to the next level. Otherwise, it prints the number of targets that are still
-        awaiting a box.
-
-        """        
-        target_count = sum(row.count(3) for row in self.level) # Counts number of targets
-
-        if target_count == 0:
-            print("All boxes placed on targets.")
-            self.switch_level() # When there is no more unoccupied targets, it switches the level
-        else:
-            print(f"{target_count} target(s) remaining.") # Shows remaining targets still available
-    
-    # ----------AI element, involving the solve button and the animation of the solution----------
-
-    def is_move_valid(self, player_x, player_y, new_box_x=None, new_box_y=None):
-        """
-        Determines if a move or box push is valid within the game grid.
-
-        This method checks if the player's move is into an occupied space or if, when pushing a box,
-        the box's new position is valid. It ensures that neither player or the box moves into walls, out of bounds,
-        or onto another box.
-
-        Args:
-            player_x (int): The x-coordinate of the player's new position.
-            player_y (int): The y-coordinate of the player's new position.
-            new_box_x (int, optional): The x-coordinate of the box's new position if a box is being pushed.
-            new_box_y (int, optional): The y-coordinate of the box's new position if a box is being pushed.
-
-        Returns:
-            bool: True if the move is valid, False if not.
-        """
-        # Check if player is moving into a wall or into the target
-        if self.level[player_y][player_x] == 1 or self.level[player_y][player_x] == 3:
-            return False
-
-        # If checking a box push, ensure the new box position is valid
-        if new_box_x is not None and new_box_y is not None:
-            # Check if the new box position is out of bounds or into a wall or another box
-            if not (0 <= new_box_x < GRID_WIDTH and 0 <= new_box_y < GRID_HEIGHT):
-                return False
-            if self.level[new_box_y][new_box_x] == 1 or self.level[new_box_y][new_box_x] == 2:  # Wall or another box
-                return False
-
-        return True
-
-    def draw_solve_button(self):
-        """
-        Draws the 'Solve' button and handles its interaction.
-
-        When clicked, if the level has been altered, it prompts the user to reset the level.
-        Otherwise, it attempts to solve the level automatically using the AI solver. If a solution
-        is found, it animates the solution on the screen. The button appearance changes when hovered
-        to indicate it's interactive. There is also a delay for loop control, preventing uneccessary
-        triggers in the log. 
-        """
-        # Draws the aesthetics of the button
-        button_rect = pygame.Rect(30, HEIGHT - 80, 100, 50)
-        font = pygame.font.Font(None, 36)
-        button_text = font.render(solve, True, BLACK)
-        
-        # Handles mouse events
-        if button_rect.collidepoint(self.mouse):
-            pygame.draw.rect(self.screen, LIGHTER_SHADE, button_rect)
-            if pygame.mouse.get_pressed()[0]: 
-                if self.level_change: # Flag if theres been change to the level
-                    print("USER! Please reset the level first before solving automatically solving the level!")
-                else:
-                    # Call AI method
-                    solution_path = self.solve.solve_level()
-                    if solution_path is not None:
-                        print("Solution found:", solution_path)
-                        self.animate_solution(solution_path)
-                    else:
-                        print("No solution found.")
-                pygame.time.wait(100)  # Add a small delay to prevent multiple triggers
-        else:
-            pygame.draw.rect(self.screen, DARKER_SHADE, button_rect)
-
-        # Button position
-        self.screen.blit(button_text, (button_rect.centerx - button_text.get_width() // 2, button_rect.centery - button_text.get_height() // 2))
-    
-    def simulate_move(self, x, y):
-        """
-        Simulates a move of the player by a given offset.
-
-        This method calculates the new position of the player based on the provided x and y offsets
-        and then attempts the move. It is typically used to simulate the player's movements to complement
-        the AI solution path.
-
-        Args:
-            x (int): The x offset from the player's current position.
-            y (int): The y offset from the player's current position.
-        """
-
-        # Calculate the new player position
-        new_player_x = self.player_x + x
-        new_player_y = self.player_y + y
-
-        # player_actions method correctly moves the player and possibly pushes boxes
-        self.player_actions(new_player_x, new_player_y)
-
-    def animate_solution(self, solution_path):
-        """
-        Animates the solution on the game screen step by step.
-            
-        For each step in the solution path, this method simulates the player's move and updates the
-        game screen to show its new state. It pauses briefly between each step to make the animation
-        visible to the user.
-
-        Args:
-            solution_path (list of tuples): A sequence of (x, y) moves representing the solution.
-        """
-        for x, y in solution_path:
-            # simulate_move method to apply each move from the solution
-            self.simulate_move(x, y)
-
-            # Redraw the game state to show the move
-            self.update_solve_screen()
-            pygame.display.flip()
-
-            # Pause briefly between moves to animate
-            time.sleep(1)    
-
-        # Handling the quit event to keep the window responsive during the animation
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-    
-    def update_solve_screen(self):
-        """
-        Redraws the game screen to demonstrate the current state during solution animation.
-
-        This method clears the screen, redraws the level and the player in their current states,
-        and then updates the display. It is specifically used during the animation of the AI's
-        solution to ensure the screen is refreshed correctly after each move in the solution.
-        """
-        self.screen.fill(WHITE)
-        self.draw_level()
-        self.draw_player()
-        pygame.display.flip()
-
-    # ----------Method to run loop of the game events and elements----------
-    def run(self):
-        while self.is_running:
-            self.clock.tick(FPS)
-            self.events()
-            self.update()
-        
-        # Quit Pygame
-        pygame.quit()
-        sys.exit()
-
-# ----------Main game loop-----------
-if __name__ == "__main__":
-    print("I have been launched!")
-    game = SokobanGame()
-    game.run()
+import logging
+import pygame
+import sys
+import threading
+import time
+from collections import OrderedDict
+from settings import *
+from AIsolver import *
+from board import DIRECTION_INDEX, box_cells
+from camera import Camera
+from levelfile import open_levels
+import patterns
+from playback import Playback
+from solutioncache import SolutionCache
+
+logger = logging.getLogger("sokoban.game")
+
+# Posted by the solver thread when a background solve ends, with or without a solution
+SOLUTION_FOUND = pygame.USEREVENT + 1
+
+# ----------Create game class, this deals with the whole Sokoban game and its particular interactions----------
+class SokobanGame:
+
+    # -----------Initializing constructor for the game setup----------
+    
+    def __init__(self, level_source=None):
+        """
+        Initializes the Sokoban game by setting up the Pygame environment, loading the game assets,
+        and preparing the initial game state.
+
+        This method sets up the Pygame window and clock, initializes game control flags, 
+        and prepares the level that the player will start with.
+        It then loads the initial level setup, including the board, the positions of the player
+        and boxes, and the AI solver for that board.
+
+        Args:
+            level_source (str, optional): Path of an XSB/.sok collection to play instead of the
+                                          levels in Levels.py.
+        """        
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(title)
+        self.clock = pygame.time.Clock()
+        self.is_running = True
+        self.levels = open_levels(level_source)
+        self.solution_cache = SolutionCache()
+        self.current_level_key = self.levels.keys()[0]
+        self.mouse = pygame.mouse.get_pos()
+        self.solvers = OrderedDict()  # AI solver of the last `SOLVERS_KEPT` levels played, by board layout
+        self.solver_thread = None
+        self.solve_id = 0  # Tells the outcome of the current solve apart from cancelled ones
+        self.playback = None
+
+        # Fonts, button labels and button areas are made once instead of on every frame
+        self.progress_font = pygame.font.Font(None, 24)
+        self.key_font = pygame.font.Font(None, 24)
+        button_font = pygame.font.Font(None, 36)
+        self.labels = {text: button_font.render(text, True, BLACK) for text in (solve, reset, cancel)}
+        self.solve_button_rect = pygame.Rect(30, HEIGHT - 80, 100, 50)
+        self.reset_button_rect = pygame.Rect(150, HEIGHT - 80, 100, 50)
+        self.progress_rect = pygame.Rect(270, HEIGHT - 85, 220, 60)
+        self.view_rect = pygame.Rect(0, 0, VIEW_WIDTH, VIEW_HEIGHT)
+
+        # What is currently on screen, so a frame only redraws what changed since
+        self.full_redraw = True
+        self.drawn_state = None
+        self.drawn_buttons = None
+        self.drawn_progress = None
+        self.load_level()
+
+    # ---------- Draw methods that inlcude display elements to the user and the level interactions ----------
+
+    def build_static_layer(self):
+        """
+        Renders the parts of the screen that do not change while a level is played.
+
+        The background, walls, targets and the key are drawn once into a cached surface when the
+        level is loaded, and again whenever the camera scrolls or zooms. Only the tiles the camera
+        can see are drawn, so this costs the same on any size of level. Frames then copy areas of
+        it back to the screen instead of drawing every tile again, and a full redraw of the screen
+        is requested.
+        """
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(WHITE)
+        self.background.set_clip(self.view_rect)
+        for cell in self.visible_cells():
+            if self.board.walls[cell]:  # Wall
+                pygame.draw.rect(self.background, BLACK, self.tile_rect(cell))
+            elif cell in self.board.targets:  # Target
+                pygame.draw.rect(self.background, SILVER, self.tile_rect(cell))
+        self.background.set_clip(None)
+        self.draw_key(self.background)
+        self.full_redraw = True
+
+    def visible_cells(self):
+        """
+        Lists the board cells the camera can see, at least partly.
+        """
+        first_x, first_y, end_x, end_y = self.camera.visible_range()
+        return [self.board.index(x, y) for y in range(first_y, end_y) for x in range(first_x, end_x)]
+
+    def is_visible(self, cell):
+        """
+        Checks whether the camera can see a board cell, at least partly.
+        """
+        first_x, first_y, end_x, end_y = self.camera.visible_range()
+        x, y = self.board.coords(cell)
+        return first_x <= x < end_x and first_y <= y < end_y
+
+    def tile_rect(self, cell):
+        """
+        Returns the screen area of a board cell, as placed by the camera.
+        """
+        x, y = self.camera.screen_position(*self.board.coords(cell))
+        return pygame.Rect(x, y, self.camera.tile_size, self.camera.tile_size)
+
+    def draw_level(self):
+        """
+        Generates the current level's layout on the game screen.
+
+        The cached static layer holding the walls, targets and key is copied over the whole
+        screen, and the boxes the camera can see are drawn on top of it, with a box drawn over any
+        target it is standing on.
+        """
+        self.screen.blit(self.background, (0, 0))
+        self.screen.set_clip(self.view_rect)
+        for cell in box_cells(self.state.boxes):  # Box
+            if self.is_visible(cell):
+                pygame.draw.rect(self.screen, BROWN, self.tile_rect(cell))
+        self.screen.set_clip(None)
+
+    def draw_tile(self, cell):
+        """
+        Redraws a single cell: its static layer, then a box or the player if one is on it.
+
+        Returns:
+            pygame.Rect: The screen area that was redrawn, empty if the camera cannot see the cell.
+        """
+        rect = self.tile_rect(cell).clip(self.view_rect)
+        self.screen.blit(self.background, rect, rect)
+        if self.state.boxes >> cell & 1:
+            pygame.draw.rect(self.screen, BROWN, rect)
+        elif cell == self.state.player:
+            pygame.draw.rect(self.screen, BLUE, rect)
+        return rect
+
+    def draw_player(self):
+        """
+        Draws the player on the game screen at their current position.
+        This method uses Pygame to draw a rectangle representing the player with 
+        different features like the colour and its position on the grid.
+        """
+        pygame.draw.rect(self.screen, BLUE, self.tile_rect(self.state.player).clip(self.view_rect))
+
+    @property
+    def player_x(self):
+        """
+        The x-coordinate of the player, read from the current state.
+        """
+        return self.board.coords(self.state.player)[0]
+
+    @property
+    def player_y(self):
+        """
+        The y-coordinate of the player, read from the current state.
+        """
+        return self.board.coords(self.state.player)[1]
+
+    def printed_level(self):
+        """
+        A debug log of the whole level that updates whenever an action on the level is taken place.
+
+        The grid is only rebuilt when DEBUG logging is enabled for the game logger.
+        """        
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        for row in self.board.to_grid(self.state):
+            logger.debug("%s", row)
+        logger.debug("------")
+
+    def load_level(self):
+        """
+        Loads the current level based on `current_level_key`, sets up the level grid, 
+        and initializes the game state for the level.
+    
+        This method performs several key operations to set up the level:
+        - Fetches the compiled `Board` and starting `State` from the level collection, which only
+        compiles a level once. Neither is ever modified, so no copy is needed for a fresh start.
+        - Points a new camera at the player, zoomed out to fit the level in the view if needed,
+        and renders the static layer of the new level once.
+        - Cancels any solve still running, then picks up the AI solver of the board, creating it the
+        first time the level is played. The solvers of the last `SOLVERS_KEPT` levels played are kept,
+        so across resets a solver can reuse what it learnt from earlier searches, and it shares the game's solution cache, so levels solved before are
+        answered instantly. The level's pattern database starts building in the background, so it is
+        usually ready by the time Solve is clicked.
+
+        This method is intended to be called whenever a new level is started or the current 
+        level needs to be reset.
+        """        
+        self.board, self.state = self.levels[self.current_level_key]
+        self.camera = Camera(self.board.width, self.board.height, VIEW_WIDTH, VIEW_HEIGHT, TILE_SIZE)
+        self.camera.follow(self.player_x, self.player_y)
+        self.build_static_layer()
+        if self.solver_thread is not None:
+            self.cancel_solve()
+            self.solver_thread.join()  # The solver may be reused, so the old search must be over
+            self.solver_thread = None
+        self.solve = self.solvers.get(self.board.key)
+        if self.solve is not None:
+            self.solvers.move_to_end(self.board.key)
+        else:
+            patterns.prefetch(self.board, PATTERN_SIZE)
+            self.solve = AI(self.board, time_limit=SOLVE_TIME_LIMIT, cache=self.solution_cache, patterns=PATTERN_SIZE)
+            self.solvers[self.board.key] = self.solve
+            if len(self.solvers) > SOLVERS_KEPT:
+                self.solvers.popitem(last=False)
+        self.playback = None
+        self.printed_level()
+    
+    def switch_level(self):
+        """
+        Switches to the next level or ends the game if all levels have been completed.
+
+        This method determines the current level's index within the list of level keys and checks
+        if there is an upcoming level to switch to. If there is another level, the game updates
+        the current level key to that level and loads it with a log message. If the current level is the last
+        one in the list, it logs messages indicating that all levels have been completed and the
+        game comes to an end.
+
+        """        
+        # Determine the current level index
+        keys = self.levels.keys()
+        current_level_index = keys.index(self.current_level_key)
+        keys_length = len(keys)
+        logger.debug("Current Level Key: %s", self.current_level_key)
+
+        # Check if there's a next level
+        if current_level_index < keys_length - 1:
+            logger.info("%s Complete!", self.current_level_key)
+            # Switch to the next level
+            self.current_level_key = keys[current_level_index + 1]
+            logger.info("%s Start!", self.current_level_key)
+            self.load_level()
+        else:
+            # If there's no next level, end the game or perform any other actions
+            logger.info("All levels completed. Game over.")
+            self.is_running = False
+
+    def draw_reset_button(self):
+        """
+        Draws the reset button on the screen.
+
+        This method draws the button labeled 'Reset' on the screen. When the mouse pointer is over the button,
+        the button's appearance changes to indicate that it can be clicked. Clicks are handled by
+        `handle_mouse_click`, which resets the level by calling the `reset_level` method.
+
+        The label is rendered once when the game starts, so drawing the button is only a fill and a copy.
+
+        Returns:
+            pygame.Rect: The screen area of the button.
+        """
+        button_rect = self.reset_button_rect
+        colour = LIGHTER_SHADE if button_rect.collidepoint(self.mouse) else DARKER_SHADE  # Overlay when interacted
+        pygame.draw.rect(self.screen, colour, button_rect)
+
+        # Position of the button
+        button_text = self.labels[reset]
+        self.screen.blit(button_text, (button_rect.centerx - button_text.get_width() // 2, button_rect.centery - button_text.get_height() // 2))
+        return button_rect
+    
+    def reset_level(self):
+        """
+        Resets the current game level to its initial state.
+
+        The method does this by calling `load_level`, which reads the initial level data from the `levels` dictionary
+        and sets up the level accordingly. It also logs a message indicating that the level has been
+        reset in the log.
+        """
+        logger.info("Level reset")
+        self.load_level()
+
+    
+    def draw_key(self, surface):
+        """
+        Draws a key on the given surface that illustrates what each colour represents in the game for user clarity.
+
+        The key is positioned towards the right-hand side of the game window. It includes visual representations
+        for walls, the player, boxes, and targets, each with a corresponding colour using the pygame font 
+        and draw features .Next to each box, a text label describes what the box represents. The method 
+        calculates the size of the key area based on the number of elements and draws a border around 
+        the key for clarity. It is drawn into the cached static layer, so this only happens once per level.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the key on.
+
+        Attributes:
+            x_start (int): The x-coordinate of the start position for the key on the screen.
+            y_start (int): The y-coordinate of the start position for the key on the screen.
+            key_elements (list of tuples): A list where each tuple contains a string label and a Pygame colour
+                                            representing an element in the game.
+            key_width (int): The width of the key area, determined by the longest text label.
+            key_height (int): The height of the key area, calculated based on the number of elements.
+            font (pygame.font.Font): The font used for rendering text labels next to the key symbols, made once in `__init__`.
+        """        
+        x_start = WIDTH - 150
+        y_start = 50
+        
+        # Define key elements and their colours
+        key_elements = [
+            ("Wall", BLACK),
+            ("Player", BLUE),
+            ("Box", BROWN),
+            ("Target", SILVER),
+        ]
+        
+        # Key visibilty
+        font = self.key_font
+        key_width = 150  
+        key_height = len(key_elements) * 30 + 10 
+
+        # Border for the key
+        border_rect = pygame.Rect(x_start - 5, y_start - 5, key_width, key_height)  # Border thickness
+        pygame.draw.rect(surface, BLACK, border_rect, 2)  # Border colour
+
+        for i, (element, colour) in enumerate(key_elements):
+            # Draw the box representing the element
+            box_rect = pygame.Rect(x_start, y_start + i * 30, 20, 20)  # Box sized : 20x20
+            pygame.draw.rect(surface, colour, box_rect)
+
+            # Render the text next to the box
+            key_text = font.render(element, True, BLACK) 
+            surface.blit(key_text, (x_start + 25, y_start + i * 30))
+    
+    def update(self):
+        """
+        Updates the game screen with the current game state.
+
+        The camera first follows the player; if that scrolls the view, the static layer is
+        rendered again for the new view.
+
+        After a level is loaded (or the window needs repainting) the whole screen is drawn once:
+        the cached static layer, the boxes, the player and the UI elements such as the solve and
+        reset buttons. Every frame after that only redraws what changed since the previous one:
+        the tiles whose box or player changed after a move or push, the buttons when the hover or
+        the label changes, and the progress text when it says something new. Only those areas are
+        sent to the display with `pygame.display.update`, so a frame where nothing moves costs
+        next to nothing.
+        """
+        if self.camera.follow(self.player_x, self.player_y):
+            self.build_static_layer()
+
+        if self.full_redraw:
+            # Draw the level and the player
+            self.draw_level()
+            self.draw_player()
+            # Draw UI elements
+            self.draw_solve_button()
+            self.draw_reset_button()
+            self.drawn_buttons = self.button_appearance()
+            self.drawn_progress = self.progress_lines()
+            self.draw_progress(self.drawn_progress)
+            # Update the display
+            pygame.display.flip()
+            self.full_redraw = False
+            self.drawn_state = self.state
+            return
+
+        dirty_rects = []
+        if self.state != self.drawn_state:
+            for cell in self.changed_cells(self.drawn_state, self.state):
+                rect = self.draw_tile(cell)
+                if rect:
+                    dirty_rects.append(rect)
+            self.drawn_state = self.state
+
+        buttons = self.button_appearance()
+        if buttons != self.drawn_buttons or any(rect.collidelist(dirty_rects) >= 0 for rect in (self.solve_button_rect, self.reset_button_rect)):
+            dirty_rects.append(self.draw_solve_button())
+            dirty_rects.append(self.draw_reset_button())
+            self.drawn_buttons = buttons
+
+        progress = self.progress_lines()
+        if progress != self.drawn_progress:
+            dirty_rects.append(self.draw_progress(progress))
+            self.drawn_progress = progress
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    def changed_cells(self, old_state, new_state):
+        """
+        Lists the cells that look different between two states of the same level.
+
+        Returns:
+            list of int: The old and new player cells and every cell a box left or arrived on.
+        """
+        cells = box_cells(old_state.boxes ^ new_state.boxes)
+        cells.append(old_state.player)
+        cells.append(new_state.player)
+        return cells
+
+    def button_appearance(self):
+        """
+        Describes how the buttons should look right now, to tell when they need redrawing.
+        """
+        return (
+            self.solver_thread is not None,
+            self.solve_button_rect.collidepoint(self.mouse),
+            self.reset_button_rect.collidepoint(self.mouse),
+        )
+    
+    # ---------- In game interaction methods for the game and the events that take place ----------
+
+    def events(self):
+        """
+        A method that determines the observe software and peripheral events in Sokoban.
+
+        The game is able to go into different states that is controlled by the user. 
+        It can close when the user decides to stop running the programming, it can perform keyboard
+        events and, it can perform mouse events
+
+        """        
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.is_running = False
+            elif event.type == pygame.KEYDOWN:
+                self.handle_keyboard_events(event)
+            elif event.type == pygame.MOUSEMOTION:
+                self.handle_mouse_events()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.handle_mouse_click(event.pos)
+            elif event.type == pygame.MOUSEWHEEL and event.y:
+                self.zoom(1.25 if event.y > 0 else 0.8)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.full_redraw = True  # The window was uncovered, so paint all of it again
+            elif event.type == SOLUTION_FOUND:
+                self.handle_solution(event)
+    
+    def handle_keyboard_events(self, event):
+        """
+        Handles the keyboard events, specifically the player movements controlled by the user.
+
+        This method updates the player's position based on arrow key inputs. While the AI is
+        solving in the background the player cannot move, and the Escape key cancels the solve.
+        While a solution is being played back, the keys control the playback instead. The + and -
+        keys zoom the camera at any time.
+        It calls `player_actions` to move the player and handle any interactions
+        at the new position (e.g, pushing boxes).
+        
+        Args:
+            event (pygame.event.Event): The event object representing a keyboard event. 
+            This contains information about the specific key pressed.
+        """    
+        if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.zoom(1.25)
+            return
+        if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.zoom(0.8)
+            return
+        if self.solver_thread is not None:
+            if event.key == pygame.K_ESCAPE:
+                self.cancel_solve()
+            return
+        if self.playback is not None:
+            self.handle_playback_keys(event)
+            return
+
+         # Initialize new_x and new_y
+        new_x, new_y = self.player_x, self.player_y
+
+        # Update new_x and new_y based on the pressed key
+        if event.key == pygame.K_UP:
+            new_y = self.player_y - 1
+        elif event.key == pygame.K_DOWN:
+            new_y = self.player_y + 1
+        elif event.key == pygame.K_RIGHT:
+            new_x = self.player_x + 1
+        elif event.key == pygame.K_LEFT:
+            new_x = self.player_x - 1
+
+        # Only act on the arrow keys, the board itself checks the level bounds
+        if (new_x, new_y) != (self.player_x, self.player_y):
+            self.player_actions(new_x, new_y)
+     
+    def zoom(self, factor):
+        """
+        Zooms the camera in or out by a factor, keeping the player in view.
+
+        Args:
+            factor (float): Multiplies the tile size; above 1 zooms in, below 1 zooms out.
+        """
+        if self.camera.zoom(factor):
+            self.camera.follow(self.player_x, self.player_y)
+            self.build_static_layer()
+
+    def handle_mouse_events(self):
+        """
+        Used specifically for on click mouse events and indicate when the user performs a mouse action.
+        """        
+        # Reveals the position of the mouse
+        self.mouse = pygame.mouse.get_pos()
+
+    def handle_mouse_click(self, position):
+        """
+        Handles a left click on the Solve (or Cancel) and Reset buttons.
+
+        When Solve is clicked, it starts solving the level automatically with the AI solver in the
+        background, from wherever the player and boxes are now, and clicking the button again while
+        that runs cancels the search. Each click arrives as a
+        single event, so no delay is needed to stop a held button from triggering again.
+
+        Args:
+            position (tuple): The (x, y) screen position of the click.
+        """
+        self.mouse = position
+        if self.solve_button_rect.collidepoint(position):
+            if self.solver_thread is not None:
+                self.cancel_solve()
+            else:
+                self.start_solve()
+        elif self.reset_button_rect.collidepoint(position):
+            self.reset_level()
+    
+    def player_actions(self, new_x, new_y):
+        """
+        Executes the actions that take place when moving the player to a new position on the grid.
+    
+        This method asks the board for the result of stepping towards the requested position.
+        If the position holds a box, the step is handed to the push_box method, which tries to
+        push the box to the next position in the same direction. Otherwise the player moves as long
+        as the position is not a wall or outside the level. If the movement or push is successful,
+        it updates the game state accordingly in the debug log.
+
+        Args:
+            new_x (int): The x-coordinate of the new position the player is attempting to move to.
+            new_y (int): The y-coordinate of the new position the player is attempting to move to.
+
+        """        
+        direction = DIRECTION_INDEX[(new_x - self.player_x, new_y - self.player_y)]
+        logger.debug("Current Position: (%d, %d)", self.player_x, self.player_y)
+        logger.debug("Requested Position: (%d, %d)", new_x, new_y)
+
+        new_state = self.board.move(self.state, direction)
+        if new_state is None:
+            logger.debug("Cannot move to the new position.")
+        # If the new position has a box, the move is a push
+        elif new_state.boxes != self.state.boxes:
+            logger.debug("Trying to push the box.")
+            self.push_box(new_state)
+        # If the new position is empty, move the player
+        else:
+            logger.debug("Moving player.")
+            self.state = new_state
+
+        logger.debug("Updated Position: (%d, %d)", self.player_x, self.player_y)
+        logger.debug("Updated Level:")
+        self.printed_level()
+
+    def push_box(self, new_state):
+        """
+        This method applies a box push that the board has already checked.
+        
+        This method is called when the player moves into a space occupied by a box and the box
+        can be pushed onto an empty space or a target. It updates the game state to reflect the
+        box's new position and checks for level completion when a box is placed on a target.
+
+        Args:
+            new_state (State): The state after the player has pushed the box.
+        
+        """        
+        new_box = (new_state.boxes & ~self.state.boxes).bit_length() - 1
+        logger.debug("Box Position: %s", self.board.coords(new_state.player))
+        logger.debug("New Box Position: %s", self.board.coords(new_box))
+        logger.debug("Moving player and pushing the box.")
+        self.state = new_state
+        # Check for box placement and level completion
+        if new_box in self.board.targets:
+            logger.debug("Box placed")
+            self.placed_boxes_checker()
+    
+    def placed_boxes_checker(self):
+        """
+        Checks if all boxes have been placed on their respective targets within the current level.
+
+        This method asks the board for the number of targets without a box on them.
+        If no targets are left (indicating that all boxes have been placed on targets), it proceeds
+        to switch to the next level. Otherwise, it logs the number of targets that are still
+        awaiting a box.
+
+        """        
+        target_count = self.board.remaining_targets(self.state.boxes) # Counts number of targets
+
+        if target_count == 0:
+            logger.info("All boxes placed on targets.")
+            self.switch_level() # When there is no more unoccupied targets, it switches the level
+        else:
+            logger.debug("%d target(s) remaining.", target_count) # Shows remaining targets still available
+    
+    # ----------AI element, involving the solve button and the animation of the solution----------
+
+    def draw_solve_button(self):
+        """
+        Draws the 'Solve' button.
+
+        While the AI is solving in the background the button reads 'Cancel' instead. The button
+        appearance changes when hovered to indicate it's interactive; clicks are handled by
+        `handle_mouse_click`.
+
+        Returns:
+            pygame.Rect: The screen area of the button.
+        """
+        button_rect = self.solve_button_rect
+        colour = LIGHTER_SHADE if button_rect.collidepoint(self.mouse) else DARKER_SHADE
+        pygame.draw.rect(self.screen, colour, button_rect)
+
+        # Button position
+        button_text = self.labels[cancel if self.solver_thread is not None else solve]
+        self.screen.blit(button_text, (button_rect.centerx - button_text.get_width() // 2, button_rect.centery - button_text.get_height() // 2))
+        return button_rect
+    
+    def start_solve(self):
+        """
+        Starts solving the current level in a background thread.
+
+        The game loop keeps running while the AI searches, so the window stays responsive and shows
+        the search progress. The search gives up after `SOLVE_TIME_LIMIT` seconds, and its outcome
+        comes back to the main loop as a `SOLUTION_FOUND` event.
+
+        The search starts from the current position, so a solve part-way through a level works as a
+        hint. A solution that is still being played back is stopped where it is.
+        """
+        logger.info("Solving %s...", self.current_level_key)
+        self.playback = None
+        self.solve_id += 1
+        self.solve_started = time.perf_counter()
+        self.solve.reset_cancel()  # Here rather than in the thread, so a cancel right after this is kept
+        self.solver_thread = threading.Thread(target=self.run_solver, args=(self.solve, self.state, self.solve_id), daemon=True)
+        self.solver_thread.start()
+
+    def run_solver(self, solver, start_state, solve_id):
+        """
+        Runs in the solver thread: searches for a solution and posts the outcome to the main loop.
+
+        Args:
+            solver (AI): The solver of the level being solved.
+            start_state (State): The state to solve from.
+            solve_id (int): Number of this solve, sent back with the outcome.
+        """
+        try:
+            solution_path, stats = solver.solve(start_state)
+        except Exception:
+            logger.exception("The solver failed")
+            solution_path, stats = None, solver.stats
+        pygame.event.post(pygame.event.Event(SOLUTION_FOUND, solve_id=solve_id, solution=solution_path, stats=stats))
+
+    def cancel_solve(self):
+        """
+        Asks the background solve to stop; its `SOLUTION_FOUND` event then carries no solution.
+        """
+        logger.info("Cancelling the solve...")
+        self.solve.cancel()
+
+    def handle_solution(self, event):
+        """
+        Receives the outcome of a background solve and animates the solution if there is one.
+
+        The outcome of a solve that was cancelled by a reset or a level change is ignored.
+
+        Args:
+            event (pygame.event.Event): The `SOLUTION_FOUND` event posted by `run_solver`.
+        """
+        if event.solve_id != self.solve_id or self.solver_thread is None:
+            return
+        self.solver_thread = None
+        if event.solution is not None:
+            logger.info("Solution found: %d moves", len(event.solution))
+            self.animate_solution(event.solution)
+        elif event.stats.stopped == "cancelled":
+            logger.info("Solve cancelled.")
+        elif event.stats.stopped == "time":
+            logger.info("No solution found within %s seconds.", SOLVE_TIME_LIMIT)
+        else:
+            logger.info("No solution found.")
+
+    def progress_lines(self):
+        """
+        Describes the progress of a running background solve, or of the solution playback.
+
+        The nodes expanded, the current f-bound of the search and the elapsed time are read from
+        the solver's live statistics.
+
+        Returns:
+            list of str: The lines to show next to the buttons, empty when there is nothing to show.
+        """
+        if self.solver_thread is not None:
+            stats = self.solve.stats
+            elapsed = time.perf_counter() - self.solve_started
+            return [
+                f"Nodes: {stats.expanded}",
+                f"Bound: {stats.bound}",
+                f"Time: {elapsed:.1f}s / {SOLVE_TIME_LIMIT}s",
+            ]
+        if self.playback is not None:
+            return [
+                f"Move: {self.playback.position}/{self.playback.length}",
+                f"Speed: {self.playback.speed:g} moves/s",
+                "Paused" if self.playback.paused else "Playing",
+            ]
+        return []
+
+    def draw_progress(self, lines):
+        """
+        Draws the progress lines next to the buttons, over a clean copy of the static layer.
+
+        Returns:
+            pygame.Rect: The screen area of the progress text.
+        """
+        self.screen.blit(self.background, self.progress_rect, self.progress_rect)
+        for i, line in enumerate(lines):
+            text = self.progress_font.render(line, True, BLACK)
+            self.screen.blit(text, (self.progress_rect.x, self.progress_rect.y + i * 20))
+        return self.progress_rect
+
+    def animate_solution(self, solution_path):
+        """
+        Starts playing the solution on the game screen step by step.
+            
+        The moves are not played here: a `Playback` is set up and the game loop advances it on
+        every frame, so the window keeps handling input however long the solution is. The speed
+        starts at `PLAYBACK_SPEED` moves per second.
+
+        A solution with a blocked move, such as a stale one from the solution cache, is not played;
+        a warning is logged and the Solve button can be used again straight away.
+
+        Args:
+            solution_path (list of tuples): A sequence of (x, y) moves representing the solution.
+        """
+        try:
+            self.playback = Playback(self.board, self.state, solution_path, PLAYBACK_SPEED)
+        except ValueError as error:
+            logger.warning("Cannot play the solution: %s", error)
+            self.playback = None
+            self.solver_thread = None
+
+    def update_playback(self, seconds):
+        """
+        Advances the solution playback by the time of one frame.
+
+        The shown state is taken from the playback, and once the last move has been played the
+        level is checked for completion as if the player had made the moves.
+
+        Args:
+            seconds (float): Time since the previous frame.
+        """
+        if self.playback is None:
+            return
+        if self.playback.advance(seconds) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Playback move %d/%d", self.playback.position, self.playback.length)
+        self.state = self.playback.state
+        if self.playback.finished:
+            self.playback = None
+            self.printed_level()
+            self.placed_boxes_checker()
+
+    def handle_playback_keys(self, event):
+        """
+        Controls the solution playback from the keyboard.
+
+        Space pauses or resumes, the Left and Right arrows step one move back or forward, Up and
+        Down double or halve the speed, Enter skips to the end and Escape stops the playback where
+        it is.
+
+        Args:
+            event (pygame.event.Event): The keyboard event.
+        """
+        if event.key == pygame.K_SPACE:
+            self.playback.toggle_pause()
+        elif event.key == pygame.K_RIGHT:
+            self.playback.step(1)
+        elif event.key == pygame.K_LEFT:
+            self.playback.step(-1)
+        elif event.key == pygame.K_UP:
+            self.playback.change_speed(2)
+        elif event.key == pygame.K_DOWN:
+            self.playback.change_speed(0.5)
+        elif event.key == pygame.K_RETURN:
+            self.playback.skip_to_end()
+        elif event.key == pygame.K_ESCAPE:
+            self.state = self.playback.state
+            self.playback = None
+
+    # ----------Method to run loop of the game events and elements----------
+    def run(self):
+        while self.is_running:
+            milliseconds = self.clock.tick(FPS)
+            self.events()
+            self.update_playback(milliseconds / 1000)
+            self.update()
+
+        # Stop a background solve before the display goes away
+        if self.solver_thread is not None:
+            self.cancel_solve()
+            self.solver_thread.join()
+        patterns.shutdown()
+        
+        # Quit Pygame
+        pygame.quit()
+        sys.exit()
+
+# ----------Main game loop-----------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.info("I have been launched!")
+    game = SokobanGame(sys.argv[1] if len(sys.argv) > 1 else None)
+    game.run()
@@ -0,0 +1,326 @@
+# ----------Pattern-database heuristic over small groups of boxes, cached on disk per level----------
+#
+# The per-box estimates price every box as if it were alone on the board. A pattern database
+# holds, for every group of a few boxes, the exact number of pushes needed to bring that group
+# onto targets with the walls and the other boxes of the group in the way, found once by a
+# breadth-first search that pulls the boxes away from every placement on targets. Only the extra
+# pushes a group needs over the sum of its boxes' nearest-target distances are kept, since for most
+# groups there are none, and a group that can never reach the targets is stored as `UNREACHABLE`.
+#
+# The search over all groups is the expensive part, so a table is built once per level layout and
+# group size and written to disk, named by the layout key, and a later run or another process
+# loads it lazily. `prefetch` builds tables in a background process pool, for example while the
+# player is still looking at a new level, so they are ready by the time a solve asks for them.
+
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from itertools import combinations
+from math import comb
+from analysis import UNREACHABLE, LevelAnalysis
+from board import box_cells
+from stats import logger
+
+# How the pattern estimate is combined with the solver's own heuristic
+COMBINES = ("max", "add")
+
+# Boxes per group a table can be built for
+MIN_GROUP, MAX_GROUP = 2, 4
+
+# Most groups of live cells a table is built for; larger levels go without one
+MAX_PATTERNS = 300000
+
+# Bump whenever the tables change meaning, so older files are ignored
+PATTERNS_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sokoban-patterns")
+
+# States the build searches between two looks at its deadline and at whether it was cancelled
+DEADLINE_CHECK_EVERY = 1024
+
+# Longest wait for a background build between two looks at whether the solve was cancelled, in seconds
+POLL_SECONDS = 0.05
+
+# Tables loaded or built in this process, keyed by (layout key, group size)
+_tables = {}
+
+# Builds running in the background pool, keyed like `_tables`
+_pending = {}
+_executor = None
+
+
+def build_table(board, size, deadline=None, cancelled=None):
+    """
+    Works out the extra pushes every group of `size` boxes needs over its per-box estimate.
+
+    A breadth-first search with pulls starts from every placement of the group on targets, with
+    the player in any region next to a box, so each group of box cells is first reached with the
+    fewest pushes that solve it from some player position. Cells a lone box can never bring to a
+    target are left out, as the per-box estimate already rules them out.
+
+    Args:
+        board (Board): The level to build the table for.
+        size (int): Boxes per group.
+        deadline (float, optional): `time.perf_counter()` value to give up at.
+        cancelled (callable, optional): Returns True once the build should be given up.
+
+    Returns:
+        dict or None: Box bitmask of the group -> extra pushes, for every group that needs any, or
+                      `UNREACHABLE` for a group that can never be solved. Empty if the level has
+                      fewer targets than `size` or more than `MAX_PATTERNS` groups, None if the
+                      deadline passed or the build was cancelled first.
+    """
+    analysis = LevelAnalysis.for_board(board)
+    nearest_distance = analysis.nearest_distance
+    live = [cell for cell in range(board.size) if nearest_distance[cell] != UNREACHABLE]
+    if len(analysis.target_list) < size or comb(len(live), size) > MAX_PATTERNS:
+        return {}
+
+    neighbours = board.neighbours
+    pushes = {}  # Box bitmask -> fewest pushes to solve the group
+    seen = set()
+    frontier = []
+    for group in combinations(analysis.target_list, size):
+        boxes = sum(1 << cell for cell in group)
+        pushes[boxes] = 0
+        for box in group:
+            for table in neighbours:
+                cell = table[box]
+                if cell >= 0 and not boxes >> cell & 1:
+                    state = (min(board.reachable(cell, boxes)), boxes)
+                    if state not in seen:
+                        seen.add(state)
+                        frontier.append(state)
+
+    distance = 0
+    searched = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for player, boxes in frontier:
+            searched += 1
+            if not searched % DEADLINE_CHECK_EVERY and (
+                    deadline is not None and time.perf_counter() > deadline or cancelled is not None and cancelled()):
+                return None
+            reach = board.reachable(player, boxes)
+            for box in box_cells(boxes):
+                for direction in range(4):
+                    pulled_to = neighbours[direction][box]  # The player stands here and the box follows
+                    if pulled_to in reach:
+                        behind = neighbours[direction][pulled_to]
+                        if behind >= 0 and not boxes >> behind & 1:
+                            new_boxes = boxes ^ (1 << box) ^ (1 << pulled_to)
+                            state = (min(board.reachable(behind, new_boxes)), new_boxes)
+                            if state not in seen:
+                                seen.add(state)
+                                next_frontier.append(state)
+                                if new_boxes not in pushes:
+                                    pushes[new_boxes] = distance
+        frontier = next_frontier
+
+    table = {}
+    for group in combinations(live, size):
+        boxes = sum(1 << cell for cell in group)
+        solved = pushes.get(boxes)
+        if solved is None:
+            table[boxes] = UNREACHABLE
+        else:
+            extra = solved - sum(nearest_distance[cell] for cell in group)
+            if extra > 0:
+                table[boxes] = extra
+    return table
+
+
+def table_path(board, size, cache_dir):
+    """
+    Returns where the table of a level layout and group size is stored.
+    """
+    return os.path.join(cache_dir, f"{board.key}-{size}-v{PATTERNS_VERSION}.pickle")
+
+
+def read_table(board, size, cache_dir):
+    """
+    Reads a stored table, or returns None if there is none or it cannot be read.
+    """
+    if cache_dir is None:
+        return None
+    try:
+        with open(table_path(board, size, cache_dir), "rb") as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def build_and_store(board, size, cache_dir, deadline=None, cancelled=None):
+    """
+    Builds a table and writes it to disk; this is what runs in the background pool.
+
+    Returns:
+        dict or None: The table, see `build_table`, or None if the deadline passed or the build
+                      was cancelled first.
+    """
+    table = build_table(board, size, deadline, cancelled)
+    if table is not None and cache_dir is not None:
+        path = table_path(board, size, cache_dir)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                pickle.dump(table, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except OSError:
+            pass  # A read-only or full disk only costs the caching, not the table
+    return table
+
+
+def prefetch(board, size, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Starts building a table in the background pool, unless it is loaded, stored or already building.
+
+    Args:
+        board (Board): The level to build the table for.
+        size (int): Boxes per group; 0 does nothing.
+        cache_dir (str, optional): Where tables are stored, None to keep them in memory only.
+    """
+    global _executor
+    key = (board.key, size)
+    if not size or key in _tables or key in _pending:
+        return
+    if cache_dir is not None and os.path.exists(table_path(board, size, cache_dir)):
+        return
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+    _pending[key] = _executor.submit(build_and_store, board, size, cache_dir)
+
+
+def shutdown():
+    """
+    Stops the background pool from starting any more builds.
+
+    Builds already running are not waited for here; they finish in their worker process and are
+    still written to disk, so the next run finds them.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    _pending.clear()
+
+
+class PatternHeuristic:
+
+    def __init__(self, analysis, size=2, combine="max", cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Prepares the pattern-database heuristic for a level; its table is only loaded by `load`.
+
+        Args:
+            analysis (LevelAnalysis): Supplies the board and the nearest-target distances.
+            size (int): Boxes per group, from `MIN_GROUP` to `MAX_GROUP`.
+            combine (str): "max" raises the estimate by the largest extra cost of any one group,
+                           "add" by the extra costs of a set of groups that share no box.
+            cache_dir (str, optional): Where tables are stored, None to keep them in memory only.
+        """
+        if not MIN_GROUP <= size <= MAX_GROUP:
+            raise ValueError(f"Pattern groups must have {MIN_GROUP} to {MAX_GROUP} boxes, not {size}")
+        if combine not in COMBINES:
+            raise ValueError(f"Unknown pattern combination: {combine}")
+        self.analysis = analysis
+        self.board = analysis.board
+        self.size = size
+        self.combine = combine
+        self.cache_dir = cache_dir
+        self.table = None
+
+    def load(self, timeout=None, cancelled=None):
+        """
+        Makes the table available, from memory, a background build, the disk or a new build.
+
+        A table still building in the background is waited for at most `timeout` seconds; if it is
+        not ready by then the search goes without it and a later call picks it up. With nothing
+        building, a missing table is built right here within the same `timeout`, and given up on
+        if it cannot be finished in time. Either way the wait ends within `POLL_SECONDS` of
+        `cancelled` returning True, so a cancelled solve is not held up by the table.
+
+        Args:
+            timeout (float, optional): Longest wait for the table, in seconds.
+            cancelled (callable, optional): Returns True once the solve waiting for the table is cancelled.
+
+        Returns:
+            bool: True if the table is loaded.
+        """
+        if self.table is not None:
+            return True
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        key = (self.board.key, self.size)
+        table = _tables.get(key)
+        if table is None and key in _pending:
+            while True:
+                wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, max(0, deadline - time.perf_counter()))
+                try:
+                    table = _pending[key].result(wait)
+                except TimeoutError:
+                    if cancelled is not None and cancelled():
+                        logger.info("Solve cancelled while the pattern database was building")
+                        return False
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        logger.info("Pattern database still building, searching without it")
+                        return False
+                    continue
+                except Exception:
+                    logger.exception("Building the pattern database failed")
+                    table = None
+                break
+            del _pending[key]
+        if table is None:
+            table = read_table(self.board, self.size, self.cache_dir)
+        if table is None:
+            table = build_and_store(self.board, self.size, self.cache_dir, deadline, cancelled)
+            if table is None:
+                if cancelled is not None and cancelled():
+                    logger.info("Solve cancelled while the pattern database was building")
+                else:
+                    logger.info("Pattern database could not be built in time, searching without it")
+                return False
+        self.table = _tables[key] = table
+        return True
+
+    def penalty(self, boxes):
+        """
+        Extra pushes the boxes need over the sum of their nearest-target distances.
+
+        Every group of `size` boxes is looked up. With "max" the largest extra cost is returned,
+        with "add" the groups are taken greedily from the most expensive down, skipping any that
+        shares a box with one already taken, and their extra costs are summed; the boxes of
+        separate groups are pushed separately, so the sum never overestimates.
+
+        Args:
+            boxes (int): The box bitmask of the state to estimate.
+
+        Returns:
+            int or float: The extra pushes, `UNREACHABLE` if some group can never be solved.
+        """
+        table = self.table
+        if not table:
+            return 0
+        found = []
+        for group in combinations(box_cells(boxes), self.size):
+            mask = 0
+            for cell in group:
+                mask |= 1 << cell
+            extra = table.get(mask)
+            if extra is not None:
+                if extra == UNREACHABLE:
+                    return UNREACHABLE
+                found.append((extra, mask))
+        if not found:
+            return 0
+        if self.combine == "max":
+            return max(found)[0]
+        total = 0
+        used = 0
+        for extra, mask in sorted(found, reverse=True):
+            if not used & mask:
+                total += extra
+                used |= mask
+        return total
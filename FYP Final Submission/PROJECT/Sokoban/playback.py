@@ -0,0 +1,107 @@
+# ----------Frame-driven playback of a solution----------
+#
+# Every state along the solution is worked out once up front, so the game only has to look up
+# which state to show on each frame. Pausing, stepping either way and skipping to the end are
+# then just changes of position, and nothing here ever waits or needs a display.
+
+from board import DIRECTION_INDEX
+
+# Limits of the playback speed, in moves per second
+MIN_SPEED, MAX_SPEED = 0.25, 64
+
+
+class Playback:
+
+    def __init__(self, board, start_state, moves, speed=1.0):
+        """
+        Prepares the playback of a list of moves.
+
+        Args:
+            board (Board): The level the moves are played on.
+            start_state (State): The state the moves start from.
+            moves (list of tuples): A sequence of (x, y) moves, as returned by the solver.
+            speed (float): Moves played per second.
+
+        Raises:
+            ValueError: If one of the moves is blocked.
+        """
+        self.states = [start_state]
+        for move in moves:
+            state = board.move(self.states[-1], DIRECTION_INDEX[move])
+            if state is None:
+                raise ValueError(f"Move {len(self.states)} of the solution is blocked")
+            self.states.append(state)
+        self.position = 0
+        self.speed = min(max(speed, MIN_SPEED), MAX_SPEED)
+        self.paused = False
+        self.elapsed = 0.0  # Time since the last move was shown
+
+    @property
+    def state(self):
+        """
+        The state shown at the current position.
+        """
+        return self.states[self.position]
+
+    @property
+    def length(self):
+        """
+        The number of moves in the solution.
+        """
+        return len(self.states) - 1
+
+    @property
+    def finished(self):
+        """
+        Whether the final state of the solution is shown.
+        """
+        return self.position == self.length
+
+    def advance(self, seconds):
+        """
+        Moves the playback on by the time that passed since the previous frame.
+
+        Several moves are played in one frame when the speed is higher than the frame rate.
+
+        Args:
+            seconds (float): Time since the previous frame.
+
+        Returns:
+            bool: True if the position changed.
+        """
+        if self.paused or self.finished:
+            return False
+        self.elapsed += seconds
+        steps = int(self.elapsed * self.speed)
+        if not steps:
+            return False
+        self.elapsed -= steps / self.speed
+        self.position = min(self.position + steps, self.length)
+        return True
+
+    def step(self, count):
+        """
+        Pauses the playback and moves it by a number of moves, backwards when negative.
+        """
+        self.paused = True
+        self.elapsed = 0.0
+        self.position = min(max(self.position + count, 0), self.length)
+
+    def toggle_pause(self):
+        """
+        Pauses a playing playback or resumes a paused one, from the move it is on.
+        """
+        self.paused = not self.paused
+        self.elapsed = 0.0
+
+    def skip_to_end(self):
+        """
+        Jumps straight to the final state without showing the moves in between.
+        """
+        self.position = self.length
+
+    def change_speed(self, factor):
+        """
+        Multiplies the playback speed by a factor, keeping it within its limits.
+        """
+        self.speed = min(max(self.speed * factor, MIN_SPEED), MAX_SPEED)
@@ -1,21 +1,28 @@
-# Game Settings
-WIDTH, HEIGHT = 640, 480
-title = "Sokoban"
-FPS = 60
-
-# Draw Grid
-TILE_SIZE = 60
-GRID_WIDTH, GRID_HEIGHT = WIDTH // TILE_SIZE, HEIGHT // TILE_SIZE
-
-# Colours
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BROWN = (150, 75, 0)
-SILVER = (192, 192, 192)
-BLUE = (0, 0, 255)
-LIGHTER_SHADE = (170, 170, 170)
-DARKER_SHADE = (100, 100, 100)
-
-# Button Settings
-solve = "Solve"
-reset = "Reset"
\ No newline at end of file
+# Game Settings
+WIDTH, HEIGHT = 640, 480
+title = "Sokoban"
+FPS = 60
+
+# Draw Grid
+TILE_SIZE = 60  # Largest starting tile size; bigger levels are zoomed out to fit, then scroll
+VIEW_WIDTH, VIEW_HEIGHT = WIDTH - 160, HEIGHT - 90  # Screen area of the level, left of the key and above the buttons
+
+# Colours
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BROWN = (150, 75, 0)
+SILVER = (192, 192, 192)
+BLUE = (0, 0, 255)
+LIGHTER_SHADE = (170, 170, 170)
+DARKER_SHADE = (100, 100, 100)
+
+# Button Settings
+solve = "Solve"
+reset = "Reset"
+cancel = "Cancel"
+
+# AI Settings
+SOLVE_TIME_LIMIT = 30  # Seconds a background solve may run before it gives up
+PATTERN_SIZE = 2  # Boxes per group of the pattern-database heuristic, built in the background on level load; 0 switches it off
+SOLVERS_KEPT = 16  # Levels whose AI solver, with what it learnt from earlier solves, is kept after leaving them
+PLAYBACK_SPEED = 1  # Solution moves played per second, changed in game with the Up and Down keys
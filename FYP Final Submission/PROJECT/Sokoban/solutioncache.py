@@ -0,0 +1,199 @@
+# ----------Persistent store of solutions, keyed by level layout and state----------
+#
+# A solution is stored as the list of box pushes it makes, under the layout key of the board and
+# the normalized state it starts from, so any position with the same boxes and the same player
+# region finds it; the walks between the pushes are worked out again for the actual player cell.
+# Move-optimal solutions are stored under the player's own cell instead, since the walk to the
+# first push is part of what they minimize.
+# Every state the solution passes through after a push is stored too, with the rest of the
+# solution, so a level that was solved once can be finished instantly from anywhere along the way.
+#
+# Entries are tagged with the solver's version string. Solutions from another version are never
+# returned, and as they are never used again they are the first to go when the store is full.
+
+import os
+import sqlite3
+import threading
+import time
+from board import DIRECTION_INDEX, State
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sokoban-solutions.sqlite3")
+
+# Entries kept before the least recently used are evicted
+MAX_ENTRIES = 200000
+
+# Direction letters used to store pushes, in the order of `DIRECTIONS`
+PUSH_LETTERS = "udlr"
+
+
+def moves_to_pushes(board, start_state, moves):
+    """
+    Lists the box pushes made by a sequence of player moves.
+
+    Args:
+        board (Board): The level the moves are made on.
+        start_state (State): The state the moves start from.
+        moves (list of tuples): A sequence of (x, y) moves.
+
+    Returns:
+        list of tuples: (box cell, direction index) for every push, in order.
+    """
+    pushes = []
+    state = start_state
+    for move in moves:
+        direction = DIRECTION_INDEX[move]
+        new_state = board.move(state, direction)
+        if new_state.boxes != state.boxes:
+            pushes.append((new_state.player, direction))
+        state = new_state
+    return pushes
+
+
+def encode_pushes(pushes):
+    return ",".join(f"{box}{PUSH_LETTERS[direction]}" for box, direction in pushes)
+
+
+def decode_pushes(text):
+    return [(int(push[:-1]), PUSH_LETTERS.index(push[-1])) for push in text.split(",")] if text else []
+
+
+class SolutionCache:
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=MAX_ENTRIES):
+        """
+        Opens (or creates) the solution store.
+
+        The database is only opened on first use, and a store that cannot be opened or written
+        is switched off instead of failing the solve.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_entries (int): How many states to keep before evicting the least recently used.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None
+        self.disabled = False
+        self.lock = threading.Lock()  # The game solves in a background thread
+
+    def connect(self):
+        """
+        Returns the database connection, creating the table on first use.
+        """
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                " version TEXT, level TEXT, player INTEGER, boxes TEXT,"
+                " length INTEGER, pushes TEXT, used REAL,"
+                " UNIQUE (version, level, player, boxes))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+            connection.commit()
+            self.connection = connection
+        return self.connection
+
+    def lookup(self, board, state, version, exact_player=False):
+        """
+        Finds a stored solution for a position.
+
+        Args:
+            board (Board): The level.
+            state (State): The position to solve from.
+            version (str): The version string of the solver asking.
+            exact_player (bool): Match the player's own cell rather than its region, for solvers
+                                 that minimize moves.
+
+        Returns:
+            list of tuples or None: (box cell, direction index) for every push of the solution,
+                                    or None if the position has no stored solution.
+        """
+        if self.disabled:
+            return None
+        normalized = state if exact_player else board.normalize(state)
+        key = (version, board.key, normalized.player, format(normalized.boxes, "x"))
+        try:
+            with self.lock:
+                connection = self.connect()
+                row = connection.execute(
+                    "SELECT rowid, pushes FROM solutions WHERE version = ? AND level = ? AND player = ? AND boxes = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute("UPDATE solutions SET used = ? WHERE rowid = ?", (time.time(), row[0]))
+                connection.commit()
+        except (OSError, sqlite3.Error):
+            self.disabled = True
+            return None
+        return decode_pushes(row[1])
+
+    def store(self, board, start_state, pushes, version, exact_player=False):
+        """
+        Stores a solution, along with the rest of it from every state it passes through.
+
+        A state that already has a solution with fewer pushes keeps it.
+
+        Args:
+            board (Board): The level.
+            start_state (State): The position the solution starts from.
+            pushes (list of tuples): (box cell, direction index) for every push of the solution.
+            version (str): The version string of the solver that found it.
+            exact_player (bool): Key every state on the player's own cell rather than its region,
+                                 for solutions that minimize moves.
+        """
+        if self.disabled:
+            return
+        now = time.time()
+        rows = []
+        player, boxes = start_state
+        for index in range(len(pushes) + 1):
+            normalized = State(player, boxes) if exact_player else board.normalize(State(player, boxes))
+            suffix = pushes[index:]
+            rows.append((version, board.key, normalized.player, format(normalized.boxes, "x"),
+                         len(suffix), encode_pushes(suffix), now))
+            if index < len(pushes):
+                box, direction = pushes[index]
+                boxes ^= (1 << box) ^ (1 << board.neighbours[direction][box])
+                player = box
+        try:
+            with self.lock:
+                connection = self.connect()
+                connection.executemany(
+                    "INSERT INTO solutions (version, level, player, boxes, length, pushes, used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (version, level, player, boxes) DO UPDATE SET"
+                    " length = excluded.length, pushes = excluded.pushes, used = excluded.used"
+                    " WHERE excluded.length < solutions.length",
+                    rows,
+                )
+                self.evict(connection)
+                connection.commit()
+        except (OSError, sqlite3.Error):
+            self.disabled = True  # A read-only or full disk only costs the caching, not the solve
+
+    def evict(self, connection):
+        """
+        Deletes the least recently used entries above `max_entries`.
+        """
+        count = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __getstate__(self):
+        """
+        Leaves the connection and lock behind when the cache is sent to a worker process.
+        """
+        state = self.__dict__.copy()
+        state["connection"] = None
+        state["lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
@@ -0,0 +1,136 @@
+# ----------Search statistics and logging shared by every solver mode----------
+#
+# The solver reports through the "sokoban.solver" logger: a one-line summary of every search at
+# INFO and a trace of every expanded state at DEBUG. The trace is only built when DEBUG is enabled
+# for that logger at the start of a search, and phase timers are only wrapped around the search
+# when they are asked for, so with both switched off the search runs exactly as fast as before.
+
+import logging
+import time
+
+logger = logging.getLogger("sokoban.solver")
+
+# Phases of a search that can be timed separately
+PHASES = ("successors", "heuristic", "heap")
+
+
+class SearchStats:
+
+    def __init__(self, timed=False, sampler=None, sample_every=1000):
+        """
+        Collects the counters and timings of one search.
+
+        Args:
+            timed (bool): Whether to time the phases listed in `PHASES`.
+            sampler (callable, optional): Called with this object every `sample_every` expansions,
+                                          for example to record progress or sample the call stack.
+            sample_every (int): Expansions between two calls of `sampler`.
+        """
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0  # Successors or heap entries dropped because the state was already known
+        self.pruned = {}  # Deadlocked pushes left out, per deadlock check
+        self.macros = 0  # Successors that carried a box through a tunnel or into a goal room
+        self.frontier_peak = 0  # Largest open list, or deepest stack for IDA*
+        self.bound = 0  # Highest f-cost expanded so far, or the current IDA* bound
+        self.weight = None  # Heuristic weight of the current or last anytime iteration
+        self.timers = dict.fromkeys(PHASES, 0.0)
+        self.timed = timed
+        self.sampler = sampler
+        self.sample_every = sample_every
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.solution_length = None
+        self.stopped = None
+        self.cached = False  # Whether the solution came from the solution cache instead of a search
+        self.collisions = 0  # Different states found sharing a Zobrist key, only counted when verifying hashes
+
+    def timer(self, phase, function):
+        """
+        Wraps a function so the time spent in it is added to one phase timer.
+
+        When phase timing is off the function is returned unchanged, so it costs nothing.
+
+        Args:
+            phase (str): One of `PHASES`.
+            function (callable): The function to time.
+
+        Returns:
+            callable: The function, timed or not.
+        """
+        if not self.timed:
+            return function
+        timers = self.timers
+        clock = time.perf_counter
+
+        def timed_function(*args):
+            started = clock()
+            result = function(*args)
+            timers[phase] += clock() - started
+            return result
+        return timed_function
+
+    def sample(self):
+        """
+        Hands the statistics to the sampler hook once every `sample_every` expansions.
+        """
+        if self.expanded % self.sample_every == 0:
+            self.sampler(self)
+
+    def finish(self, solution_length, stopped):
+        """
+        Records how the search ended and how long it took.
+        """
+        self.seconds = time.perf_counter() - self.started
+        self.solution_length = solution_length
+        self.stopped = stopped
+
+    @property
+    def nodes_per_second(self):
+        return self.expanded / self.seconds if self.seconds > 0 else None
+
+    def as_dict(self):
+        """
+        Returns the statistics as a plain dictionary, ready to be written as JSON.
+        """
+        result = {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "pruned": dict(self.pruned),
+            "macros": self.macros,
+            "frontier_peak": self.frontier_peak,
+            "bound": self.bound,
+            "weight": self.weight,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes_per_second,
+            "solution_length": self.solution_length,
+            "stopped": self.stopped,
+            "cached": self.cached,
+            "collisions": self.collisions,
+        }
+        if self.timed:
+            result["timers"] = dict(self.timers)
+        return result
+
+    def log(self, level=logging.INFO):
+        """
+        Writes a one-line summary of the search to the solver logger.
+
+        Args:
+            level (int): The logging level to report at.
+        """
+        if not logger.isEnabledFor(level):
+            return
+        if self.cached:
+            outcome = f"solved in {self.solution_length} moves from the solution cache"
+        elif self.solution_length is not None:
+            outcome = f"solved in {self.solution_length} moves"
+        else:
+            outcome = f"unsolved ({self.stopped or 'no solution'})"
+        pruned = ", ".join(f"{check} {count}" for check, count in self.pruned.items()) or "none"
+        logger.log(level, "Search %s: %d expanded, %d generated, %d duplicates, pruned %s, frontier peak %d, %.3fs",
+                   outcome, self.expanded, self.generated, self.duplicates, pruned, self.frontier_peak, self.seconds)
+        if self.timed:
+            logger.log(level, "Phase times: %s",
+                       ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.timers.items()))
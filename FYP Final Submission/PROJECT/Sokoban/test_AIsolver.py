@@ -0,0 +1,229 @@
+# ----------Tests of the solver's searches against plain breadth-first search----------
+
+import threading
+import time
+import pytest
+import AIsolver
+from AIsolver import AI, SearchTree
+from benchmark import DEFAULT_CORPUS
+from board import DIRECTION_INDEX, Board
+from conftest import bfs_moves, bfs_pushes, replay
+from levelfile import open_levels
+
+LEFT, RIGHT = 2, 3
+
+
+def test_push_mode_finds_the_fewest_pushes(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, stats = AI(board).solve(state)
+        assert replay(board, state, moves) == optimal, name
+        assert stats.solution_length == len(moves)
+
+
+def test_move_mode_finds_the_fewest_moves(small_levels):
+    for name, board, state, _ in small_levels[:8]:
+        moves, _ = AI(board, mode="move").solve(state)
+        replay(board, state, moves)
+        assert len(moves) == bfs_moves(board, state), name
+
+
+def test_push_successors_are_normalized_pushes(small_levels):
+    _, board, state, _ = small_levels[-1]
+    solver = AI(board)
+    first = board.normalize(state)
+    successors = solver.generate_push_successors(first)
+    assert successors
+    for successor, direction, pushes in successors:
+        assert pushes == 1
+        assert successor == board.normalize(successor)
+        assert (first.boxes ^ successor.boxes).bit_count() == 2
+
+
+def test_unsolvable_level_returns_no_solution():
+    board, state = Board.from_xsb(["#####", "#$-.#", "#@--#", "#####"])  # The box is stuck in a corner
+    moves, stats = AI(board).solve(state)
+    assert moves is None
+    assert stats.stopped is None
+
+
+def test_unknown_options_are_rejected():
+    board, _ = Board.from_xsb(["#####", "#@$.#", "#####"])
+    with pytest.raises(ValueError):
+        AI(board, mode="teleport")
+    with pytest.raises(ValueError):
+        AI(board, algorithm="dijkstra")
+
+
+def test_matching_heuristic_keeps_the_search_optimal(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, _ = AI(board, heuristic="matching").solve(state)
+        assert replay(board, state, moves) == optimal, name
+
+
+def test_search_tree_rebuilds_the_path_from_parent_pointers():
+    board, state = Board.from_xsb(["#######", "#@-$-.#", "#######"])
+    tree = SearchTree()
+    root = tree.add(state)
+    first = board.move(state, RIGHT)
+    step = tree.add(first, root, RIGHT, first.player)
+    tree.add(board.move(state, LEFT) or state, root, LEFT)  # A sibling that is not on the path
+    end = tree.add(None, step, RIGHT, board.index(3, 1))
+    steps = tree.path(end, lambda parent, cell, direction: board.move(parent, direction))
+    assert steps == [(state, first, RIGHT), (first, board.move(first, RIGHT), RIGHT)]
+
+
+def test_each_state_is_expanded_at_most_once(small_levels):
+    for name, board, state, _ in small_levels:
+        # Without deadlock pruning the search space is exactly the states plain BFS reaches
+        _, stats = AI(board, deadlocks=()).solve(state)
+        assert stats.expanded <= bfs_pushes(board, state, stop_at_goal=False), name
+    _, stats = AI(small_levels[-1][1], deadlocks=()).solve(small_levels[-1][2])
+    assert stats.duplicates > 0
+
+
+def test_every_deadlock_check_keeps_the_search_optimal(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, _ = AI(board, deadlocks=("dead_square", "freeze", "corral")).solve(state)
+        assert replay(board, state, moves) == optimal, name
+
+
+def test_idastar_finds_the_fewest_pushes(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, stats = AI(board, algorithm="idastar").solve(state)
+        assert replay(board, state, moves) == optimal, name
+        assert stats.bound == optimal, name
+
+
+def test_idastar_stays_optimal_with_a_tiny_transposition_table(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, _ = AI(board, algorithm="idastar", table_size=1).solve(state)
+        assert replay(board, state, moves) == optimal, name
+
+
+def test_idastar_proves_an_unsolvable_level():
+    board, state = Board.from_xsb(["#####", "#$-.#", "#@--#", "#####"])
+    moves, stats = AI(board, algorithm="idastar").solve(state)
+    assert moves is None
+    assert stats.stopped is None
+
+
+def test_cancel_stops_a_search_running_in_another_thread():
+    board, state = open_levels(DEFAULT_CORPUS, None)["Corpus 6"]
+    solver = AI(board, mode="move")
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(solver.solve(state)))
+    thread.start()
+    while solver.stats.expanded == 0:
+        time.sleep(0.001)
+    solver.cancel()
+    thread.join(10)
+    moves, stats = outcome[0]
+    assert moves is None and stats.stopped == "cancelled"
+    # A cancel made before the search starts still stops it, until it is reset
+    board, state = Board.from_xsb(["#######", "#@-$-.#", "#######"])
+    solver = AI(board)
+    solver.cancel()
+    moves, stats = solver.solve(state)
+    assert moves is None and stats.stopped == "cancelled"
+    solver.reset_cancel()
+    assert solver.solve(state)[0] == [(1, 0), (1, 0), (1, 0)]
+
+
+def test_a_later_solve_from_the_solution_reuses_the_first(small_levels):
+    for name, board, state, optimal in small_levels:
+        solver = AI(board)
+        moves, _ = solver.solve(state)
+        half = len(moves) // 2
+        middle = state
+        for move in moves[:half]:
+            middle = board.move(middle, DIRECTION_INDEX[move])
+        rest, stats = solver.solve(middle)
+        assert replay(board, middle, rest) == bfs_pushes(board, middle), name
+        assert stats.expanded <= 1, name
+
+
+def test_what_earlier_searches_learnt_keeps_later_ones_optimal(small_levels):
+    for name, board, state, _ in small_levels:
+        solver = AI(board)
+        solver.solve(state)
+        assert solver.learned, name
+        # Every first push leads somewhere the earlier search saw, but not always along its solution
+        for successor, _, _ in solver.generate_push_successors(board.normalize(state)):
+            for algorithm in ("astar", "idastar"):
+                solver.algorithm = algorithm
+                moves, _ = solver.solve(successor)
+                optimal = bfs_pushes(board, successor)
+                assert (moves is None if optimal is None else replay(board, successor, moves) == optimal), name
+
+
+def test_states_proven_unsolvable_are_remembered():
+    board, state = Board.from_xsb(["#####", "#$-.#", "#@--#", "#####"])
+    solver = AI(board, deadlocks=())
+    assert solver.solve(state)[0] is None
+    assert solver.zobrist.key(board.normalize(state)) in solver.unsolvable
+
+
+def test_unsolvable_states_are_remembered_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(AIsolver, "LEARNED_LIMIT", 2)
+    board, state = Board.from_xsb(["######", "#$---#", "#@-$.#", "######"])
+    solver = AI(board, deadlocks=())
+    assert solver.solve(state)[0] is None
+    assert len(solver.unsolvable) == 2
+
+
+def test_bidirectional_search_finds_the_fewest_pushes(small_levels):
+    for heuristic in ("nearest", "matching"):
+        for name, board, state, optimal in small_levels:
+            moves, _ = AI(board, heuristic=heuristic, algorithm="bidirectional").solve(state)
+            assert replay(board, state, moves) == optimal, (heuristic, name)
+
+
+def test_bidirectional_search_proves_an_unsolvable_level():
+    board, state = Board.from_xsb(["#####", "#$-.#", "#@--#", "#####"])
+    assert AI(board, algorithm="bidirectional").solve(state)[0] is None
+    with pytest.raises(ValueError):
+        AI(board, mode="move", algorithm="bidirectional")
+
+
+def test_anytime_search_ends_with_an_optimal_solution(small_levels):
+    improved = 0
+    for name, board, state, optimal in small_levels:
+        found = []
+        solver = AI(board, algorithm="anytime", on_improve=lambda moves, stats: found.append(replay(board, state, moves)))
+        moves, stats = solver.solve(state)
+        assert replay(board, state, moves) == optimal, name
+        assert stats.weight == 1 and stats.stopped is None, name
+        # Every reported solution is better than the one before
+        assert found and found == sorted(set(found), reverse=True) and found[-1] == optimal, name
+        improved += len(found) > 1
+    assert improved
+
+
+def test_anytime_weight_bounds_the_first_solution(small_levels):
+    for name, board, state, optimal in small_levels:
+        moves, stats = AI(board, algorithm="anytime", weights=(5,)).solve(state)
+        assert replay(board, state, moves) <= 5 * optimal, name
+
+
+def test_anytime_search_out_of_budget_returns_its_best_so_far(small_levels):
+    for name, board, state, optimal in small_levels:
+        first = []
+        AI(board, algorithm="anytime", on_improve=lambda moves, stats: first.append(stats.expanded)).solve(state)
+        solver = AI(board, algorithm="anytime", max_nodes=first[0])
+        moves, stats = solver.solve(state)
+        if stats.stopped is None:
+            continue  # Proven optimal within the budget already
+        assert stats.stopped == "nodes", name
+        assert replay(board, state, moves) >= optimal, name
+        assert not solver.known_suffixes, name
+        break
+    else:
+        pytest.fail("no level left its first anytime solution unproven")
+
+
+def test_anytime_weights_must_be_at_least_1():
+    board, _ = Board.from_xsb(["#####", "#@$.#", "#####"])
+    with pytest.raises(ValueError):
+        AI(board, algorithm="anytime", weights=(2, 0.5))
+    with pytest.raises(ValueError):
+        AI(board, algorithm="anytime", weights=())
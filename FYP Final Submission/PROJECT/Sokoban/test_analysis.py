@@ -0,0 +1,62 @@
+# ----------Tests of the cached per-level analysis----------
+
+from collections import OrderedDict
+import analysis
+from analysis import UNREACHABLE, LevelAnalysis
+from board import Board
+
+ROOM = [
+    "######",
+    "#----#",
+    "#-$@-#",
+    "#--.-#",
+    "######",
+]
+
+
+def test_dead_squares_are_the_cells_no_box_can_leave_for_a_target():
+    board, _ = Board.from_xsb(ROOM)
+    analysis = LevelAnalysis(board)
+    dead = {board.coords(cell) for cell in range(board.size) if not board.walls[cell] and analysis.dead_squares[cell]}
+    # Every cell against a wall, except along the bottom wall that the target is against
+    assert dead == {(1, 1), (2, 1), (3, 1), (4, 1), (1, 2), (4, 2), (1, 3), (4, 3)}
+
+
+def test_push_distances_count_pushes_to_each_target():
+    board, state = Board.from_xsb(ROOM)
+    analysis = LevelAnalysis(board)
+    target = board.index(3, 3)
+    assert analysis.target_list == [target]
+    distances = analysis.push_distances[0]
+    assert distances[target] == 0
+    assert distances[board.index(2, 2)] == 2
+    assert distances[board.index(1, 1)] == UNREACHABLE
+    assert analysis.nearest_distance == distances
+
+
+def test_push_distances_from_is_the_mirror_of_pull_distances():
+    board, state = Board.from_xsb(ROOM)
+    analysis = LevelAnalysis(board)
+    box = board.index(2, 2)
+    forwards = analysis.push_distances_from([box])
+    assert forwards[board.index(3, 3)] == analysis.pull_distances(board.index(3, 3))[box]
+
+
+def test_for_board_reuses_the_analysis_of_the_same_layout():
+    first, state = Board.from_xsb(ROOM)
+    second, _ = Board.from_xsb(ROOM)
+    assert first is not second
+    assert LevelAnalysis.for_board(first) is LevelAnalysis.for_board(second)
+    assert LevelAnalysis.for_board(first).is_goal(first.target_mask)
+    assert not LevelAnalysis.for_board(first).is_goal(state.boxes)
+
+
+def test_for_board_keeps_only_the_layouts_used_last(monkeypatch):
+    monkeypatch.setattr(analysis, "CACHE_LIMIT", 2)
+    monkeypatch.setattr(analysis, "_cache", OrderedDict())
+    boards = [Board.from_xsb(["#" * width, "#@$" + "-" * (width - 5) + ".#", "#" * width])[0] for width in (6, 7, 8)]
+    first = LevelAnalysis.for_board(boards[0])
+    LevelAnalysis.for_board(boards[1])
+    assert LevelAnalysis.for_board(boards[0]) is first  # Now the most recently used
+    LevelAnalysis.for_board(boards[2])
+    assert list(analysis._cache) == [boards[0].key, boards[2].key]
@@ -0,0 +1,43 @@
+# ----------Tests of the parallel batch solver----------
+
+from AIsolver import AI
+from batch import main, solve_levels
+from levelfile import open_levels
+
+
+def test_solve_levels_reports_every_level_once():
+    levels = open_levels()
+    results = {result.level: result for result in solve_levels(levels, workers=2)}
+    assert sorted(results) == sorted(levels.keys())
+    for name, result in results.items():
+        board, state = levels[name]
+        moves, stats = AI(board).solve(state)
+        assert result.solved and result.stopped is None
+        assert (result.moves, result.nodes) == (len(moves), stats.expanded)
+        assert result.peak_rss_kb is None or result.peak_rss_kb > 0
+    # Each worker's first level raises its peak from nothing
+    assert any(result.raised_peak for result in results.values())
+
+
+def test_solve_levels_passes_the_budget_to_each_worker():
+    results = list(solve_levels(open_levels(), workers=2, max_nodes=1))
+    assert any(result.stopped == "nodes" for result in results)
+    for result in results:
+        assert result.solved != (result.stopped == "nodes")
+
+
+def test_a_level_that_fails_is_reported_without_ending_the_batch(tmp_path):
+    path = tmp_path / "levels.xsb"
+    path.write_text("; Good\n#####\n#@$.#\n#####\n\n; No player\n#####\n#-$.#\n#####\n")
+    results = {result.level: result for result in solve_levels(open_levels(str(path), None), workers=1)}
+    assert results["Good"].solved
+    assert not results["No player"].solved
+    assert results["No player"].stopped == "error: Level has no player"
+
+
+def test_main_exits_with_1_when_a_level_is_unsolved(capsys):
+    assert main(["--workers", "2"]) == 0
+    assert main(["--workers", "2", "--max-nodes", "1"]) == 1
+    output = capsys.readouterr().out
+    assert "worker peak RSS" in output and "(raised by this level)" in output
+    assert output.rstrip().endswith("levels solved")
@@ -0,0 +1,68 @@
+# ----------Tests of the benchmark harness and its baseline comparison----------
+
+import json
+from benchmark import MIN_SECONDS, compare, main, measure_level, option_differences
+from levelfile import open_levels
+
+
+def result(level, solved=True, nodes=100, seconds=1.0, stopped=None):
+    return {"level": level, "solved": solved, "nodes_expanded": nodes, "seconds": seconds, "stopped": stopped}
+
+
+def test_compare_lists_unsolved_slower_and_larger_searches():
+    baseline = [result("a"), result("b"), result("c"), result("d"), result("gone")]
+    results = [
+        result("a", nodes=110, seconds=1.1),  # Within the threshold
+        result("b", solved=False, stopped="time"),
+        result("c", nodes=200),
+        result("d", seconds=2.0),
+    ]
+    assert compare(results, baseline, 0.10) == [
+        "b: no longer solved (time)",
+        "c: nodes expanded 100 -> 200",
+        "d: time 1.000s -> 2.000s",
+    ]
+
+
+def test_compare_ignores_short_timings_and_levels_that_were_unsolved():
+    baseline = [result("fast", seconds=0.001), result("hard", solved=False)]
+    results = [result("fast", seconds=MIN_SECONDS / 2), result("hard", solved=False)]
+    assert compare(results, baseline, 0.10) == []
+
+
+def test_measure_level_records_the_search():
+    levels = open_levels()
+    name = levels.keys()[0]
+    measured = measure_level(levels, name, {"max_nodes": 100000})
+    assert measured["level"] == name and measured["solved"]
+    assert measured["solution_length"] > 0 and measured["nodes_expanded"] > 0
+    assert "timers" not in measured
+
+
+def test_main_writes_results_and_passes_against_its_own_baseline(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    assert main(["--corpus", "", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert len(report["results"]) == len(open_levels())
+    assert report["solver_options"]["macros"] == []
+    assert main(["--corpus", "", "--output", str(tmp_path / "again.json"), "--baseline", str(output), "--threshold", "100"]) == 0
+    assert "No regressions" in capsys.readouterr().out
+
+
+def test_option_differences_lists_what_changed():
+    options = {"mode": "push", "macros": (), "time_limit": 60.0}
+    assert option_differences(options, {"mode": "push", "macros": [], "time_limit": 60.0}) == []
+    assert option_differences(options, {"mode": "move", "macros": [], "time_limit": 60.0, "timed": True}) == [
+        "mode: 'move' in the baseline, 'push' now",
+        "timed: True in the baseline, None now",
+    ]
+
+
+def test_main_refuses_a_baseline_recorded_with_other_options(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    assert main(["--corpus", "", "--output", str(output)]) == 0
+    assert main(["--corpus", "", "--output", str(tmp_path / "matching.json"), "--heuristic", "matching",
+                 "--baseline", str(output)]) == 2
+    out = capsys.readouterr().out
+    assert "other solver options" in out and "heuristic: 'nearest' in the baseline, 'matching' now" in out
+    assert "REGRESSION" not in out
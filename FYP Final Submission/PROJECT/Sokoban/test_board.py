@@ -0,0 +1,77 @@
+# ----------Tests of the headless board engine----------
+
+from board import BOX, EMPTY, PLAYER, TARGET, WALL, Board, State
+
+RIGHT, LEFT, UP, DOWN = 3, 2, 0, 1
+
+CORRIDOR = [
+    "#######",
+    "#@-$-.#",
+    "#######",
+]
+
+
+def test_from_grid_reads_every_tile():
+    grid = [
+        [WALL, WALL, WALL, WALL, WALL],
+        [WALL, PLAYER, BOX, TARGET, WALL],
+        [WALL, WALL, WALL, WALL, WALL],
+    ]
+    board, state = Board.from_grid(grid)
+    assert (board.width, board.height) == (5, 3)
+    assert state == State(board.index(1, 1), 1 << board.index(2, 1))
+    assert board.targets == {board.index(3, 1)}
+    assert board.walls[board.index(0, 0)] and not board.walls[board.index(3, 1)]
+    assert board.to_grid(state) == grid
+
+
+def test_from_grid_treats_missing_cells_as_walls():
+    board, _ = Board.from_grid([[WALL, WALL, WALL], [WALL, PLAYER], [WALL, EMPTY, WALL]])
+    assert board.walls[board.index(2, 1)]
+    assert board.neighbours[RIGHT][board.index(1, 1)] == -1
+
+
+def test_from_xsb_walls_off_the_floor_outside_the_level():
+    board, state = Board.from_xsb([
+        "  ####",
+        "###-.#",
+        "#@$--#",
+        "######",
+    ])
+    assert state.player == board.index(1, 2)
+    assert board.walls[board.index(0, 0)]  # Outside, never reachable
+    assert not board.walls[board.index(3, 1)]
+
+
+def test_move_walks_and_pushes():
+    board, state = Board.from_xsb(CORRIDOR)
+    state = board.move(state, RIGHT)
+    assert state == State(board.index(2, 1), 1 << board.index(3, 1))
+    state = board.move(state, RIGHT)
+    assert state == State(board.index(3, 1), 1 << board.index(4, 1))
+    state = board.move(state, RIGHT)
+    assert board.is_solved(state.boxes)
+    assert board.remaining_targets(state.boxes) == 0
+
+
+def test_move_is_blocked_by_walls_and_stuck_boxes():
+    board, state = Board.from_xsb(CORRIDOR)
+    assert board.move(state, UP) is None
+    assert board.move(state, LEFT) is None
+    board, state = Board.from_xsb(["######", "#@$$.#", "######"])
+    assert board.move(state, RIGHT) is None  # Two boxes in a row cannot be pushed
+
+
+def test_normalize_moves_the_player_to_the_top_left_of_its_region():
+    board, state = Board.from_xsb(["#####", "#-$.#", "#--@#", "#####"])
+    assert board.normalize(state) == State(board.index(1, 1), state.boxes)
+    assert board.reachable(state.player, state.boxes) == {board.index(x, y) for x, y in ((1, 1), (1, 2), (2, 2), (3, 2), (3, 1))}
+
+
+def test_player_path_walks_round_boxes():
+    board, state = Board.from_xsb(["#####", "#@$-#", "#---#", "#.--#", "#####"])
+    steps = board.player_path(state.player, board.index(3, 1), state.boxes)
+    assert len(steps) == 4
+    for direction in steps:
+        state = board.move(state, direction)
+    assert state.player == board.index(3, 1) and state.boxes == 1 << board.index(2, 1)
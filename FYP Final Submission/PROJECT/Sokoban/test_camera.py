@@ -0,0 +1,42 @@
+# ----------Tests of the scrolling, zoomable camera----------
+
+from camera import MARGIN, MAX_TILE_SIZE, MIN_TILE_SIZE, Camera
+
+
+def test_small_levels_fit_without_scrolling():
+    camera = Camera(10, 12, 640, 480, 60)
+    assert camera.tile_size == 40  # 480 // 12 rows
+    assert not camera.follow(9, 11)
+    assert camera.visible_range() == (0, 0, 10, 12)
+
+
+def test_large_levels_are_zoomed_out_down_to_the_smallest_tile():
+    camera = Camera(400, 300, 640, 480, 60)
+    assert camera.tile_size == MIN_TILE_SIZE
+    first_x, first_y, end_x, end_y = camera.visible_range()
+    assert (end_x - first_x) * MIN_TILE_SIZE == 640
+
+
+def test_view_follows_the_player_with_a_margin():
+    camera = Camera(200, 100, 640, 480, 60)
+    size = camera.tile_size
+    assert camera.follow(150, 50)
+    x, y = camera.screen_position(150, 50)
+    assert MARGIN * size <= x <= 640 - (MARGIN + 1) * size
+    assert MARGIN * size <= y <= 480 - (MARGIN + 1) * size
+    assert not camera.follow(150, 50)
+
+
+def test_view_stops_at_the_edges_of_the_level():
+    camera = Camera(200, 100, 640, 480, 60)
+    camera.follow(199, 99)
+    assert camera.visible_range()[2:] == (200, 100)
+    camera.follow(0, 0)
+    assert (camera.left, camera.top) == (0, 0)
+
+
+def test_zoom_keeps_the_tile_size_within_its_limits():
+    camera = Camera(10, 8, 640, 480, 60)
+    assert camera.zoom(100) and camera.tile_size == MAX_TILE_SIZE
+    assert not camera.zoom(2)
+    assert camera.zoom(0) and camera.tile_size == MIN_TILE_SIZE
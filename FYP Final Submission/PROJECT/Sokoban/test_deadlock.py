@@ -0,0 +1,87 @@
+# ----------Tests of the deadlock checks run after every push----------
+
+import pytest
+from analysis import LevelAnalysis
+from board import Board
+from deadlock import DeadlockDetector
+
+OPEN_ROOM = [
+    "########",
+    "#@-----#",
+    "#------#",
+    "#------#",
+    "#------#",
+    "#......#",
+    "########",
+]
+
+
+def detector_for(rows, checks):
+    board, state = Board.from_xsb(rows)
+    return board, state, DeadlockDetector(LevelAnalysis.for_board(board), checks)
+
+
+def block(board, cells):
+    boxes = 0
+    for x, y in cells:
+        boxes |= 1 << board.index(x, y)
+    return boxes
+
+
+def test_a_box_pushed_into_a_corner_is_on_a_dead_square():
+    board, state, detector = detector_for(OPEN_ROOM, ("dead_square",))
+    corner = board.index(6, 1)
+    assert detector.is_deadlock(1 << corner, corner, board.index(5, 1))
+    assert detector.pruned == {"dead_square": 1}
+    assert not detector.is_deadlock(1 << board.index(3, 3), board.index(3, 3), state.player)
+
+
+def test_a_square_of_boxes_off_the_targets_is_frozen():
+    board, state, detector = detector_for(OPEN_ROOM, ("freeze",))
+    boxes = block(board, [(2, 2), (3, 2), (2, 3), (3, 3)])
+    assert detector.is_deadlock(boxes, board.index(3, 3), state.player)
+    assert detector.pruned == {"freeze": 1}
+    assert len(detector.patterns) == 1  # Memoized by the local box pattern
+    assert detector.is_deadlock(boxes, board.index(3, 3), state.player)
+    assert len(detector.patterns) == 1
+
+
+def test_a_square_of_boxes_on_the_targets_is_not_a_deadlock():
+    board, state, detector = detector_for([
+        "######",
+        "#@---#",
+        "#-..-#",
+        "#-..-#",
+        "#----#",
+        "######",
+    ], ("freeze",))
+    boxes = block(board, [(2, 2), (3, 2), (2, 3), (3, 3)])
+    assert not detector.is_deadlock(boxes, board.index(2, 2), state.player)
+
+
+def test_a_box_that_can_still_move_is_not_frozen():
+    board, state, detector = detector_for(OPEN_ROOM, ("freeze",))
+    boxes = block(board, [(2, 2), (3, 2)])
+    assert not detector.is_deadlock(boxes, board.index(3, 2), state.player)
+
+
+def test_a_box_sealing_off_an_empty_target_is_a_closed_corral():
+    rows = [
+        "######",
+        "#@-$##",
+        "###*.#",
+        "######",
+    ]
+    board, state, detector = detector_for(rows, ("corral",))
+    # The box on the doorway target can never be pushed, so the target behind it stays empty
+    assert detector.is_deadlock(state.boxes, board.index(3, 1), state.player)
+    assert detector.pruned == {"corral": 1}
+    # With a box behind it already on its target, the closed area is solved and does no harm
+    solved = state.boxes ^ block(board, [(3, 1), (4, 2)])
+    assert not detector.is_deadlock(solved, board.index(4, 2), state.player)
+
+
+def test_unknown_checks_are_rejected():
+    board, _ = Board.from_xsb(OPEN_ROOM)
+    with pytest.raises(ValueError):
+        DeadlockDetector(LevelAnalysis.for_board(board), ("pi_corral",))
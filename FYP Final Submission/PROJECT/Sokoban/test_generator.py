@@ -0,0 +1,83 @@
+# ----------Tests of the procedural level generator----------
+
+import random
+from board import Board
+from conftest import bfs_pushes
+from generator import BATCH_SIZE, canonical_key, generate_levels, main, random_level, rate_level
+from levelfile import open_levels
+
+LEVEL = [
+    "######",
+    "#@-..#",
+    "#-$$-#",
+    "##---#",
+    " #####",
+]
+
+
+def rotate(rows):
+    width = max(map(len, rows))
+    rows = [row.ljust(width) for row in rows]
+    return ["".join(row[x] for row in reversed(rows)) for x in range(width)]
+
+
+def key_of(rows):
+    return canonical_key(*Board.from_xsb(rows))
+
+
+def test_canonical_key_ignores_rotation_reflection_and_position():
+    key = key_of(LEVEL)
+    rows = LEVEL
+    for _ in range(3):
+        rows = rotate(rows)
+        assert key_of(rows) == key
+    assert key_of([row[::-1] for row in LEVEL]) == key
+    assert key_of(["", "   " + LEVEL[0]] + ["   " + row for row in LEVEL[1:]]) == key
+    # The player anywhere in the same region is the same puzzle
+    assert key_of([LEVEL[0], "#--..#", "#-$$-#", "##--@#", LEVEL[4]]) == key
+
+
+def test_canonical_key_tells_different_puzzles_apart():
+    assert key_of([LEVEL[0], "#@-..#", "#-$-$#", LEVEL[3], LEVEL[4]]) != key_of(LEVEL)
+    assert key_of([LEVEL[0], "#@-.-#", "#-$$.#", LEVEL[3], LEVEL[4]]) != key_of(LEVEL)
+
+
+def test_random_levels_can_be_solved_and_written_as_xsb():
+    rng = random.Random(7)
+    made = 0
+    while made < 10:
+        level = random_level(6, 6, 3, 40, rng)
+        if level is None:
+            continue
+        made += 1
+        board, state = level
+        optimal = bfs_pushes(board, state)
+        assert optimal is not None
+        copy, copy_state = Board.from_xsb(board.to_xsb(state))
+        assert canonical_key(copy, copy_state) == canonical_key(board, state)
+        assert rate_level(board, state, 100000)[0] == optimal
+
+
+def test_generated_levels_are_distinct_and_rated():
+    levels = [level for batch, _ in generate_levels(3, workers=1, width=6, height=6, min_pushes=4) for level in batch]
+    assert len(levels) == 3 and len({level.key for level in levels}) == 3
+    for level in levels:
+        board, state = Board.from_xsb(level.rows)
+        assert level.pushes == bfs_pushes(board, state) >= 4
+
+
+def test_generation_stops_after_the_most_candidates_allowed():
+    batches = list(generate_levels(1, workers=1, width=4, height=4, min_pushes=1000, max_candidates=2 * BATCH_SIZE))
+    assert [levels for levels, _ in batches] == [[], []]
+    assert batches[-1][1] == 2 * BATCH_SIZE
+
+
+def test_main_writes_a_collection_the_game_can_open(tmp_path, capsys):
+    output = tmp_path / "generated.xsb"
+    assert main(["--count", "2", "--workers", "1", "--width", "6", "--height", "6", "--min-pushes", "4",
+                 "--output", str(output)]) == 0
+    levels = open_levels(str(output), None)
+    assert levels.keys() == ["Generated 1", "Generated 2"]
+    assert main(["--count", "1", "--workers", "1", "--min-pushes", "1000", "--max-candidates", "1",
+                 "--output", str(tmp_path / "none.xsb")]) == 1
+    assert "Gave up" in capsys.readouterr().out
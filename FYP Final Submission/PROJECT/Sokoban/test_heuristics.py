@@ -0,0 +1,37 @@
+# ----------Tests of the minimum-cost matching heuristic----------
+
+import random
+from analysis import UNREACHABLE, LevelAnalysis
+from board import box_cells
+from heuristics import MatchingHeuristic
+
+
+def test_matching_is_admissible_and_at_least_the_nearest_target_sum(small_levels):
+    for name, board, state, optimal in small_levels:
+        analysis = LevelAnalysis.for_board(board)
+        estimate = MatchingHeuristic(analysis).estimate(state.boxes)
+        nearest = sum(analysis.nearest_distance[cell] for cell in box_cells(state.boxes))
+        assert nearest <= estimate <= optimal, name
+
+
+def test_incremental_update_matches_a_fresh_solve(small_levels):
+    rng = random.Random(1)
+    for name, board, state, _ in small_levels:
+        analysis = LevelAnalysis.for_board(board)
+        incremental = MatchingHeuristic(analysis)
+        boxes = state.boxes
+        for _ in range(30):
+            # Move a random box one cell, as a push would, without caring about the player
+            moves = [(box, ahead) for box in box_cells(boxes) for table in board.neighbours
+                     for ahead in [table[box]] if ahead >= 0 and not boxes >> ahead & 1]
+            box, ahead = rng.choice(moves)
+            parent, boxes = boxes, boxes ^ (1 << box) ^ (1 << ahead)
+            assert incremental.estimate(boxes, parent) == MatchingHeuristic(analysis).estimate(boxes), name
+
+
+def test_a_box_on_a_dead_square_makes_the_matching_unreachable(small_levels):
+    _, board, state, _ = small_levels[0]
+    analysis = LevelAnalysis.for_board(board)
+    dead = next(cell for cell in range(board.size) if not board.walls[cell] and analysis.dead_squares[cell])
+    box = box_cells(state.boxes)[0]
+    assert MatchingHeuristic(analysis).estimate(state.boxes ^ (1 << box) ^ (1 << dead)) == UNREACHABLE
@@ -0,0 +1,74 @@
+# ----------Tests of the level collections----------
+
+import pickle
+import pytest
+import levelfile
+from board import Board
+from levelfile import GridCollection, XsbCollection, open_levels
+
+COLLECTION = """; A made-up collection
+
+; Corridor
+#######
+#@ $ .#
+#######
+
+#####
+#@$.#
+#####
+Title: Short
+
+#####
+#@$.#
+#####
+
+; Corridor
+#######
+#.$@  #
+#######
+"""
+
+
+@pytest.fixture
+def collection_path(tmp_path):
+    path = tmp_path / "levels.xsb"
+    path.write_text(COLLECTION)
+    return str(path)
+
+
+def test_xsb_levels_are_named_by_comments_titles_or_number(collection_path):
+    levels = XsbCollection(collection_path, cache_dir=None)
+    assert levels.keys() == ["Corridor", "Short", "Level 3", "Corridor (4)"]
+    assert len(levels) == 4 and "Short" in levels
+
+
+def test_xsb_levels_are_parsed_only_when_asked_for(collection_path):
+    levels = XsbCollection(collection_path, cache_dir=None)
+    assert levels.compiled == {}
+    board, state = levels["Corridor (4)"]
+    expected_board, expected_state = Board.from_xsb(["#######", "#.$@  #", "#######"])
+    assert state == expected_state and board.targets == expected_board.targets
+    assert list(levels.compiled) == ["Corridor (4)"]
+
+
+def test_compiled_levels_are_reused_from_disk(collection_path, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "compiled")
+    first = XsbCollection(collection_path, cache_dir)["Short"]
+    # A second collection must not parse the level again
+    monkeypatch.setattr(levelfile.Board, "from_xsb", None)
+    second = XsbCollection(collection_path, cache_dir)["Short"]
+    assert second[1] == first[1]
+    assert second[0].walls == first[0].walls
+
+
+def test_compiled_levels_are_not_sent_to_workers(collection_path):
+    levels = XsbCollection(collection_path, cache_dir=None)
+    levels["Corridor"]
+    copy = pickle.loads(pickle.dumps(levels))
+    assert copy.compiled == {} and copy.keys() == levels.keys()
+
+
+def test_open_levels_picks_the_collection_kind(collection_path):
+    assert isinstance(open_levels(), GridCollection)
+    assert isinstance(open_levels({"one": [[1]]}), GridCollection)
+    assert isinstance(open_levels(collection_path, None), XsbCollection)
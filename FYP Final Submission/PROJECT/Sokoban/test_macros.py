@@ -0,0 +1,88 @@
+# ----------Tests of the tunnel and goal-room macro pushes----------
+
+import pytest
+from AIsolver import AI
+from analysis import LevelAnalysis
+from board import Board
+from conftest import bfs_pushes, replay
+from macros import KINDS, MacroPushes
+
+UP, DOWN = 0, 1
+
+# A box has to go down a one-wide corridor to its target
+TUNNEL = [
+    "#######",
+    "#@----#",
+    "#-$-###",
+    "###-###",
+    "###-###",
+    "###-###",
+    "###.###",
+    "#######",
+]
+
+# Two boxes go through one door into a room holding both targets
+GOAL_ROOM = [
+    "#########",
+    "#@------#",
+    "#--$-$--#",
+    "####-####",
+    "###---###",
+    "###-.-###",
+    "###.--###",
+    "#########",
+]
+
+
+def macros_for(rows, kinds=KINDS):
+    board, state = Board.from_xsb(rows)
+    return board, state, MacroPushes(LevelAnalysis.for_board(board), kinds)
+
+
+def test_tunnels_are_the_cells_walled_in_across_a_direction():
+    board, _, macros = macros_for(TUNNEL)
+    for y in (3, 4, 5, 6):
+        assert macros.tunnels[DOWN][board.index(3, y)] and macros.tunnels[UP][board.index(3, y)]
+    assert not macros.tunnels[DOWN][board.index(3, 2)]
+
+
+def test_a_goal_room_is_found_behind_its_door():
+    board, _, macros = macros_for(GOAL_ROOM)
+    [room] = macros.rooms.values()
+    assert (room.door, room.entrance) == (board.index(4, 3), board.index(4, 4))
+    # One stage per target, the furthest from the entrance first
+    assert len(room.fills) == 2
+    last_box, last_direction = room.fills[1 << room.entrance][-1]
+    assert board.neighbours[last_direction][last_box] == board.index(3, 6)
+
+
+@pytest.mark.parametrize("rows", [TUNNEL, GOAL_ROOM])
+def test_macro_solutions_replay_and_save_nodes(rows):
+    board, state = Board.from_xsb(rows)
+    _, plain = AI(board).solve(state)
+    moves, stats = AI(board, macros=KINDS).solve(state)
+    assert replay(board, state, moves) == bfs_pushes(board, state)
+    assert stats.macros > 0
+    assert stats.expanded < plain.expanded
+
+
+def test_macros_are_off_by_default():
+    board, state = Board.from_xsb(GOAL_ROOM)
+    assert AI(board).macros.kinds == []
+    assert AI(board).solve(state)[1].macros == 0
+
+
+def test_searches_with_macros_are_not_remembered(small_levels):
+    for name, board, state, _ in small_levels:
+        solver = AI(board, macros=KINDS)
+        moves, _ = solver.solve(state)
+        replay(board, state, moves)
+        assert not solver.admissible, name
+        assert not solver.known_suffixes and not solver.learned, name
+    assert AI(board).admissible
+
+
+def test_unknown_macros_are_rejected():
+    board, _ = Board.from_xsb(TUNNEL)
+    with pytest.raises(ValueError):
+        AI(board, macros=("teleport",))
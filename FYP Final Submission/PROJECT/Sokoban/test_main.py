@@ -0,0 +1,102 @@
+# ----------Tests of the game window's redrawing, run without a display----------
+
+import os
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import main
+from solutioncache import SolutionCache
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    # Keep the game's solution cache and pattern databases out of the home directory
+    monkeypatch.setattr(main, "SolutionCache", lambda: SolutionCache(str(tmp_path / "solutions.sqlite3")))
+    monkeypatch.setattr(main, "PATTERN_SIZE", 0)
+    monkeypatch.setattr(main.patterns, "prefetch", lambda board, size: None)
+    game = main.SokobanGame()
+    updates = []
+    monkeypatch.setattr(pygame.display, "update", updates.append)
+    game.updates = updates
+    game.update()  # The first frame draws everything
+    yield game
+    pygame.quit()
+
+
+def test_a_still_frame_sends_nothing_to_the_display(game):
+    game.update()
+    assert game.updates == []
+
+
+def test_a_push_redraws_only_the_cells_that_changed(game):
+    # Walk the solution up to its first push
+    for move in main.AI(game.board).solve(game.state)[0]:
+        new_state = game.board.move(game.state, main.DIRECTION_INDEX[move])
+        if new_state.boxes != game.state.boxes:
+            break
+        game.state = new_state
+    game.update()
+    game.updates.clear()
+    old_state = game.state
+    game.state = new_state
+    game.update()
+    [rects] = game.updates
+    cells = set(game.changed_cells(old_state, new_state))
+    assert cells == {old_state.player, new_state.player} | set(main.box_cells(old_state.boxes ^ new_state.boxes))
+    assert set(map(tuple, rects)) == {tuple(game.tile_rect(cell).clip(game.view_rect)) for cell in cells}
+
+
+def test_static_layer_shows_walls_and_targets(game):
+    cell = next(iter(game.board.targets))
+    rect = game.tile_rect(cell)
+    assert game.background.get_at(rect.center) == main.SILVER
+    wall = next(cell for cell in game.visible_cells() if game.board.walls[cell])
+    assert game.background.get_at(game.tile_rect(wall).center) == main.BLACK
+
+
+class HeldThread:
+    """
+    A thread that only runs when the test says so, to cancel before the solve starts.
+    """
+
+    def __init__(self, target, args, daemon):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        pass
+
+    def run(self):
+        self.target(*self.args)
+
+
+def test_a_cancel_before_the_solver_thread_runs_is_kept(game, monkeypatch):
+    monkeypatch.setattr(main.threading, "Thread", HeldThread)
+    game.solve.cancel()  # Left over from an earlier solve
+    game.start_solve()
+    game.cancel_solve()
+    game.solver_thread.run()
+    [event] = pygame.event.get(main.SOLUTION_FOUND)
+    assert event.solution is None and event.stats.stopped == "cancelled"
+
+
+def test_only_the_solvers_of_the_last_levels_are_kept(game, monkeypatch):
+    monkeypatch.setattr(main, "SOLVERS_KEPT", 2)
+    first = game.solve
+    for key in game.levels.keys()[1:3]:
+        game.current_level_key = key
+        game.load_level()
+    assert len(game.solvers) == 2 and first not in game.solvers.values()
+
+
+def test_a_solution_with_a_blocked_move_is_not_played(game, caplog):
+    blocked = next(move for move in main.DIRECTIONS if game.board.move(game.state, main.DIRECTION_INDEX[move]) is None)
+    game.solver_thread = object()  # The solve that found it has just finished
+    event = pygame.event.Event(main.SOLUTION_FOUND, solve_id=game.solve_id, solution=[blocked], stats=None)
+    with caplog.at_level("WARNING", logger="sokoban.game"):
+        game.handle_solution(event)
+    assert game.playback is None and game.solver_thread is None
+    assert "Cannot play the solution" in caplog.text
+    assert not game.button_appearance()[0]  # The button reads Solve again
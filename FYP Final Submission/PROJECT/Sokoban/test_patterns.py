@@ -0,0 +1,121 @@
+# ----------Tests of the pattern-database heuristic----------
+
+import threading
+import time
+from concurrent.futures import Future
+import pytest
+import patterns
+from AIsolver import AI
+from analysis import UNREACHABLE, LevelAnalysis
+from benchmark import DEFAULT_CORPUS
+from conftest import replay
+from levelfile import open_levels
+from patterns import PatternHeuristic, build_and_store, build_table, read_table
+
+
+@pytest.fixture(autouse=True)
+def no_shared_tables(monkeypatch):
+    # Every test builds its own tables instead of reusing those of earlier tests
+    monkeypatch.setattr(patterns, "_tables", {})
+
+
+def pattern_solver(board, cache_dir, **options):
+    solver = AI(board, **options)
+    solver.patterns.cache_dir = cache_dir  # Keep the tables out of the home directory
+    return solver
+
+
+@pytest.mark.parametrize("combine", patterns.COMBINES)
+def test_pattern_heuristic_keeps_the_search_optimal(small_levels, combine):
+    for name, board, state, optimal in small_levels:
+        solver = pattern_solver(board, None, patterns=2, pattern_combine=combine)
+        moves, _ = solver.solve(state)
+        assert replay(board, state, moves) == optimal, name
+        assert solver.heuristic_cost(state.boxes) <= optimal, name
+
+
+def test_pattern_heuristic_raises_the_estimate(small_levels):
+    raised = 0
+    for name, board, state, optimal in small_levels:
+        solver = pattern_solver(board, None, patterns=2)
+        solver.patterns.load()
+        plain = AI(board).heuristic_cost(state.boxes)
+        assert plain <= solver.heuristic_cost(state.boxes) <= optimal, name
+        raised += solver.heuristic_cost(state.boxes) > plain
+    assert raised
+
+
+def test_groups_that_can_never_be_solved_are_unreachable(small_levels):
+    _, board, state, _ = small_levels[3]  # Level 4
+    table = build_table(board, 2)
+    assert UNREACHABLE in table.values()
+    heuristic = PatternHeuristic(LevelAnalysis.for_board(board), 2, cache_dir=None)
+    heuristic.load()
+    stuck = next(boxes for boxes, extra in table.items() if extra == UNREACHABLE)
+    assert heuristic.penalty(stuck) == UNREACHABLE
+    assert heuristic.penalty(state.boxes) != UNREACHABLE
+
+
+def test_tables_are_stored_and_read_back(small_levels, tmp_path):
+    _, board, _, _ = small_levels[4]
+    table = build_and_store(board, 2, str(tmp_path))
+    assert read_table(board, 2, str(tmp_path)) == table
+    assert read_table(board, 3, str(tmp_path)) is None
+    assert read_table(board, 2, None) is None
+
+
+def test_a_build_past_its_deadline_is_given_up(caplog):
+    board, _ = open_levels(DEFAULT_CORPUS, None)["Corpus 5"]
+    assert build_table(board, 3, deadline=0) is None
+    heuristic = PatternHeuristic(LevelAnalysis.for_board(board), 3, cache_dir=None)
+    with caplog.at_level("INFO", logger="sokoban.solver"):
+        assert not heuristic.load(timeout=0)
+    assert heuristic.table is None
+    assert "could not be built in time" in caplog.text
+
+
+def test_a_cancelled_build_is_given_up():
+    board, _ = open_levels(DEFAULT_CORPUS, None)["Corpus 5"]
+    assert build_table(board, 3, cancelled=lambda: True) is None
+    heuristic = PatternHeuristic(LevelAnalysis.for_board(board), 3, cache_dir=None)
+    assert not heuristic.load(cancelled=lambda: True)
+    assert heuristic.table is None
+
+
+class StuckBuild(Future):
+    """
+    A background build that never finishes, noting when a solve starts waiting for it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.waited = threading.Event()
+
+    def result(self, timeout=None):
+        self.waited.set()
+        return super().result(timeout)
+
+
+def test_a_cancelled_solve_stops_waiting_for_a_background_build(small_levels, monkeypatch):
+    _, board, state, _ = small_levels[-1]
+    build = StuckBuild()
+    monkeypatch.setattr(patterns, "_pending", {(board.key, 2): build})
+    solver = pattern_solver(board, None, patterns=2)
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(solver.solve(state)))
+    thread.start()
+    assert build.waited.wait(10)
+    cancelled_at = time.perf_counter()
+    solver.cancel()
+    thread.join(10)
+    assert time.perf_counter() - cancelled_at < 1
+    moves, stats = outcome[0]
+    assert moves is None and stats.stopped == "cancelled"
+
+
+def test_unknown_pattern_options_are_rejected(small_levels):
+    analysis = LevelAnalysis.for_board(small_levels[0][1])
+    with pytest.raises(ValueError):
+        PatternHeuristic(analysis, patterns.MAX_GROUP + 1)
+    with pytest.raises(ValueError):
+        PatternHeuristic(analysis, 2, "multiply")
@@ -0,0 +1,53 @@
+# ----------Tests of the frame-driven solution playback----------
+
+import pytest
+from board import Board
+from playback import MAX_SPEED, MIN_SPEED, Playback
+
+CORRIDOR = ["#######", "#@-$-.#", "#######"]
+SOLUTION = [(1, 0), (1, 0), (1, 0)]
+
+
+def playback(speed=2.0):
+    board, state = Board.from_xsb(CORRIDOR)
+    return board, state, Playback(board, state, SOLUTION, speed)
+
+
+def test_advance_plays_moves_at_the_speed():
+    board, _, player = playback()
+    assert not player.advance(0.4)
+    assert player.advance(0.2) and player.position == 1
+    assert player.advance(10) and player.finished
+    assert board.is_solved(player.state.boxes)
+    assert not player.advance(1)
+
+
+def test_several_moves_are_played_in_one_slow_frame():
+    _, _, player = playback(speed=MAX_SPEED)
+    assert player.advance(2 / MAX_SPEED) and player.position == 2
+
+
+def test_pausing_and_stepping_hold_the_position():
+    _, start, player = playback()
+    player.toggle_pause()
+    assert not player.advance(10) and player.position == 0
+    player.toggle_pause()
+    player.step(2)
+    assert player.paused and player.position == 2
+    player.step(-5)
+    assert player.state == start
+    player.skip_to_end()
+    assert player.finished
+
+
+def test_speed_stays_within_its_limits():
+    _, _, player = playback(speed=1000)
+    assert player.speed == MAX_SPEED
+    player.change_speed(1 / 10000)
+    assert player.speed == MIN_SPEED
+
+
+def test_a_blocked_move_is_rejected():
+    board, state = Board.from_xsb(CORRIDOR)
+    with pytest.raises(ValueError):
+        Playback(board, state, [(-1, 0)])
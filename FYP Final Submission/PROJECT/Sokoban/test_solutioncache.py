@@ -0,0 +1,91 @@
+# ----------Tests of the persistent solution cache----------
+
+import pytest
+import AIsolver
+from AIsolver import AI
+from board import DIRECTION_INDEX, State
+from conftest import bfs_moves, replay
+from solutioncache import SolutionCache, decode_pushes, encode_pushes, moves_to_pushes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SolutionCache(str(tmp_path / "solutions.sqlite3"))
+
+
+@pytest.fixture
+def level(small_levels):
+    _, board, state, optimal = small_levels[-1]
+    return board, state, optimal
+
+
+def test_pushes_survive_encoding():
+    pushes = [(12, 0), (7, 3), (140, 2)]
+    assert decode_pushes(encode_pushes(pushes)) == pushes
+    assert decode_pushes(encode_pushes([])) == []
+
+
+def test_a_stored_solution_is_returned_without_searching(cache, level):
+    board, state, optimal = level
+    moves, stats = AI(board, cache=cache).solve(state)
+    assert not stats.cached
+    cached_moves, stats = AI(board, cache=cache).solve(state)
+    assert stats.cached and stats.expanded == 0
+    assert replay(board, state, cached_moves) == optimal
+    assert moves_to_pushes(board, state, cached_moves) == moves_to_pushes(board, state, moves)
+
+
+def test_every_state_along_a_solution_is_stored(cache, level):
+    board, state, optimal = level
+    moves, _ = AI(board, cache=cache).solve(state)
+    half = len(moves) // 2
+    middle = state
+    for move in moves[:half]:
+        middle = board.move(middle, DIRECTION_INDEX[move])
+    pushes_made = len(moves_to_pushes(board, state, moves[:half]))
+    assert cache.lookup(board, middle, AI(board).cache_version) == moves_to_pushes(board, state, moves)[pushes_made:]
+
+
+def test_solutions_of_other_solver_versions_are_not_used(cache, level, monkeypatch):
+    board, state, _ = level
+    AI(board, cache=cache).solve(state)
+    assert not AI(board, heuristic="matching", cache=cache).solve(state)[1].cached
+    assert not AI(board, algorithm="idastar", cache=cache).solve(state)[1].cached
+    assert not AI(board, macros=("tunnel",), cache=cache).solve(state)[1].cached
+    monkeypatch.setattr(AIsolver, "SOLVER_VERSION", AIsolver.SOLVER_VERSION + 1)
+    assert not AI(board, cache=cache).solve(state)[1].cached
+
+
+def test_an_unfinished_anytime_solution_is_not_stored(cache, level):
+    board, state, _ = level
+    solver = AI(board, algorithm="anytime", weights=(5,), cache=cache)
+    assert solver.solve(state)[0] is not None
+    assert cache.lookup(board, state, solver.cache_version) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, level):
+    board, state, optimal = level
+    cache = SolutionCache(str(tmp_path / "small.sqlite3"), max_entries=3)
+    AI(board, cache=cache).solve(state)
+    assert cache.connect().execute("SELECT COUNT(*) FROM solutions").fetchone()[0] == 3
+
+
+def test_an_unusable_store_is_switched_off(tmp_path, level):
+    board, state, optimal = level
+    (tmp_path / "file").write_text("")
+    cache = SolutionCache(str(tmp_path / "file" / "solutions.sqlite3"))
+    moves, _ = AI(board, cache=cache).solve(state)
+    assert replay(board, state, moves) == optimal
+    assert cache.disabled
+
+
+def test_move_mode_solutions_are_kept_per_player_cell(cache, small_levels):
+    for name, board, state, _ in small_levels[:8]:
+        AI(board, mode="move", cache=cache).solve(state)
+        cached_moves, stats = AI(board, mode="move", cache=cache).solve(state)
+        assert stats.cached and len(cached_moves) == bfs_moves(board, state), name
+        # Elsewhere in the same region the walk to the first push differs, so it is solved again
+        for cell in sorted(board.reachable(state.player, state.boxes) - {state.player})[:4]:
+            elsewhere = State(cell, state.boxes)
+            moves, stats = AI(board, mode="move", cache=cache).solve(elsewhere)
+            assert len(moves) == bfs_moves(board, elsewhere), name
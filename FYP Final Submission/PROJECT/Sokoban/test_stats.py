@@ -0,0 +1,52 @@
+# ----------Tests of the search statistics and the solver's logging----------
+
+import json
+import logging
+from AIsolver import AI
+from stats import PHASES, SearchStats
+
+
+def test_timer_is_free_when_phases_are_not_timed():
+    function = len
+    assert SearchStats().timer("heap", function) is function
+    stats = SearchStats(timed=True)
+    assert stats.timer("heap", function)("abc") == 3
+    assert stats.timers["heap"] > 0
+
+
+def test_as_dict_is_plain_json(small_levels):
+    _, board, state, _ = small_levels[-1]
+    _, stats = AI(board, timed=True).solve(state)
+    result = json.loads(json.dumps(stats.as_dict()))
+    assert result["expanded"] == stats.expanded and result["solution_length"] == stats.solution_length
+    assert set(result["timers"]) == set(PHASES)
+    assert set(result["pruned"]) == {"dead_square", "freeze"}
+    assert "timers" not in AI(board).solve(state)[1].as_dict()
+
+
+def test_sampler_is_called_every_few_expansions(small_levels):
+    _, board, state, _ = small_levels[-1]
+    samples = []
+    _, stats = AI(board, sampler=lambda stats: samples.append(stats.expanded), sample_every=2).solve(state)
+    assert samples == list(range(2, stats.expanded + 1, 2))
+
+
+def test_budgets_record_why_the_search_stopped(small_levels):
+    _, board, state, _ = small_levels[-1]
+    moves, stats = AI(board, max_nodes=1).solve(state)
+    assert moves is None and stats.stopped == "nodes" and stats.solution_length is None
+    # The clock is only read every few expansions, which a move-mode search gets through
+    moves, stats = AI(board, mode="move", time_limit=0).solve(state)
+    assert moves is None and stats.stopped == "time"
+
+
+def test_search_is_summarized_at_info_and_traced_at_debug(small_levels, caplog):
+    _, board, state, _ = small_levels[-1]
+    with caplog.at_level(logging.INFO, logger="sokoban.solver"):
+        moves, _ = AI(board).solve(state)
+    assert [record.levelno for record in caplog.records] == [logging.INFO]
+    assert f"solved in {len(moves)} moves" in caplog.records[0].getMessage()
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="sokoban.solver"):
+        AI(board).solve(state)
+    assert sum(record.levelno == logging.DEBUG for record in caplog.records) > len(moves)
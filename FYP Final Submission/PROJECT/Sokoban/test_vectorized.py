@@ -0,0 +1,60 @@
+# ----------Tests that the NumPy passes match the pure-Python ones----------
+
+import random
+import pytest
+import vectorized
+from analysis import LevelAnalysis
+from board import Board
+
+pytest.importorskip("numpy")
+
+
+def large_level(seed, width=32, height=20):
+    """
+    A walled room of scattered walls, boxes and targets, with unreachable floor round the outside.
+    """
+    rng = random.Random(seed)
+    rows = [" " * (width + 4), "  " + "#" * width + "  "]
+    for y in range(height - 2):
+        cells = [rng.choice("#-----") for _ in range(width - 2)]
+        rows.append("  #" + "".join(cells) + "# ")
+    rows.append("  " + "#" * width)
+    floor = [(y, x) for y, row in enumerate(rows) for x, char in enumerate(row) if char == "-"]
+    chosen = rng.sample(floor, 13)
+    for index, (y, x) in enumerate(chosen):
+        char = "@" if index == 0 else "$" if index % 2 else "."
+        rows[y] = rows[y][:x] + char + rows[y][x + 1:]
+    return rows
+
+
+def without_numpy(monkeypatch, build):
+    with monkeypatch.context() as patch:
+        patch.setattr(vectorized, "np", None)
+        return build()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_large_boards_are_built_the_same_with_numpy(seed, monkeypatch):
+    rows = large_level(seed)
+    assert vectorized.available(len(rows) * max(map(len, rows)))
+    board, state = Board.from_xsb(rows)
+    plain_board, plain_state = without_numpy(monkeypatch, lambda: Board.from_xsb(rows))
+    assert state == plain_state
+    assert board.walls == plain_board.walls
+    assert board.targets == plain_board.targets
+    assert board.neighbours == plain_board.neighbours
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_large_level_analysis_is_the_same_with_numpy(seed, monkeypatch):
+    board, state = Board.from_xsb(large_level(seed))
+    analysis = LevelAnalysis(board)
+    plain = without_numpy(monkeypatch, lambda: LevelAnalysis(board))
+    assert analysis.push_distances == plain.push_distances
+    assert analysis.dead_squares == plain.dead_squares
+    sources = [cell for cell in range(board.size) if state.boxes >> cell & 1]
+    assert analysis.push_distances_from(sources) == without_numpy(monkeypatch, lambda: plain.push_distances_from(sources))
+
+
+def test_small_levels_keep_the_plain_loops():
+    assert not vectorized.available(vectorized.MIN_CELLS - 1)
@@ -0,0 +1,69 @@
+# ----------Tests of the Zobrist keys and the closed set----------
+
+import random
+from AIsolver import AI
+from board import State
+from conftest import replay
+from zobrist import ClosedTable, ZobristKeys
+
+
+def test_step_gives_the_same_key_as_hashing_the_successor(small_levels):
+    rng = random.Random(0)
+    for name, board, state, _ in small_levels:
+        zobrist = ZobristKeys(board.size)
+        key = zobrist.key(state)
+        for _ in range(200):
+            successor = board.move(state, rng.randrange(4))
+            if successor is None:
+                continue
+            key = zobrist.step(key, state, successor)
+            assert key == zobrist.key(successor), name
+            state = successor
+
+
+def test_push_successors_step_to_their_own_key(small_levels):
+    _, board, state, _ = small_levels[-1]
+    solver = AI(board)
+    first = board.normalize(state)
+    key = solver.zobrist.key(first)
+    for successor, _, _ in solver.generate_push_successors(first):
+        assert solver.zobrist.step(key, first, successor) == solver.zobrist.key(successor)
+
+
+def test_closed_table_keeps_the_cheapest_cost():
+    table = ClosedTable(capacity=4)
+    assert table.improve(12345, 7)
+    assert not table.improve(12345, 7)
+    assert table.improve(12345, 3)
+    assert table.get(12345) == 3 and table.get(999, default=-1) == -1
+    assert table.improve(0, 5) and table.get(0) == 5  # 0 marks empty slots, so it is stored as another key
+
+
+def test_closed_table_grows_without_losing_entries():
+    table = ClosedTable(capacity=4)
+    keys = [random.Random(key).getrandbits(64) for key in range(100)]
+    for cost, key in enumerate(keys):
+        table.improve(key, cost)
+    assert len(table) == 100 and len(table.slots) >= 128
+    assert dict(table.items()) == {key: cost for cost, key in enumerate(keys)}
+    assert sorted(table.keys()) == sorted(keys)
+
+
+def test_verified_table_tells_states_with_one_key_apart():
+    first, second = State(1, 0b10), State(2, 0b100)
+    table = ClosedTable(capacity=4, verify=True)
+    assert table.improve(42, 1, first)
+    assert table.improve(42, 2, second)
+    assert (table.get(42, first), table.get(42, second)) == (1, 2)
+    assert len(table) == 2 and table.collisions > 0
+    plain = ClosedTable(capacity=4)
+    plain.improve(42, 1)
+    assert not plain.improve(42, 2)  # Without verifying, the second state is taken for the first
+
+
+def test_verified_searches_find_no_collisions(small_levels):
+    for algorithm in ("astar", "idastar"):
+        for name, board, state, optimal in small_levels:
+            moves, stats = AI(board, algorithm=algorithm, verify_hashes=True).solve(state)
+            assert replay(board, state, moves) == optimal, (algorithm, name)
+            assert stats.collisions == 0, (algorithm, name)
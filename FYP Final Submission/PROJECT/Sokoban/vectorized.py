@@ -0,0 +1,153 @@
+# ----------NumPy versions of the per-level passes, used for large levels when NumPy is installed----------
+#
+# The board and the level analysis are built once per level with plain Python loops over every
+# cell. On a large level those loops take seconds, so when NumPy is available the same passes run
+# here as whole-array operations instead, with results identical to the pure-Python versions.
+# Nothing here is needed to play or solve a level: without NumPy the loops are simply used.
+#
+# The solver itself keeps reading plain lists, which are faster than NumPy for the single-cell
+# lookups made on every push.
+
+from board import DIRECTIONS, OPPOSITE
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+# Below this many cells setting up the arrays costs more than the plain loops it replaces
+MIN_CELLS = 400
+
+# Distance stored for cells a box can never get to, the same value as `analysis.UNREACHABLE`
+UNREACHABLE = float("inf")
+
+
+def available(size):
+    """
+    Checks whether the NumPy passes should be used for a level of the given number of cells.
+    """
+    return np is not None and size >= MIN_CELLS
+
+
+def read_xsb(rows, width):
+    """
+    Turns the rows of an XSB level into boolean masks of each kind of tile.
+
+    Args:
+        rows (list of str): The rows of the level.
+        width (int): Length of the longest row; shorter rows are padded with floor.
+
+    Returns:
+        dict: 2D boolean arrays keyed by "wall", "target", "box" and "player".
+    """
+    chars = np.array([list(row.ljust(width)) for row in rows])
+    return {
+        "wall": chars == "#",
+        "target": np.isin(chars, [".", "*", "+"]),
+        "box": np.isin(chars, ["$", "*"]),
+        "player": np.isin(chars, ["@", "+"]),
+    }
+
+
+def flood_fill(free, start):
+    """
+    Finds the cells connected to a start cell by repeatedly dilating a mask by one step.
+
+    Args:
+        free (numpy.ndarray): 2D boolean mask of the cells that can be entered.
+        start (tuple): (x, y) of the start cell.
+
+    Returns:
+        numpy.ndarray: 2D boolean mask of the connected cells.
+    """
+    reached = np.zeros_like(free)
+    reached[start[1], start[0]] = True
+    while True:
+        grown = reached.copy()
+        grown[1:, :] |= reached[:-1, :]
+        grown[:-1, :] |= reached[1:, :]
+        grown[:, 1:] |= reached[:, :-1]
+        grown[:, :-1] |= reached[:, 1:]
+        grown &= free
+        if np.array_equal(grown, reached):
+            return reached
+        reached = grown
+
+
+def neighbour_tables(width, height, walls):
+    """
+    Builds the per-direction neighbour tables of `Board` with array shifts.
+
+    Args:
+        width (int): Number of columns.
+        height (int): Number of rows.
+        walls (bytearray): 1 for every wall cell.
+
+    Returns:
+        list of lists: For each direction, the cell reached from every cell, or -1.
+    """
+    wall = np.frombuffer(bytes(walls), dtype=np.uint8).astype(bool)
+    cells = np.arange(width * height)
+    x, y = cells % width, cells // width
+    tables = []
+    for dx, dy in DIRECTIONS:
+        nx, ny = x + dx, y + dy
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        target = np.where(inside, ny * width + nx, 0)
+        valid = inside & ~wall & ~wall[target]
+        tables.append(np.where(valid, target, -1).tolist())
+    return tables
+
+
+def distance_tables(neighbours, source_sets, pull):
+    """
+    Breadth-first searches for a lone box, one table per set of sources, all run together.
+
+    Every (table, cell) pair is numbered table * cells + cell, and each step moves the whole
+    frontier of pairs, across every table at once, with a few array lookups per direction. The work
+    done is the same as the pure-Python searches, but it runs inside NumPy.
+
+    Args:
+        neighbours (list of lists): The neighbour tables of the board.
+        source_sets (list of lists): The start cells of each table.
+        pull (bool): True to step like `LevelAnalysis.pull_distances` (pushes needed to reach the
+                     sources), False like `LevelAnalysis.push_distances_from` (pushes needed to get
+                     from the sources).
+
+    Returns:
+        list of lists: Distances for every table, `UNREACHABLE` where a cell cannot be reached.
+    """
+    tables = [np.array(table) for table in neighbours]
+    size = len(neighbours[0])
+    steps = []  # For each direction, the cell a box moves to from every cell, or -1
+    for direction in range(4):
+        ahead, behind = tables[direction], tables[OPPOSITE[direction]]
+        if pull:
+            valid = (behind >= 0) & (behind[np.maximum(behind, 0)] >= 0)
+            steps.append(np.where(valid, behind, -1))
+        else:
+            steps.append(np.where((ahead >= 0) & (behind >= 0), ahead, -1))
+
+    distances = np.full(len(source_sets) * size, -1, dtype=np.int32)
+    frontier = np.unique(np.array([table * size + cell for table, sources in enumerate(source_sets)
+                                   for cell in sources], dtype=np.int64))
+    distances[frontier] = 0
+    step = 0
+    while len(frontier):
+        step += 1
+        cells = frontier % size
+        offsets = frontier - cells
+        reached = []
+        for moves in steps:
+            destinations = moves[cells]
+            moving = destinations >= 0
+            reached.append(offsets[moving] + destinations[moving])
+        reached = np.sort(np.concatenate(reached))
+        first = np.r_[True, reached[1:] != reached[:-1]]  # A pair can be reached from two cells
+        frontier = reached[first & (distances[reached] < 0)]
+        distances[frontier] = step
+    result = distances.reshape(len(source_sets), size).tolist()
+    for values, column in zip(result, distances.reshape(len(source_sets), size)):
+        for cell in np.flatnonzero(column < 0).tolist():
+            values[cell] = UNREACHABLE
+    return result
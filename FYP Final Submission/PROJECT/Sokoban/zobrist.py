@@ -0,0 +1,207 @@
+# ----------Zobrist keys and the compact closed set of the searches----------
+#
+# A state is keyed by a 64-bit Zobrist hash: the XOR of one random key per box cell and one per
+# player cell. A push only XORs out the box's old cell and the player's old cell and XORs in the
+# new ones, so a successor's key costs a few operations instead of hashing the whole box set.
+#
+# The A* closed set stores those keys in an open-addressing table backed by `array('Q')`, with
+# the cheapest cost of each state next to it in an `array('I')`, which takes about a quarter of
+# the memory of a dict of `State` objects. Two different states with the same 64-bit key would be
+# taken for one; with a few million states that is far less likely than a hardware fault, and a
+# verified mode that also keeps and compares the states is there for tests.
+
+import random
+from array import array
+from board import box_cells
+
+# Seed of the random keys, fixed so the keys of a level are the same in every run
+SEED = 0x50C0BA17
+
+# Slots in a new closed set; it doubles whenever it gets three quarters full
+INITIAL_CAPACITY = 2 ** 16
+
+# Key stored in place of a real key of 0, which marks an empty slot
+ZERO_KEY = 1
+
+
+class ZobristKeys:
+
+    def __init__(self, size):
+        """
+        Draws the random keys for a board.
+
+        Args:
+            size (int): Number of cells on the board.
+        """
+        generator = random.Random(SEED)
+        self.boxes = array('Q', (generator.getrandbits(64) for _ in range(size)))
+        self.players = array('Q', (generator.getrandbits(64) for _ in range(size)))
+
+    def key(self, state):
+        """
+        Works out the key of a state from scratch.
+        """
+        key = self.players[state.player]
+        box_keys = self.boxes
+        for cell in box_cells(state.boxes):
+            key ^= box_keys[cell]
+        return key
+
+    def step(self, key, state, successor):
+        """
+        Works out the key of a successor from the key of the state it was generated from.
+
+        At most one box moves between the two states, so its old and new cell and the player's
+        old and new cell are the only keys that change.
+
+        Args:
+            key (int): The key of `state`.
+            state (State): The state the successor was generated from.
+            successor (State): The state to work out the key of.
+
+        Returns:
+            int: The key of `successor`.
+        """
+        key ^= self.players[state.player] ^ self.players[successor.player]
+        moved = state.boxes ^ successor.boxes
+        if moved:
+            key ^= self.boxes[(state.boxes & moved).bit_length() - 1] ^ self.boxes[(successor.boxes & moved).bit_length() - 1]
+        return key
+
+
+class ClosedTable:
+
+    def __init__(self, capacity=INITIAL_CAPACITY, verify=False):
+        """
+        Creates an empty table of state keys and the cheapest cost each state was reached with.
+
+        Args:
+            capacity (int): Number of slots to start with, a power of two.
+            verify (bool): Keep every state next to its key and compare it on each match, so two
+                           states sharing a key are told apart and counted in `collisions`.
+        """
+        self.slots = array('Q', bytes(8 * capacity))
+        self.costs = array('I', bytes(4 * capacity))
+        self.states = [None] * capacity if verify else None
+        self.mask = capacity - 1
+        self.count = 0
+        self.collisions = 0
+
+    def __len__(self):
+        return self.count
+
+    def find(self, key, state):
+        """
+        Probes for a key, returning the slot that holds it or the empty slot where it would go.
+        """
+        keys = self.slots
+        mask = self.mask
+        slot = key & mask
+        while True:
+            found = keys[slot]
+            if found == key:
+                if self.states is None or self.states[slot] == state:
+                    return slot
+                self.collisions += 1
+            elif not found:
+                return slot
+            slot = (slot + 1) & mask
+
+    def get(self, key, state=None, default=None):
+        """
+        Returns the cheapest cost a state was reached with, or `default` if it is not in the table.
+
+        Args:
+            key (int): The Zobrist key of the state.
+            state (State, optional): The state itself, only needed in verified mode.
+            default: Returned for a state that is not in the table.
+        """
+        key = key or ZERO_KEY
+        keys = self.slots
+        mask = self.mask
+        slot = key & mask
+        while True:  # `find`, written out as this runs for every state popped
+            found = keys[slot]
+            if found == key and (self.states is None or self.states[slot] == state):
+                return self.costs[slot]
+            if not found:
+                return default
+            if found == key:
+                self.collisions += 1
+            slot = (slot + 1) & mask
+
+    def improve(self, key, cost, state=None):
+        """
+        Records a cost for a state if it is new or cheaper than the cost it was reached with before.
+
+        Args:
+            key (int): The Zobrist key of the state.
+            cost (int): The cost the state has just been reached with.
+            state (State, optional): The state itself, only needed in verified mode.
+
+        Returns:
+            bool: True if the cost was recorded, False if the state was already reached as cheaply.
+        """
+        key = key or ZERO_KEY
+        keys = self.slots
+        mask = self.mask
+        slot = key & mask
+        while True:  # `find`, written out as this runs for every successor
+            found = keys[slot]
+            if found == key and (self.states is None or self.states[slot] == state):
+                if self.costs[slot] <= cost:
+                    return False
+                break
+            if not found:
+                break
+            if found == key:
+                self.collisions += 1
+            slot = (slot + 1) & mask
+        if not found:
+            if 4 * (self.count + 1) > 3 * len(self.slots):
+                self.grow()
+                slot = self.find(key, state)
+            self.slots[slot] = key
+            if self.states is not None:
+                self.states[slot] = state
+            self.count += 1
+        self.costs[slot] = cost
+        return True
+
+    def grow(self):
+        """
+        Doubles the number of slots and inserts every entry again.
+        """
+        old_keys, old_costs, old_states = self.slots, self.costs, self.states
+        capacity = 2 * len(old_keys)
+        self.slots = array('Q', bytes(8 * capacity))
+        self.costs = array('I', bytes(4 * capacity))
+        self.states = [None] * capacity if old_states is not None else None
+        self.mask = capacity - 1
+        collisions = self.collisions  # Entries sharing a key are met again while moving them
+        for slot, key in enumerate(old_keys):
+            if key:
+                state = old_states[slot] if old_states is not None else None
+                new_slot = self.find(key, state)
+                self.slots[new_slot] = key
+                self.costs[new_slot] = old_costs[slot]
+                if state is not None:
+                    self.states[new_slot] = state
+        self.collisions = collisions
+
+    def keys(self):
+        """
+        Yields the key of every state in the table.
+        """
+        for key in self.slots:
+            if key:
+                yield key
+
+    def items(self):
+        """
+        Yields (key, cost) for every state in the table.
+        """
+        costs = self.costs
+        for slot, key in enumerate(self.slots):
+            if key:
+                yield key, costs[slot]